@@ -2,7 +2,13 @@
 核电凝汽器热力特性场预测系统 - 主入口
 """
 
+import time
+_SCRIPT_START = time.perf_counter()
+
 import streamlit as st
+from pages import PAGES, load_page
+from utils.profiling import record, timed
+from utils.settings import get_settings
 
 # 页面配置
 st.set_page_config(
@@ -80,10 +86,6 @@ st.markdown("""
 # 初始化 session state
 if 'calculated' not in st.session_state:
     st.session_state.calculated = False
-if 'synthesized_img' not in st.session_state:
-    st.session_state.synthesized_img = None
-if 'flow_data' not in st.session_state:
-    st.session_state.flow_data = None
 
 # ========== 侧边栏导航 ==========
 with st.sidebar:
@@ -101,14 +103,7 @@ with st.sidebar:
     
     page = st.radio(
         "导航",
-        [
-            "🏠 系统首页",
-            "⚛️ 热力场预测",
-            "📈 趋势分析",
-            "📊 结果对比",
-            "📁 数据管理",
-            "⚙️ 系统设置"
-        ],
+        list(PAGES.keys()),
         index=1,
         label_visibility="collapsed"
     )
@@ -119,22 +114,16 @@ with st.sidebar:
         </div>
     """, unsafe_allow_html=True)
 
-# ========== 路由 ==========
-if page == "🏠 系统首页":
-    from pages import home
-    home.show()
-elif page == "⚛️ 热力场预测":
-    from pages import fluid_dynamics
-    fluid_dynamics.show()
-elif page == "📈 趋势分析":
-    from pages import heat_transfer
-    heat_transfer.show()
-elif page == "📊 结果对比":
-    from pages import result_compare
-    result_compare.show()
-elif page == "📁 数据管理":
-    from pages import data_manage
-    data_manage.show()
-elif page == "⚙️ 系统设置":
-    from pages import settings
-    settings.show()
+# 读取持久化设置（进程内只读取一次）并应用到共享缓存等组件
+get_settings()
+
+# ========== 路由（页面模块按需加载） ==========
+module_name = PAGES[page]
+page_module = load_page(module_name)
+with timed(f"page.show.{module_name}"):
+    page_module.show()
+
+# 首次渲染耗时（每个会话记录一次）
+if not st.session_state.get('first_paint_recorded'):
+    record("startup.first_paint", time.perf_counter() - _SCRIPT_START)
+    st.session_state.first_paint_recorded = True
@@ -0,0 +1,211 @@
+"""
+加速内核的一致性检查与基准（utils.kernels）
+运行：python bench_kernels.py [--shape 1900,870] [--seed-step 6] [--repeat 5]
+
+- 一致性：numba 编译版与 NumPy 版逐元素相同；派生量与整场 np.gradient 相同；
+  流线与箭头另与原逐点 Python 循环比较（原实现以 float32 累加，报告偏差而不要求完全相同）
+- 基准：原 Python 循环、NumPy 版、numba 版（首次调用的编译时间单独列出）
+- 未安装 numba 时只检查 NumPy 版；存在不一致时以非零状态退出
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from utils import kernels
+from utils.derived import QUANTITIES, CONDUCTIVITY, compute_derived
+from utils.field_result import FieldResult
+
+N_STEPS = 25
+
+
+def make_field(shape: tuple, seed: int = 0) -> FieldResult:
+    """光滑的随机温度场（若干高斯热源叠加）"""
+    rng = np.random.default_rng(seed)
+    h, w = shape
+    y, x = np.mgrid[0:h, 0:w]
+    temp = np.zeros(shape)
+    for _ in range(12):
+        cy, cx = rng.uniform(0, h), rng.uniform(0, w)
+        r = rng.uniform(0.05, 0.2) * max(h, w)
+        temp += rng.normal() * np.exp(-((y - cy) ** 2 + (x - cx) ** 2) / (2 * r * r))
+    return FieldResult.from_field(temp)
+
+
+# ==================== 原实现（逐点 Python 循环） ====================
+
+def reference_streamlines(u, v, speed, seeds_x, seeds_y, ds: float) -> list:
+    h, w = u.shape
+    lines = []
+    for sx, sy in zip(seeds_x.tolist(), seeds_y.tolist()):
+        line_x, line_y = [sx], [sy]
+        px, py = float(sx), float(sy)
+        for _ in range(N_STEPS):
+            if not (0 <= int(py) < h and 0 <= int(px) < w):
+                break
+            uu, vv, ss = u[int(py), int(px)], v[int(py), int(px)], speed[int(py), int(px)]
+            if ss <= kernels.MIN_SPEED:
+                break
+            px += uu / ss * ds
+            py += vv / ss * ds
+            if not (0 <= px < w and 0 <= py < h):
+                break
+            line_x.append(px)
+            line_y.append(py)
+        lines.append((line_x, line_y))
+    return lines
+
+
+def reference_arrows(u, v, speed, step: int, scale: float) -> np.ndarray:
+    h, w = u.shape
+    out = []
+    for i in range(0, h, step):
+        for j in range(0, w, step):
+            if speed[i, j] > kernels.MIN_SPEED:
+                out.append((j, i, j + u[i, j] / speed[i, j] * scale, i + v[i, j] / speed[i, j] * scale))
+    return np.asarray(out, dtype=np.float64).reshape(-1, 4)
+
+
+def reference_derived(u, v) -> dict:
+    u, v = u.astype(np.float64), v.astype(np.float64)
+    du_dy, du_dx = np.gradient(u)
+    dv_dy, dv_dx = np.gradient(v)
+    out = {
+        'vorticity': dv_dx - du_dy,
+        'divergence': du_dx + dv_dy,
+        'heat_flux': np.hypot(u, v) * CONDUCTIVITY,
+        'laplacian': du_dx - dv_dy,
+    }
+    return {k: a.astype(np.float32) for k, a in out.items()}
+
+
+# ==================== 计时 ====================
+
+def best_ms(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times) * 1000
+
+
+def run_backend(name: str, result: FieldResult, seeds: tuple, ds: float, step: int, scale: float,
+                repeat: int) -> dict:
+    """在指定实现下运行三个内核 → {输出, 首次调用耗时, 计时}"""
+    u, v, speed = result.u, result.v, result.speed
+    names = list(QUANTITIES)
+    t0 = time.perf_counter()
+    out = {
+        'streamlines': kernels.trace_streamlines(u, v, speed, *seeds, ds, N_STEPS),
+        'arrows': np.column_stack(kernels.arrow_endpoints(u, v, speed, step, scale)),
+        'derived': compute_derived(u, v, names),
+    }
+    first_ms = (time.perf_counter() - t0) * 1000
+    times = {
+        'streamlines': best_ms(lambda: kernels.trace_streamlines(u, v, speed, *seeds, ds, N_STEPS), repeat),
+        'arrows': best_ms(lambda: kernels.arrow_endpoints(u, v, speed, step, scale), repeat),
+        'derived': best_ms(lambda: compute_derived(u, v, names), repeat),
+    }
+    return {'backend': name, 'out': out, 'first_ms': first_ms, 'times': times}
+
+
+# ==================== 一致性 ====================
+
+def same(a: np.ndarray, b: np.ndarray) -> bool:
+    return a.shape == b.shape and np.array_equal(a, b, equal_nan=True)
+
+
+def compare_backends(a: dict, b: dict) -> list:
+    """两种实现的输出逐元素比较 → 不一致项"""
+    failures = []
+    for i, part in enumerate(("xs", "ys", "counts")):
+        if not same(a['streamlines'][i], b['streamlines'][i]):
+            failures.append(f"streamlines.{part}")
+    if not same(a['arrows'], b['arrows']):
+        failures.append("arrows")
+    for name in QUANTITIES:
+        if not same(a['derived'][name], b['derived'][name]):
+            failures.append(f"derived.{name}")
+    return failures
+
+
+def compare_reference(out: dict, reference: dict) -> dict:
+    """与原实现的偏差：派生量须相同；流线报告点数不同的比例与相同点数时的最大坐标偏差"""
+    xs, ys, counts = out['streamlines']
+    ref_counts = np.array([len(x) for x, _ in reference['streamlines']])
+    match = counts == ref_counts
+    dev = 0.0
+    for k in np.flatnonzero(match):
+        rx, ry = reference['streamlines'][k]
+        n = counts[k]
+        dev = max(dev, float(np.abs(xs[k, :n] - rx).max()), float(np.abs(ys[k, :n] - ry).max()))
+    arrows = out['arrows']
+    return {
+        'derived_equal': all(same(out['derived'][n], reference['derived'][n]) for n in QUANTITIES),
+        'streamline_count_mismatch': float(1 - match.mean()),
+        'streamline_max_dev': dev,
+        'arrow_max_dev': float(np.abs(arrows - reference['arrows']).max()) if arrows.shape == reference['arrows'].shape
+        else np.inf,
+    }
+
+
+def main(shape: tuple, seed_step: int, repeat: int) -> int:
+    result = make_field(shape)
+    h, w = shape
+    sy, sx = np.mgrid[0:h:seed_step, 0:w:seed_step]
+    seeds = (sx.ravel().astype(np.float64), sy.ravel().astype(np.float64))
+    ds = 2.0
+    step = max(8, int(np.ceil(max(h, w) / 24)))
+    scale = 5 * step / 8
+    u, v, speed = result.u, result.v, result.speed
+
+    print(f"网格 {h}×{w}，流线起点 {len(seeds[0])} 个 × {N_STEPS} 步，箭头步长 {step}")
+
+    t0 = time.perf_counter()
+    reference = {
+        'streamlines': reference_streamlines(u, v, speed, *seeds, ds),
+        'arrows': reference_arrows(u, v, speed, step, scale),
+    }
+    ref_stream_ms = (time.perf_counter() - t0) * 1000
+    ref_arrow_ms = best_ms(lambda: reference_arrows(u, v, speed, step, scale), repeat)
+    reference['derived'] = reference_derived(u, v)
+    ref_derived_ms = best_ms(lambda: reference_derived(u, v), repeat)
+
+    runs = [run_backend(kernels.set_backend("numpy"), result, seeds, ds, step, scale, repeat)]
+    if kernels.set_backend("numba") == "numba":
+        runs.append(run_backend("numba", result, seeds, ds, step, scale, repeat))
+    else:
+        print("未安装 numba：只检查 NumPy 版")
+
+    print(f"\n{'实现':<10}{'流线 ms':>12}{'箭头 ms':>12}{'派生量 ms':>12}{'首次调用 ms':>14}")
+    print(f"{'原循环':<10}{ref_stream_ms:>12.2f}{ref_arrow_ms:>12.2f}{ref_derived_ms:>12.2f}{'':>14}")
+    for run in runs:
+        t = run['times']
+        print(f"{run['backend']:<10}{t['streamlines']:>12.2f}{t['arrows']:>12.2f}{t['derived']:>12.2f}"
+              f"{run['first_ms']:>14.1f}")
+
+    failed = False
+    print()
+    for run in runs:
+        diff = compare_reference(run['out'], reference)
+        failed |= not diff['derived_equal']
+        print(f"{run['backend']} 对比原实现：派生量{'一致' if diff['derived_equal'] else '不一致'}，"
+              f"流线点数不同 {diff['streamline_count_mismatch']:.2%}，"
+              f"最大坐标偏差 {diff['streamline_max_dev']:.2e}，箭头最大偏差 {diff['arrow_max_dev']:.2e}")
+    if len(runs) == 2:
+        failures = compare_backends(runs[0]['out'], runs[1]['out'])
+        failed |= bool(failures)
+        print("numba 与 NumPy 版：" + ("逐元素一致" if not failures else "不一致 " + ", ".join(failures)))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="加速内核的一致性检查与基准")
+    parser.add_argument("--shape", default="1900,870", help="网格尺寸 H,W")
+    parser.add_argument("--seed-step", type=int, default=6, help="流线起点间距（单元）")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(main(tuple(int(n) for n in args.shape.split(",")), args.seed_step, args.repeat))
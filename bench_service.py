@@ -0,0 +1,107 @@
+"""
+预测服务压测：多线程并发请求，统计吞吐（请求/秒、场/秒）与延迟分位数
+运行：python bench_service.py [--url http://127.0.0.1:8600] [--concurrency 8] [--duration 10]
+      [--batch 0] [--distinct 64] [--arrow] [--spawn]
+--spawn：在本进程内启动服务（空闲端口），便于单机直接测量
+--distinct：参与请求的不同工况数，越小缓存命中越多
+"""
+
+import argparse
+import socket
+import threading
+import time
+
+import numpy as np
+
+from utils.client import PredictionClient, DEFAULT_URL
+from utils.surrogate import PARAM_BOUNDS
+
+
+def spawn_server() -> str:
+    """后台线程启动服务，返回地址"""
+    import uvicorn
+    from service import app
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def worker(url: str, workload: np.ndarray, batch: int, quantities: tuple, arrow: bool,
+           deadline: float, seed: int, out: list):
+    rng = np.random.default_rng(seed)
+    latencies, fields, errors = [], 0, 0
+    with PredictionClient(url, pool_size=1, arrow=arrow) as client:
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                if batch:
+                    client.predict_batch(workload[rng.integers(len(workload), size=batch)], quantities)
+                    fields += batch
+                else:
+                    client.predict(workload[rng.integers(len(workload))], quantities)
+                    fields += 1
+                latencies.append(time.perf_counter() - t0)
+            except Exception:
+                errors += 1
+    out.append((latencies, fields, errors))
+
+
+def run(url: str, concurrency: int, duration: float, batch: int, distinct: int,
+        quantities: tuple, arrow: bool) -> dict:
+    rng = np.random.default_rng(0)
+    workload = rng.uniform(PARAM_BOUNDS[:, 0], PARAM_BOUNDS[:, 1], size=(distinct, 4)).round(2)
+
+    # 预热：建立连接、加载基底
+    with PredictionClient(url) as client:
+        client.predict(workload[0], quantities)
+
+    out = []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=worker, args=(url, workload, batch, quantities, arrow, deadline, i, out))
+               for i in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    latencies = np.concatenate([np.asarray(o[0]) for o in out]) if out else np.empty(0)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000 if len(latencies) else (np.nan,) * 3
+    return {
+        'requests': len(latencies),
+        'errors': sum(o[2] for o in out),
+        'requests_per_s': len(latencies) / elapsed,
+        'fields_per_s': sum(o[1] for o in out) / elapsed,
+        'p50_ms': p50,
+        'p95_ms': p95,
+        'p99_ms': p99,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="预测服务压测")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--batch", type=int, default=0, help="每个请求的工况数，0 表示单工况接口")
+    parser.add_argument("--distinct", type=int, default=64)
+    parser.add_argument("--quantities", default="temp")
+    parser.add_argument("--arrow", action="store_true")
+    parser.add_argument("--spawn", action="store_true")
+    args = parser.parse_args()
+
+    url = spawn_server() if args.spawn else args.url
+    stats = run(url, args.concurrency, args.duration, args.batch, args.distinct,
+                tuple(args.quantities.split(",")), args.arrow)
+    print(f"并发 {args.concurrency}，{'批量 ' + str(args.batch) if args.batch else '单工况'}，"
+          f"{args.distinct} 个不同工况，{args.duration:.0f} s")
+    print(f"请求 {stats['requests']}（失败 {stats['errors']}）  "
+          f"{stats['requests_per_s']:.1f} 请求/s  {stats['fields_per_s']:.1f} 场/s")
+    print(f"延迟 p50 {stats['p50_ms']:.1f} ms  p95 {stats['p95_ms']:.1f} ms  p99 {stats['p99_ms']:.1f} ms")
@@ -0,0 +1,39 @@
+"""
+页面模块
+页面按需导入：首次导航到某页面时才加载该模块及其依赖（plotly、pandas 等），
+冷启动只付出当前页面的导入开销。
+"""
+
+import importlib
+import importlib.util
+
+from utils.profiling import timed
+
+# 导航名称 -> 模块名
+PAGES = {
+    "🏠 系统首页": "home",
+    "⚛️ 热力场预测": "fluid_dynamics",
+    "📈 趋势分析": "heat_transfer",
+    "📊 结果对比": "result_compare",
+    "📁 数据管理": "data_manage",
+    "⚙️ 系统设置": "setting",
+}
+
+_loaded = {}
+
+
+def load_page(name: str):
+    """按模块名加载页面（已加载的直接返回），首次导入计入启动计时"""
+    module = _loaded.get(name)
+    if module is None:
+        with timed(f"startup.import.{name}"):
+            module = importlib.import_module(f"{__name__}.{name}")
+        _loaded[name] = module
+    return module
+
+
+def __getattr__(name: str):
+    # `from pages import fluid_dynamics` 等写法同样走按需加载
+    if importlib.util.find_spec(f"{__name__}.{name}") is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return load_page(name)
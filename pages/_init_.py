@@ -1,8 +0,0 @@
-"""页面模块"""
-from . import home
-from . import fluid_dynamics
-from . import heat_transfer
-from . import electromagnetics
-from . import result_compare
-from . import data_manage
-from . import settings
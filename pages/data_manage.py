@@ -65,6 +65,10 @@ def render_import_tab():
             if st.button("💾 保存到工作区", type="primary"):
                 st.session_state['imported_data'] = df
                 st.success("数据已保存到工作区！")
+            
+            # 由导入的温度场反推运行参数
+            render_section_header("🔁 参数反演")
+            render_inverse_section(df)
                 
         except Exception as e:
             st.error(f"❌ 导入失败: {str(e)}")
@@ -89,6 +93,58 @@ def render_import_tab():
             st.error(f"❌ 解析失败: {str(e)}")
 
 
+def render_inverse_section(df: pd.DataFrame):
+    """由导入的场（单个网格 / 每列一帧 / 每行一帧）反推 p1..p4"""
+    from pages.panels.common import EXCEL_FILE_PATH, in_memory_basis
+    from utils.synthesis import load_basis, basis_digest
+    from utils.inverse import InverseSolver, frames_from_table, N_STARTS
+    from utils.settings import get_settings
+    
+    if not in_memory_basis("参数反演"):
+        return
+    
+    n_starts = st.slider("初值个数", 1, 32, N_STARTS, key="inverse_starts")
+    if not st.button("🔁 反推运行参数", key="inverse_run"):
+        return
+    
+    try:
+        with st.spinner("正在反演..."):
+            basis = load_basis(EXCEL_FILE_PATH)
+            frames = frames_from_table(df.select_dtypes(include=[np.number]).to_numpy(), basis.shape[0])
+            compute = get_settings().compute
+            out = InverseSolver(basis, basis_digest(EXCEL_FILE_PATH)).solve(
+                frames, n_starts=n_starts, max_iter=compute.max_iterations, tol=compute.tolerance
+            )
+    except Exception as e:
+        st.error(f"❌ 反演失败: {str(e)}")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("帧数", len(frames))
+    col2.metric("平均相对残差", f"{out['rel_l2'].mean():.2e}")
+    col3.metric("吞吐量", f"{out['throughput']:.0f} 帧/秒")
+    
+    p = out['params']
+    result_df = pd.DataFrame({
+        "循环水温度 (°C)": p[:, 0],
+        "循环水流量 (m³/s)": p[:, 1],
+        "蒸汽压力 (kPa)": p[:, 2],
+        "热负荷 (MW)": p[:, 3],
+        "RMS 残差": out['rms'],
+        "线性拟合 RMS": out['rms_linear'],
+        "相对残差": out['rel_l2']
+    })
+    st.dataframe(result_df, use_container_width=True)
+    st.caption(f"迭代 {out['iterations']} 次 · 耗时 {out['elapsed_s'] * 1000:.1f} ms（迭代上限与容差见【系统设置 → 计算设置】）")
+    st.download_button(
+        "📥 下载反演结果",
+        result_df.to_csv(index=False).encode('utf-8'),
+        "inverse_params.csv",
+        "text/csv",
+        use_container_width=True
+    )
+
+
 def render_export_tab():
     """渲染数据导出标签页"""
     render_section_header("📥 导出设置")
@@ -164,6 +220,28 @@ def render_history_tab():
     """渲染历史记录标签页"""
     render_section_header("🗄️ 计算历史")
     
+    # 本次会话的预测记录（统计量在预测时已计算好）
+    predictions = st.session_state.get('prediction_history')
+    if predictions:
+        st.markdown("**本次会话预测记录**")
+        st.dataframe(
+            pd.DataFrame(predictions[::-1]),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "time": st.column_config.TextColumn("时间", width="medium"),
+                "engine": st.column_config.TextColumn("引擎", width="small"),
+                "params": st.column_config.TextColumn("参数", width="large"),
+                "max": st.column_config.NumberColumn("最大值", format="%.4f"),
+                "min": st.column_config.NumberColumn("最小值", format="%.4f"),
+                "mean": st.column_config.NumberColumn("平均值", format="%.4f"),
+                "std": st.column_config.NumberColumn("标准差", format="%.4f"),
+                "speed_max": st.column_config.NumberColumn("最大速度", format="%.4f"),
+                "speed_mean": st.column_config.NumberColumn("平均速度", format="%.4f")
+            }
+        )
+        st.markdown("---")
+    
     # 获取历史数据
     history_df = get_history_data()
     
@@ -244,9 +322,17 @@ def render_history_tab():
 
 
 def render_report_tab():
-    """渲染报告生成标签页"""
+    """渲染报告生成标签页：内容取自当前会话已保存的结果"""
+    from pages.panels.common import get_result, session_refs
+    from utils.report import FORMATS, build_report, available_renderer
+
     render_section_header("📋 报告生成")
     
+    result = get_result()
+    history = st.session_state.get('prediction_history', [])
+    if result is None:
+        st.info("💡 当前会话尚无预测结果，请先在流体动力学页面完成预测；报告将仅包含预测记录")
+    
     # 报告类型
     report_type = st.selectbox(
         "报告类型",
@@ -271,7 +357,7 @@ def render_report_tab():
     # 报告格式
     report_format = st.radio(
         "输出格式",
-        ["PDF", "Word", "HTML", "Markdown"],
+        list(FORMATS),
         horizontal=True
     )
     
@@ -287,69 +373,59 @@ def render_report_tab():
         value="CFD Lab"
     )
     
+    st.caption(f"图表渲染器：{available_renderer()}（图像按结果缓存，结果不变时再次生成无需重新渲染）")
+    
     st.markdown("---")
     
     # 生成报告
     if st.button("📝 生成报告", type="primary", use_container_width=True):
+        inputs = st.session_state.get('result_inputs') or {}
+        data = {
+            'title': report_title,
+            'author': author,
+            'report_type': report_type,
+            'generated_at': pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'inputs': inputs.get('params'),
+            'engine': inputs.get('engine', "—"),
+            'result': result,
+            'history': history,
+        }
+        options = {
+            'params': include_params,
+            'results': include_results,
+            'charts': include_charts,
+            'stats': include_stats,
+            'conclusions': include_conclusions,
+            'raw_data': include_raw_data,
+        }
         with st.spinner("正在生成报告..."):
-            import time
-            time.sleep(2)
-            
-            # 模拟生成报告
-            report_content = f"""
-# {report_title}
-
-**作者：** {author}
-**生成时间：** {pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")}
-**报告类型：** {report_type}
-
----
-
-## 1. 概述
-
-本报告由CFD分析系统自动生成，包含流体动力学分析的完整结果。
-
-## 2. 输入参数
-
-| 参数 | 数值 | 单位 |
-|------|------|------|
-| 循环水温度 | 25.0 | °C |
-| 进气量 | 2.5 | m³/s |
-| 入口压力 | 200.0 | kPa |
-| 出口压力 | 101.3 | kPa |
-
-## 3. 计算结果
-
-| 输出 | 数值 | 单位 |
-|------|------|------|
-| 平均流速 | 156.8 | m/s |
-| 最大流速 | 232.5 | m/s |
-| 压力损失 | 98.7 | kPa |
-| 雷诺数 | 1.2×10⁶ | - |
-
-## 4. 结论
-
-分析结果表明系统运行正常，各项指标在预期范围内。
-
----
-
-*本报告由 CFD 分析系统 v2.0.1 自动生成*
-"""
-            
-            st.session_state['generated_report'] = report_content
+            report = build_report(data, report_format, options, session_refs().key('result'))
+        
+        report['format'] = report_format
+        report['title'] = report_title
+        st.session_state['generated_report'] = report
         
-        st.success("✅ 报告生成完成！")
+        st.success(
+            f"✅ 报告生成完成！耗时 {report['elapsed_s']:.2f} s，"
+            f"图表 {report['figures']} 张（新渲染 {report['rendered']} 张）"
+        )
     
     # 显示和下载报告
-    if 'generated_report' in st.session_state:
+    report = st.session_state.get('generated_report')
+    if isinstance(report, dict):
         render_section_header("📄 报告预览")
         
-        st.markdown(st.session_state['generated_report'])
+        if report['format'] == "Markdown":
+            st.markdown(report['content'].decode("utf-8"))
+        elif report['format'] == "HTML":
+            st.iframe(report['content'].decode("utf-8"), height=800)
+        else:
+            st.caption(f"PDF 文档，{len(report['content']) / 1024:.1f} KB，请下载后查看")
         
         st.download_button(
             "📥 下载报告",
-            st.session_state['generated_report'],
-            f"{report_title}.md",
-            "text/markdown",
+            report['content'],
+            f"{report['title']}{report['ext']}",
+            report['mime'],
             use_container_width=True
         )
@@ -10,6 +10,12 @@ from plotly.subplots import make_subplots
 from components.header import render_header, render_section_header
 from components.charts import create_electromagnetic_field
 from utils.calculations import run_em_simulation
+from utils.profiling import timed
+from utils.em_fields import em_fields, DEFAULT_RESOLUTION, EM_CACHE_SIZE
+from utils.pyramid import FieldPyramid, MAX_RENDER_CELLS
+
+# 可视化网格分辨率选项
+EM_RESOLUTIONS = [40, 100, 200, 500, 1000]
 
 def show():
     """渲染电磁场分析页面"""
@@ -109,47 +115,63 @@ def run_em_calculation(params: dict):
     with st.spinner("正在进行电磁分析..."):
         time.sleep(1.5)
         
-        results = run_em_simulation(params)
+        with timed("em.simulation"):
+            results = run_em_simulation(params)
         st.session_state.em_results = results
     
     st.success("✅ 电磁分析完成！")
     st.rerun()
 
 
+@timed("em.visualization")
 def render_em_visualization(params: dict):
-    """渲染电磁场可视化"""
+    """渲染电磁场可视化（场与图表按电磁参数缓存，无关控件变化时不重新计算）"""
     render_section_header("🧲 电磁场分布")
     
+    resolution = st.select_slider("网格分辨率", options=EM_RESOLUTIONS, value=DEFAULT_RESOLUTION)
+    
+    fig = create_em_figure(
+        params['voltage'],
+        params['frequency'],
+        params['current'],
+        params['permeability'],
+        resolution
+    )
+    
+    st.plotly_chart(fig, use_container_width=True)
+
+
+@st.cache_resource(max_entries=EM_CACHE_SIZE, show_spinner=False)
+def create_em_figure(voltage: float, frequency: float, current: float,
+                     permeability: float, resolution: int) -> go.Figure:
+    """电场/磁场双子图；高分辨率时按单元数上限降采样后发送"""
+    x, y, E, B = em_fields(voltage, frequency, current, permeability, resolution)
+    
+    pyramid_e, pyramid_b = FieldPyramid(E), FieldPyramid(B)
+    level = pyramid_e.choose_level(max_cells=MAX_RENDER_CELLS // 2)
+    # 层级单元中心（网格下标）换算为物理坐标
+    cx, cy = pyramid_e.coords(level)
+    xs = np.interp(cx, np.arange(len(x)), x)
+    ys = np.interp(cy, np.arange(len(y)), y)
+    suffix = f" ({resolution}×{resolution}" + (f" · 显示 1:{2 ** level})" if level else ")")
+    
     # 创建子图
     fig = make_subplots(
         rows=1, cols=2,
-        subplot_titles=("电场强度分布", "磁场强度分布"),
+        subplot_titles=("电场强度分布" + suffix, "磁场强度分布" + suffix),
         horizontal_spacing=0.15
     )
     
-    # 生成数据
-    x = np.linspace(-5, 5, 40)
-    y = np.linspace(-5, 5, 40)
-    X, Y = np.meshgrid(x, y)
-    
-    # 电场
-    E = params['voltage'] * np.exp(-(X**2 + Y**2) / 5) * \
-        np.cos(2 * np.pi * params['frequency'] * X / 1000)
-    
-    # 磁场
-    B = params['current'] * params['permeability'] / (2 * np.pi) * \
-        np.exp(-(X**2 + Y**2) / 8)
-    
     # 添加电场热图
     fig.add_trace(
-        go.Heatmap(x=x, y=y, z=E, colorscale='RdBu', 
+        go.Heatmap(x=xs, y=ys, z=pyramid_e.level(level), colorscale='RdBu', 
                    colorbar=dict(title="E [V/m]", x=0.45)),
         row=1, col=1
     )
     
     # 添加磁场热图
     fig.add_trace(
-        go.Heatmap(x=x, y=y, z=B, colorscale='Viridis',
+        go.Heatmap(x=xs, y=ys, z=pyramid_b.level(level), colorscale='Viridis',
                    colorbar=dict(title="B [T]", x=1.0)),
         row=1, col=2
     )
@@ -158,7 +180,7 @@ def render_em_visualization(params: dict):
     fig.update_xaxes(title_text="X [m]")
     fig.update_yaxes(title_text="Y [m]")
     
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
 def render_em_results():
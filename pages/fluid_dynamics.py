@@ -3,21 +3,42 @@
 - 前台：4个输入参数 + 图表类型选择
 - 后台：Excel文件 + 8个计算系数（用户不可见）
 - 支持5种图表类型：热力图、等值线图、矢量图、流线图、组合图
+- 网格尺寸由数据文件决定，图表按视图范围从多分辨率金字塔取数
+- 瞬态、实时接入、测点重构、不确定性、异常检测等功能面板见 pages.panels（按需加载）
 """
 
 import streamlit as st
 import numpy as np
-import pandas as pd
 import plotly.graph_objects as go
 import os
+from pages import panels
+from pages.panels.common import (EXCEL_FILE_PATH, IMG_HEIGHT, IMG_WIDTH, session_refs, store_result, get_result,
+                                 validate_basis, field_colormap, chart_height)
+from pages.panels.charts import LAYER_CHARTS, create_chart, create_empty_chart
+from utils.synthesis import load_basis, basis_shape, basis_digest
+from utils.field_stats import quantity_stats
+from utils.derived import QUANTITIES as DERIVED_QUANTITIES
+from utils.resource_cache import content_key, sizeof
+from utils.pyramid import MAX_RENDER_CELLS
+from utils.profiling import timed
+from utils.predict import basis_key, synthesize_coalesced
+from utils.settings import get_settings
+from utils.basis_store import is_out_of_core, peek_shape
 
-# ==================== 后台固定配置 ====================
-EXCEL_FILE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "8张图.xlsx")
-# 或使用绝对路径
-# EXCEL_FILE_PATH = r"C:\Users\admin\Nutstore\1\同步文件夹\项目程序\data\8张图.xlsx"
+# 显示分辨率选项（金字塔层级，None 为按单元数上限自动选择）
+RESOLUTIONS = {
+    "自动": None,
+    "1:1": 0,
+    "1:2": 1,
+    "1:4": 2,
+    "1:8": 3
+}
 
-IMG_HEIGHT = 190
-IMG_WIDTH = 87
+# 渲染后端：交互式（浏览器端计算）/ 服务端栅格（PNG + 服务端等值线）
+RENDER_BACKENDS = {
+    "交互式 (Plotly)": "interactive",
+    "服务端栅格": "raster"
+}
 
 # 图表类型选项
 CHART_TYPES = {
@@ -28,18 +49,14 @@ CHART_TYPES = {
     "组合图（等值线+矢量）": "combined"
 }
 
+# 热力图/等值线图可显示的物理量（派生量见 utils.derived）
+FIELD_LAYERS = {"温度": "temp", **{label: name for name, label in DERIVED_QUANTITIES.items()}}
 
-def calculate_coefficients(p1: float, p2: float, p3: float, p4: float) -> list:
-    """根据4个前台参数计算8个后台系数"""
-    c1 = p1 * 0.10 + 0.05
-    c2 = -p2 * 0.15 - 0.10
-    c3 = p3 * 0.20 + 0.15
-    c4 = p1 * p2 * 0.05
-    c5 = -p3 * 0.10 - 0.10
-    c6 = p4 * 0.20 + 0.10
-    c7 = -(p1 + p2) * 0.05 - 0.05
-    c8 = (p3 + p4) * 0.10
-    return [c1, c2, c3, c4, c5, c6, c7, c8]
+# 预测引擎选项
+ENGINES = {
+    "基底合成": "basis",
+    "代理模型 (POD-RBF)": "surrogate"
+}
 
 
 def show():
@@ -61,6 +78,12 @@ def show():
         </div>
     """, unsafe_allow_html=True)
     
+    # 当前结果（共享缓存中的只读数据，会话只持有键）
+    result = get_result()
+    
+    # 异常检测（阈值等控件位于右侧统计栏，此处按会话状态读取）
+    anomalies = panels.anomaly.detect_anomalies(result)
+    
     # 三列布局
     col_input, col_image, col_stats = st.columns([1.2, 2.5, 1])
     
@@ -81,6 +104,36 @@ def show():
             index=0,
             label_visibility="collapsed"
         )
+        layer = FIELD_LAYERS[st.selectbox(
+            "显示物理量",
+            list(FIELD_LAYERS.keys()),
+            index=0,
+            disabled=CHART_TYPES[chart_type] not in LAYER_CHARTS,
+            help="涡量、散度、热流密度与温度拉普拉斯由梯度场一次计算，仅用于热力图与等值线图"
+        )]
+        if CHART_TYPES[chart_type] not in LAYER_CHARTS:
+            layer = "temp"
+        
+        # 三维基底：切片位置变化时只重新合成切片，不重新运行
+        slice_spec = panels.basis_store.render_slice_controls()
+        if slice_spec is not None:
+            result = panels.basis_store.refresh_slice(slice_spec) or result
+        
+        view = render_view_controls()
+        
+        st.markdown("---")
+        st.markdown('<div class="section-header">🧠 预测引擎</div>', unsafe_allow_html=True)
+        # 代理模型需要将基底整体读入内存训练，外存基底只提供基底合成
+        basis_out_of_core = os.path.exists(EXCEL_FILE_PATH) and is_out_of_core(EXCEL_FILE_PATH)
+        engine = st.selectbox(
+            "选择预测引擎",
+            list(ENGINES.keys()),
+            index=0 if basis_out_of_core else list(ENGINES.values()).index(get_settings().compute.engine),
+            disabled=basis_out_of_core,
+            label_visibility="collapsed"
+        )
+        if basis_out_of_core:
+            st.caption("外存基底仅支持基底合成（按块合成，不整体读入内存）")
         
         st.markdown("---")
         st.markdown('<div class="section-header">🎮 操作</div>', unsafe_allow_html=True)
@@ -91,16 +144,38 @@ def show():
         with b2:
             reset_clicked = st.button("🔄 重置", use_container_width=True)
         
-        if st.session_state.get('synthesized_img') is not None:
-            csv_data = pd.DataFrame(st.session_state.synthesized_img).to_csv(index=False, header=False)
+        if result is not None:
+            import pandas as pd
+            csv_data = pd.DataFrame(result.temp).to_csv(index=False, header=False)
             st.download_button("💾 保存结果", csv_data, "result.csv", "text/csv", use_container_width=True)
+            st.download_button(
+                "🗜️ 压缩存档 (float16)",
+                result.archive().to_npz(),
+                "result.npz",
+                "application/octet-stream",
+                use_container_width=True
+            )
+            
+            out_of_core = st.session_state.get('out_of_core')
+            if out_of_core is not None and out_of_core['key'] == session_refs().key('result'):
+                st.caption(f"外存模式：显示 {out_of_core['factor']}× 降采样视图，温度统计为全分辨率 "
+                           f"{out_of_core['shape'][0]}×{out_of_core['shape'][1]}")
+                if st.button("📦 导出全分辨率场 (.npy)", use_container_width=True):
+                    try:
+                        st.success(f"✅ 已写入 {panels.basis_store.export_full_resolution(out_of_core)}")
+                    except Exception as e:
+                        st.error(f"❌ 导出失败: {str(e)}")
         
         if run_clicked:
-            run_synthesis(p1, p2, p3, p4)
+            if ENGINES[engine] == "surrogate" and slice_spec is None and not basis_out_of_core:
+                panels.surrogate.run_surrogate_synthesis(p1, p2, p3, p4)
+            else:
+                run_synthesis(p1, p2, p3, p4, slice_spec)
         if reset_clicked:
             st.session_state.calculated = False
-            st.session_state.synthesized_img = None
-            st.session_state.flow_data = None
+            session_refs().drop('result')
+            session_refs().drop('figure')
+            session_refs().drop('anomaly')
             st.rerun()
     
     # ===== 中间：图像 =====
@@ -114,9 +189,35 @@ def show():
         }
         st.markdown(f'<div class="section-header">{chart_titles.get(chart_type, "🌡️ 热力特性场分布")}</div>', unsafe_allow_html=True)
         
-        if st.session_state.get('calculated') and st.session_state.get('synthesized_img') is not None:
-            fig = create_chart(st.session_state.synthesized_img, st.session_state.flow_data, CHART_TYPES[chart_type])
-            st.plotly_chart(fig, use_container_width=True)
+        if st.session_state.get('calculated') and result is not None:
+            if layer != "temp":
+                # 全部派生量一遍扫描算出并随结果缓存，切换显示的物理量不再重算
+                with timed("derived.compute"):
+                    result.derived(*DERIVED_QUANTITIES)
+            
+            # 相同结果 + 图表类型 + 视图 + 显示设置的图表在所有会话间共享
+            fig_key = content_key("figure", session_refs().key('result'), chart_type, layer, sorted(view.items()),
+                                  field_colormap(), chart_height())
+            fig = session_refs().get_or_create(
+                'figure',
+                fig_key,
+                lambda: create_chart(
+                    result.temp,
+                    result,
+                    CHART_TYPES[chart_type],
+                    view=view,
+                    pyramids=result.pyramids,
+                    layer=layer
+                ),
+                nbytes=sizeof(result.temp)
+            )
+            if anomalies and st.session_state.get('anomaly_overlay', True):
+                fig = panels.anomaly.overlay_anomalies(fig, anomalies, view)
+            with timed("render.plotly_chart"):
+                st.plotly_chart(fig, use_container_width=True)
+
+            with st.expander("📍 剖面与区域统计"):
+                panels.probe.render_probe_panel(result)
         else:
             fig = create_empty_chart()
             st.plotly_chart(fig, use_container_width=True)
@@ -126,26 +227,44 @@ def show():
     with col_stats:
         st.markdown('<div class="section-header">📈 统计分析</div>', unsafe_allow_html=True)
         
-        if st.session_state.get('calculated') and st.session_state.get('synthesized_img') is not None:
-            img = st.session_state.synthesized_img
-            flow = st.session_state.flow_data
+        if st.session_state.get('calculated') and result is not None:
+            # 统计量在合成阶段已计算好，直接读取
+            temp_stats = result.stats['temp']
+            speed_stats = result.stats['speed']
             
             st.markdown("**温度场**")
-            st.metric("最大值", f"{np.max(img):.4f}")
-            st.metric("最小值", f"{np.min(img):.4f}")
-            st.metric("平均值", f"{np.mean(img):.4f}")
-            st.metric("标准差", f"{np.std(img):.4f}")
+            st.metric("最大值", f"{temp_stats['max']:.4f}")
+            st.metric("最小值", f"{temp_stats['min']:.4f}")
+            st.metric("平均值", f"{temp_stats['mean']:.4f}")
+            st.metric("标准差", f"{temp_stats['std']:.4f}")
             
             st.markdown("---")
             
-            if flow is not None:
-                st.markdown("**流场速度**")
-                st.metric("最大速度", f"{np.max(flow['speed']):.4f}")
-                st.metric("平均速度", f"{np.mean(flow['speed']):.4f}")
+            st.markdown("**流场速度**")
+            st.metric("最大速度", f"{speed_stats['max']:.4f}")
+            st.metric("平均速度", f"{speed_stats['mean']:.4f}")
+            
+            if layer != "temp":
+                layer_stats = quantity_stats(result, layer)
+                st.markdown("---")
+                st.markdown(f"**{DERIVED_QUANTITIES[layer]}**")
+                st.metric("最大值", f"{layer_stats['max']:.4f}")
+                st.metric("最小值", f"{layer_stats['min']:.4f}")
+                st.metric("平均值", f"{layer_stats['mean']:.4f}")
+                st.metric("标准差", f"{layer_stats['std']:.4f}")
+            
+            with st.expander("📊 分布"):
+                render_distribution(temp_stats)
+            
+            with st.expander("🚨 异常检测", expanded=bool(anomalies and any(a['count'] for a in anomalies.values()))):
+                panels.anomaly.render_anomaly_panel(result, anomalies)
             
             st.markdown("---")
             st.markdown("**图像信息**")
-            st.code(f"尺寸: {IMG_HEIGHT}×{IMG_WIDTH}")
+            st.code(f"尺寸: {result.shape[0]}×{result.shape[1]}")
+            
+            if ENGINES[engine] == "surrogate":
+                panels.surrogate.render_surrogate_report()
         else:
             st.metric("最大值", "—")
             st.metric("最小值", "—")
@@ -153,423 +272,61 @@ def show():
             st.metric("标准差", "—")
             st.markdown("---")
             st.caption("等待计算结果...")
-
-
-def create_chart(img_data: np.ndarray, flow_data: dict, chart_type: str) -> go.Figure:
-    """根据类型创建图表"""
-    if chart_type == "heatmap":
-        return create_heatmap_chart(img_data)
-    elif chart_type == "contour":
-        return create_contour_chart(img_data)
-    elif chart_type == "vector":
-        return create_vector_chart(img_data, flow_data)
-    elif chart_type == "streamline":
-        return create_streamline_chart(img_data, flow_data)
-    elif chart_type == "combined":
-        return create_combined_chart(img_data, flow_data)
-    return create_heatmap_chart(img_data)
-
-
-def create_heatmap_chart(img_data: np.ndarray) -> go.Figure:
-    """热力图"""
-    x = np.arange(IMG_WIDTH)
-    y = np.arange(IMG_HEIGHT)
     
-    fig = go.Figure()
-    
-    fig.add_trace(go.Heatmap(
-        z=img_data,
-        x=x,
-        y=y,
-        colorscale='jet',
-        colorbar=dict(
-            title=dict(text="温度值", side="right"),
-            thickness=15,
-            len=0.9
-        )
-    ))
-    
-    fig.update_layout(
-        title=dict(
-            text=f"温度场热力图 ({IMG_HEIGHT}×{IMG_WIDTH})",
-            x=0.5,
-            font=dict(size=14, color="#333")
-        ),
-        xaxis=dict(
-            title="X 位置",
-            scaleanchor="y",
-            scaleratio=1,
-            showgrid=False
-        ),
-        yaxis=dict(
-            title="Y 位置",
-            autorange="reversed",
-            showgrid=False
-        ),
-        height=550,
-        margin=dict(l=50, r=20, t=50, b=40)
-    )
-    
-    return fig
+    # ===== 底部：瞬态模式 / 实时数据 =====
+    panels.transient.render_transient_section((p1, p2, p3, p4))
+    panels.ingest.render_live_section((p1, p2, p3, p4))
+    panels.sensors.render_sensor_section(result)
+    panels.uncertainty.render_uncertainty_section((p1, p2, p3, p4))
 
 
-def create_contour_chart(img_data: np.ndarray) -> go.Figure:
-    """等值线图"""
-    x = np.arange(IMG_WIDTH)
-    y = np.arange(IMG_HEIGHT)
-    
-    fig = go.Figure()
-    
-    # 填充等值线
-    fig.add_trace(go.Contour(
-        z=img_data,
-        x=x,
-        y=y,
-        colorscale='jet',
-        contours=dict(
-            showlabels=True,
-            labelfont=dict(size=9, color='white')
-        ),
-        colorbar=dict(
-            title=dict(text="温度值", side="right"),
-            thickness=15,
-            len=0.9
-        ),
-        line=dict(width=1)
-    ))
-    
-    fig.update_layout(
-        title=dict(
-            text=f"温度场等值线图 ({IMG_HEIGHT}×{IMG_WIDTH})",
-            x=0.5,
-            font=dict(size=14, color="#333")
-        ),
-        xaxis=dict(
-            title="X 位置",
-            scaleanchor="y",
-            scaleratio=1,
-            showgrid=False
-        ),
-        yaxis=dict(
-            title="Y 位置",
-            autorange="reversed",
-            showgrid=False
-        ),
-        height=550,
-        margin=dict(l=50, r=20, t=50, b=40)
+def render_distribution(stats: dict):
+    """分位数与直方图"""
+    st.dataframe(
+        {"分位数": [f"P{p}" for p in stats['percentiles']],
+         "数值": [f"{v:.4f}" for v in stats['percentiles'].values()]},
+        use_container_width=True,
+        hide_index=True
     )
     
-    return fig
-
-
-def create_vector_chart(img_data: np.ndarray, flow_data: dict) -> go.Figure:
-    """流场矢量图（统一箭头大小）"""
-    x = np.arange(IMG_WIDTH)
-    y = np.arange(IMG_HEIGHT)
-    
-    # 降采样
-    step = 8
-    x_s = x[::step]
-    y_s = y[::step]
-    
-    u_s = flow_data['u'][::step, ::step]
-    v_s = flow_data['v'][::step, ::step]
-    speed_s = flow_data['speed'][::step, ::step]
-    
-    # 归一化：统一箭头大小
-    speed_safe = np.where(speed_s == 0, 1, speed_s)
-    u_norm = u_s / speed_safe
-    v_norm = v_s / speed_safe
-    
-    fig = go.Figure()
-    
-    # 背景：速度大小热力图
-    fig.add_trace(go.Heatmap(
-        z=flow_data['speed'],
-        x=x,
-        y=y,
-        colorscale='Blues',
-        opacity=0.6,
-        colorbar=dict(
-            title=dict(text="速度大小", side="right"),
-            thickness=15,
-            len=0.9,
-            x=1.02
-        )
+    edges = np.asarray(stats['hist_edges'])
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=stats['hist_counts'],
+        width=np.diff(edges),
+        marker_color='#1565C0'
     ))
-    
-    # 创建箭头
-    annotations = []
-    scale = 5
-    
-    for i in range(len(y_s)):
-        for j in range(len(x_s)):
-            if speed_s[i, j] > 0.001:
-                annotations.append(dict(
-                    x=x_s[j] + u_norm[i, j] * scale,
-                    y=y_s[i] + v_norm[i, j] * scale,
-                    ax=x_s[j],
-                    ay=y_s[i],
-                    xref="x",
-                    yref="y",
-                    axref="x",
-                    ayref="y",
-                    showarrow=True,
-                    arrowhead=2,
-                    arrowsize=1,
-                    arrowwidth=1.5,
-                    arrowcolor="red"
-                ))
-    
     fig.update_layout(
-        title=dict(
-            text=f"流场矢量图 ({IMG_HEIGHT}×{IMG_WIDTH})",
-            x=0.5,
-            font=dict(size=14, color="#333")
-        ),
-        xaxis=dict(
-            title="X 位置",
-            scaleanchor="y",
-            scaleratio=1,
-            showgrid=False,
-            range=[0, IMG_WIDTH]
-        ),
-        yaxis=dict(
-            title="Y 位置",
-            autorange="reversed",
-            showgrid=False,
-            range=[0, IMG_HEIGHT]
-        ),
-        height=550,
-        margin=dict(l=50, r=70, t=50, b=40),
-        annotations=annotations
+        height=180,
+        margin=dict(l=10, r=10, t=10, b=10),
+        xaxis_title="温度值",
+        yaxis_title="单元数"
     )
-    
-    return fig
-
-
-def create_streamline_chart(img_data: np.ndarray, flow_data: dict) -> go.Figure:
-    """流线图"""
-    x = np.arange(IMG_WIDTH)
-    y = np.arange(IMG_HEIGHT)
-    
-    fig = go.Figure()
-    
-    # 背景：温度场热力图
-    fig.add_trace(go.Heatmap(
-        z=img_data,
-        x=x,
-        y=y,
-        colorscale='jet',
-        opacity=0.5,
-        colorbar=dict(
-            title=dict(text="温度值", side="right"),
-            thickness=15,
-            len=0.9
-        )
-    ))
-    
-    # 流线计算
-    u = flow_data['u']
-    v = flow_data['v']
-    speed = flow_data['speed']
-    
-    # 生成流线起点
-    step = 6
-    
-    for sy in range(0, IMG_HEIGHT, step * 2):
-        for sx in range(0, IMG_WIDTH, step * 2):
-            line_x = [sx]
-            line_y = [sy]
-            px, py = float(sx), float(sy)
-            
-            # 沿流线方向追踪
-            for _ in range(25):
-                if 0 <= int(py) < IMG_HEIGHT and 0 <= int(px) < IMG_WIDTH:
-                    uu = u[int(py), int(px)]
-                    vv = v[int(py), int(px)]
-                    ss = speed[int(py), int(px)]
-                    
-                    if ss > 0.001:
-                        # 归一化并移动
-                        px += uu / ss * 2.0
-                        py += vv / ss * 2.0
-                        
-                        if 0 <= px < IMG_WIDTH and 0 <= py < IMG_HEIGHT:
-                            line_x.append(px)
-                            line_y.append(py)
-                        else:
-                            break
-                    else:
-                        break
-                else:
-                    break
-            
-            # 添加流线
-            if len(line_x) > 2:
-                fig.add_trace(go.Scatter(
-                    x=line_x,
-                    y=line_y,
-                    mode='lines',
-                    line=dict(color='white', width=1.2),
-                    showlegend=False,
-                    hoverinfo='skip'
-                ))
-    
-    fig.update_layout(
-        title=dict(
-            text=f"流线分布图 ({IMG_HEIGHT}×{IMG_WIDTH})",
-            x=0.5,
-            font=dict(size=14, color="#333")
-        ),
-        xaxis=dict(
-            title="X 位置",
-            scaleanchor="y",
-            scaleratio=1,
-            showgrid=False,
-            range=[0, IMG_WIDTH]
-        ),
-        yaxis=dict(
-            title="Y 位置",
-            autorange="reversed",
-            showgrid=False,
-            range=[0, IMG_HEIGHT]
-        ),
-        height=550,
-        margin=dict(l=50, r=20, t=50, b=40)
-    )
-    
-    return fig
-
-
-def create_combined_chart(img_data: np.ndarray, flow_data: dict) -> go.Figure:
-    """组合图（等值线+矢量）"""
-    x = np.arange(IMG_WIDTH)
-    y = np.arange(IMG_HEIGHT)
-    
-    # 降采样
-    step = 10
-    x_s = x[::step]
-    y_s = y[::step]
-    
-    u_s = flow_data['u'][::step, ::step]
-    v_s = flow_data['v'][::step, ::step]
-    speed_s = flow_data['speed'][::step, ::step]
-    
-    # 归一化
-    speed_safe = np.where(speed_s == 0, 1, speed_s)
-    u_norm = u_s / speed_safe
-    v_norm = v_s / speed_safe
-    
-    fig = go.Figure()
-    
-    # 等值线填充
-    fig.add_trace(go.Contour(
-        z=img_data,
-        x=x,
-        y=y,
-        colorscale='jet',
-        opacity=0.7,
-        contours=dict(showlabels=False),
-        colorbar=dict(
-            title=dict(text="温度值", side="right"),
-            thickness=15,
-            len=0.9
-        ),
-        line=dict(width=0.5, color='white')
-    ))
-    
-    # 矢量箭头
-    annotations = []
-    scale = 6
-    
-    for i in range(len(y_s)):
-        for j in range(len(x_s)):
-            if speed_s[i, j] > 0.001:
-                annotations.append(dict(
-                    x=x_s[j] + u_norm[i, j] * scale,
-                    y=y_s[i] + v_norm[i, j] * scale,
-                    ax=x_s[j],
-                    ay=y_s[i],
-                    xref="x",
-                    yref="y",
-                    axref="x",
-                    ayref="y",
-                    showarrow=True,
-                    arrowhead=2,
-                    arrowsize=1,
-                    arrowwidth=1.5,
-                    arrowcolor="black"
-                ))
-    
-    fig.update_layout(
-        title=dict(
-            text=f"等值线+矢量组合图 ({IMG_HEIGHT}×{IMG_WIDTH})",
-            x=0.5,
-            font=dict(size=14, color="#333")
-        ),
-        xaxis=dict(
-            title="X 位置",
-            scaleanchor="y",
-            scaleratio=1,
-            showgrid=False,
-            range=[0, IMG_WIDTH]
-        ),
-        yaxis=dict(
-            title="Y 位置",
-            autorange="reversed",
-            showgrid=False,
-            range=[0, IMG_HEIGHT]
-        ),
-        height=550,
-        margin=dict(l=50, r=20, t=50, b=40),
-        annotations=annotations
-    )
-    
-    return fig
+    st.plotly_chart(fig, use_container_width=True)
 
 
-def create_empty_chart() -> go.Figure:
-    """空白占位图"""
-    fig = go.Figure()
-    
-    # 边框
-    fig.add_shape(
-        type="rect",
-        x0=0, y0=0, x1=IMG_WIDTH, y1=IMG_HEIGHT,
-        fillcolor="rgba(240, 248, 255, 0.5)",
-        line=dict(color="#1565C0", width=2, dash="dash")
-    )
-    
-    # 提示文字
-    fig.add_annotation(
-        x=IMG_WIDTH/2, y=IMG_HEIGHT/2,
-        text="等待预测...",
-        font=dict(size=20, color="#1565C0"),
-        showarrow=False
-    )
-    
-    fig.update_layout(
-        xaxis=dict(
-            range=[-5, IMG_WIDTH+5],
-            scaleanchor="y",
-            scaleratio=1,
-            showgrid=False,
-            showticklabels=False
-        ),
-        yaxis=dict(
-            range=[IMG_HEIGHT+5, -5],
-            showgrid=False,
-            showticklabels=False
-        ),
-        height=550,
-        margin=dict(l=20, r=20, t=20, b=20)
-    )
-    
-    return fig
+def render_view_controls() -> dict:
+    """视图范围与显示分辨率"""
+    result = get_result()
+    h, w = result.shape if result is not None else (IMG_HEIGHT, IMG_WIDTH)
+    
+    with st.expander("🔍 视图与分辨率"):
+        resolution = st.selectbox("显示分辨率", list(RESOLUTIONS.keys()), index=0)
+        x_range = st.slider("X 范围", 0, w - 1, (0, w - 1))
+        y_range = st.slider("Y 范围", 0, h - 1, (0, h - 1))
+        backend = st.selectbox("渲染后端", list(RENDER_BACKENDS.keys()), index=0)
+        hover = st.checkbox("显示悬停数值", value=False, help="需要悬停数值时使用交互式渲染")
+    
+    return {
+        'x_range': x_range,
+        'y_range': y_range,
+        'level': RESOLUTIONS[resolution],
+        'max_cells': MAX_RENDER_CELLS,
+        'backend': "interactive" if hover else RENDER_BACKENDS[backend]
+    }
 
 
-def run_synthesis(p1: float, p2: float, p3: float, p4: float):
+def run_synthesis(p1: float, p2: float, p3: float, p4: float, slice_spec: tuple = None):
     """执行热力特性场预测"""
     
     # 检查文件
@@ -578,47 +335,40 @@ def run_synthesis(p1: float, p2: float, p3: float, p4: float):
         st.info("请将Excel数据文件放置于项目 data 文件夹下")
         return
     
+    # 三维网格只合成所选切片
+    grid = peek_shape(EXCEL_FILE_PATH)
+    if grid is not None and len(grid) > 2:
+        panels.basis_store.run_slice_synthesis(p1, p2, p3, p4, slice_spec)
+        return
+    
+    # 大网格基底（内存映射 .npy / Zarr）按块合成，不整体读入内存
+    if is_out_of_core(EXCEL_FILE_PATH):
+        panels.basis_store.run_out_of_core_synthesis(p1, p2, p3, p4)
+        return
+    
     try:
         with st.spinner("正在预测热力特性场..."):
-            # 读取Excel数据
-            df = pd.read_excel(EXCEL_FILE_PATH, header=None)
+            # 读取基底数据（已缓存）
+            with timed("synthesis.load_basis"):
+                basis = load_basis(EXCEL_FILE_PATH)
+                shape = basis_shape(EXCEL_FILE_PATH, (IMG_HEIGHT, IMG_WIDTH))
             
             # 验证数据
-            if df.shape[1] < 8:
-                st.error(f"❌ 数据文件需要至少8列，当前只有{df.shape[1]}列")
+            if not validate_basis(basis, shape):
                 return
             
-            expected_rows = IMG_HEIGHT * IMG_WIDTH
-            if df.shape[0] != expected_rows:
-                st.error(f"❌ 数据行数({df.shape[0]})与图像尺寸({expected_rows})不匹配")
+            # Excel 的 shape 工作表记录的三维尺寸只有读入后才知道
+            if len(shape) > 2:
+                panels.basis_store.run_slice_synthesis(p1, p2, p3, p4, slice_spec)
                 return
             
-            # 计算8个系数
-            coefficients = calculate_coefficients(p1, p2, p3, p4)
-            
-            # 加权合成
-            synthesized = np.zeros(df.shape[0])
-            for i in range(8):
-                synthesized += coefficients[i] * df.iloc[:, i].values
-            
-            # 重塑为图像
-            synthesized_img = synthesized.reshape(IMG_HEIGHT, IMG_WIDTH)
-            
-            # 计算流场数据（梯度）
-            v, u = np.gradient(synthesized_img)
-            v = -v  # 反转v方向以匹配坐标系
-            speed = np.sqrt(u**2 + v**2)
-            
-            flow_data = {
-                'u': u,
-                'v': v,
-                'speed': speed
-            }
+            def compute():
+                # 系数计算与加权合成经微批调度器执行，并发会话的请求合并为一次矩阵乘
+                return synthesize_coalesced((p1, p2, p3, p4), EXCEL_FILE_PATH, (IMG_HEIGHT, IMG_WIDTH))
             
-            # 保存到session state
-            st.session_state.synthesized_img = synthesized_img
-            st.session_state.flow_data = flow_data
-            st.session_state.calculated = True
+            # 相同基底与工况的结果在所有会话间只计算一次
+            key = basis_key(basis_digest(EXCEL_FILE_PATH), shape, (p1, p2, p3, p4))
+            store_result(key, compute, (p1, p2, p3, p4), "基底合成")
         
         st.success("✅ 预测完成！")
         st.rerun()
@@ -8,6 +8,14 @@ import time
 from components.header import render_header, render_section_header
 from components.charts import create_temperature_field
 from utils.calculations import run_heat_simulation
+from utils.profiling import timed
+from utils.probe import FieldProbe
+from utils.heat_preview import preview_field, remember_field
+
+# 输入停止变化多久后生成全分辨率温度场（秒）
+SETTLE_S = 0.8
+# 等待输入稳定期间温度场片段的轮询间隔（秒）
+SETTLE_POLL_S = 0.25
 
 def show():
     """渲染热传导分析页面"""
@@ -18,11 +26,12 @@ def show():
     # 输入参数
     with col1:
         params = render_heat_params()
+        note_params_change(params)
         
         if st.button("🔥 开始热分析", type="primary", use_container_width=True):
             run_heat_calculation(params)
     
-    # 可视化
+    # 可视化（输入未稳定时显示预览，稳定后由局部刷新的片段生成全分辨率结果）
     with col2:
         render_heat_visualization(params)
     
@@ -105,28 +114,114 @@ def render_heat_params() -> dict:
 
 def run_heat_calculation(params: dict):
     """执行热分析计算"""
+    # 点击开始热分析后，当前参数的全分辨率温度场立即生成，不再等待
+    st.session_state.heat_settled_key = params_key(params)
+    
     with st.spinner("正在进行热分析..."):
         time.sleep(1.5)
         
-        results = run_heat_simulation(params)
+        with timed("heat.simulation"):
+            results = run_heat_simulation(params)
         st.session_state.heat_results = results
     
     st.success("✅ 热分析完成！")
     st.rerun()
 
 
+def params_key(params: dict) -> tuple:
+    """温度场相关参数（精确值）"""
+    return (
+        params['heat_source'],
+        params['thermal_conductivity'],
+        params['ambient_temp'],
+        params['convection_coeff']
+    )
+
+
+def note_params_change(params: dict):
+    """记录温度场参数最近一次变化的时刻，用于判断输入是否已稳定"""
+    key = params_key(params)
+    if st.session_state.get('heat_params_key') != key:
+        st.session_state.heat_params_key = key
+        st.session_state.heat_changed_at = time.time()
+
+
 def render_heat_visualization(params: dict):
-    """渲染热场可视化"""
+    """
+    渲染热场可视化：当前参数已有全分辨率结果时直接显示，否则显示已记录的同档位结果或上一次结果
+    等待输入稳定期间温度场片段定时局部重跑（不阻塞页面其余部分），得到全分辨率结果后停止轮询
+    """
     render_section_header("🌡️ 温度场分布")
     
-    fig = create_temperature_field(
-        heat_source=params['heat_source'],
-        thermal_conductivity=params['thermal_conductivity'],
-        ambient_temp=params['ambient_temp'],
-        convection_coeff=params['convection_coeff']
-    )
+    full = st.session_state.get('heat_full')
+    settled = full is not None and full[0] == params_key(params)
+    st.fragment(render_heat_field, run_every=None if settled else SETTLE_POLL_S)(params)
+
+
+def render_heat_field(params: dict):
+    """温度场片段：全分辨率结果 → 直接显示；输入未稳定 → 预览（不求解）；已稳定 → 生成全分辨率结果"""
+    key = params_key(params)
+    full = st.session_state.get('heat_full')
+    if full is not None and full[0] == key:
+        with timed("render.plotly_chart"):
+            st.plotly_chart(full[1], use_container_width=True)
+        return
     
-    st.plotly_chart(fig, use_container_width=True)
+    waited = time.time() - st.session_state.get('heat_changed_at', 0.0)
+    if st.session_state.get('heat_settled_key') != key and waited < SETTLE_S:
+        with timed("heat.preview"):
+            fig = create_preview_chart(params)
+        if fig is not None:
+            caption = "⚡ 相近参数的已有结果（抽样） · 输入稳定后自动生成全分辨率结果"
+        elif full is not None:
+            fig, caption = full[1], "⏳ 显示上一次结果 · 输入稳定后自动生成全分辨率结果"
+        else:
+            st.caption("⏳ 输入稳定后自动生成温度场")
+            return
+        with timed("render.plotly_chart"):
+            st.plotly_chart(fig, use_container_width=True)
+        st.caption(caption)
+        return
+    
+    with st.spinner("⏳ 正在生成全分辨率结果..."):
+        with timed("heat.temperature_field"):
+            fig = create_temperature_field(
+                heat_source=params['heat_source'],
+                thermal_conductivity=params['thermal_conductivity'],
+                ambient_temp=params['ambient_temp'],
+                convection_coeff=params['convection_coeff']
+            )
+    remember_field(params, fig)
+    st.session_state.heat_full = (key, fig)
+    st.session_state.heat_settled_key = key
+    # 整页重跑一次：片段改为不轮询，直接显示全分辨率结果
+    st.rerun()
+
+
+def create_preview_chart(params: dict):
+    """预览图：同一量化档位已记录的全分辨率结果的抽样副本，未记录时返回 None"""
+    import plotly.graph_objects as go
+    
+    cached = preview_field(params)
+    if cached is None:
+        return None
+    x, y, temp = cached
+    fig = go.Figure(go.Heatmap(
+        z=temp,
+        x=x,
+        y=y,
+        colorscale='hot',
+        zsmooth='best',
+        colorbar=dict(title=dict(text="温度 (°C)", side="right"))
+    ))
+    fig.update_layout(
+        title="温度场预览（相近参数）",
+        xaxis_title="X (mm)",
+        yaxis_title="Y (mm)",
+        yaxis=dict(scaleanchor="x", scaleratio=1),
+        height=400
+    )
+    return fig
 
 
 def render_heat_results():
@@ -165,20 +260,25 @@ def render_heat_results():
     
     import plotly.graph_objects as go
     
-    x = results['x']
-    T_center = results['temperature_field'][25, :]  # 中心线温度
+    field = results['temperature_field']
+    h, w = field.shape
+    row = st.slider("剖面位置 (行)", 0, h - 1, h // 2, key="heat_profile_row")
+    
+    # 沿所选行取剖面，列下标映射回物理坐标
+    prof = FieldProbe({'temp': field}).profile([[0, row], [w - 1, row]], quantities=("temp",))
+    x = np.interp(prof['x'], np.arange(len(results['x'])), results['x'])
     
     fig = go.Figure()
     fig.add_trace(go.Scatter(
         x=x,
-        y=T_center,
+        y=prof['temp'],
         mode='lines',
-        name='中心线温度',
+        name=f'第 {row} 行温度',
         line=dict(color='red', width=2)
     ))
     
     fig.update_layout(
-        title="中心线温度分布",
+        title=f"第 {row} 行温度分布",
         xaxis_title="位置 (mm)",
         yaxis_title="温度 (°C)",
         height=300
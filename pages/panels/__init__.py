@@ -0,0 +1,30 @@
+"""
+热力场预测页面的功能面板
+每个面板的渲染/运行函数放在与其引擎同名的模块中（panels.transient ↔ utils.transient 等），
+按需导入：首次用到某面板时才加载该模块及其引擎依赖。
+common（会话状态与基底配置）与 charts（场图）为页面和面板共用，由页面直接导入。
+"""
+
+import importlib
+import importlib.util
+
+from utils.profiling import timed
+
+_loaded = {}
+
+
+def load_panel(name: str):
+    """按模块名加载面板（已加载的直接返回），首次导入计入启动计时"""
+    module = _loaded.get(name)
+    if module is None:
+        with timed(f"startup.import.panels.{name}"):
+            module = importlib.import_module(f"{__name__}.{name}")
+        _loaded[name] = module
+    return module
+
+
+def __getattr__(name: str):
+    # `panels.transient` 等写法同样走按需加载
+    if importlib.util.find_spec(f"{__name__}.{name}") is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return load_panel(name)
@@ -0,0 +1,125 @@
+"""
+异常检测面板：按逐像素基线检测结果中的异常，并在图上标注（引擎见 utils.anomaly）
+"""
+
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from pages.panels.charts import axis_ranges
+from pages.panels.common import EXCEL_FILE_PATH, basis_identity, session_refs
+from utils.anomaly import WelfordDetector, Z_THRESHOLD, MIN_SAMPLES, state_path
+from utils.field_result import FieldResult
+from utils.profiling import timed
+from utils.resource_cache import content_key
+
+# 异常检测基线状态（逐像素均值/方差，重启后恢复）
+ANOMALY_STATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "anomaly_state.npz")
+
+# 图上标注的异常像素点数上限
+MAX_ANOMALY_MARKERS = 2000
+
+
+@st.cache_resource(show_spinner=False)
+def get_detector(shape: tuple, tag: str) -> WelfordDetector:
+    """异常检测器（进程内按网格尺寸共享，状态从对应文件恢复）"""
+    return WelfordDetector.load(state_path(ANOMALY_STATE_PATH, shape), shape, tag=tag)
+
+
+def anomaly_tag() -> str:
+    """检测器标识：基底内容变化后基线重新积累（外存基底的摘要取自 BasisStore）"""
+    return basis_identity()[0] if os.path.exists(EXCEL_FILE_PATH) else ""
+
+
+def detect_anomalies(result) -> dict:
+    """
+    按当前阈值检测结果中的异常，无结果或基线不足时返回空字典
+    检测结果按 (结果, 基线版本, 阈值) 缓存，重绘时不再重复计算
+    """
+    if result is None or not st.session_state.get('calculated'):
+        return {}
+    detector = get_detector(result.shape, anomaly_tag())
+    if not detector.ready:
+        return {}
+    threshold = st.session_state.get('anomaly_z', Z_THRESHOLD)
+    
+    def compute():
+        with timed("anomaly.detect"):
+            return detector.detect(result, threshold)
+    
+    result_key = session_refs().key('result')
+    if result_key is None:
+        return compute()
+    key = content_key("anomaly", result_key, detector.tag, detector.version, threshold)
+    # 每个物理量一张与结果同尺寸的布尔掩码
+    return session_refs().get_or_create('anomaly', key, compute, nbytes=len(detector.quantities) * result.temp.size)
+
+
+def render_anomaly_panel(result: FieldResult, anomalies: dict):
+    """异常检测：阈值设置、检测结果、基线管理"""
+    detector = get_detector(result.shape, anomaly_tag())
+    
+    st.slider("z 分数阈值", 1.0, 8.0, Z_THRESHOLD, 0.5, key="anomaly_z")
+    st.checkbox("在图上标注异常", value=True, key="anomaly_overlay")
+    st.caption(f"基线样本数: {detector.count}")
+    
+    if not detector.ready:
+        st.info(f"基线样本不足（至少 {MIN_SAMPLES} 个），请将正常工况结果纳入基线")
+    else:
+        for label, q in (("温度", "temp"), ("速度", "speed")):
+            a = anomalies[q]
+            st.metric(
+                f"{label}异常像素",
+                f"{a['count']} ({a['fraction']:.1%})",
+                f"最大 |z| = {a['max_z']:.1f}",
+                delta_color="off"
+            )
+        n_regions = sum(len(a['regions']) for a in anomalies.values())
+        if n_regions:
+            st.warning(f"⚠️ 发现 {n_regions} 个异常区域")
+    
+    result_key = session_refs().key('result')
+    accepted = result_key in detector.accepted
+    c1, c2 = st.columns(2)
+    if c1.button("✅ 已在基线中" if accepted else "✅ 纳入基线", use_container_width=True,
+                 disabled=accepted, key="anomaly_accept"):
+        if detector.update(result, result_key):
+            detector.save(state_path(ANOMALY_STATE_PATH, detector.shape))
+        st.rerun()
+    if c2.button("🗑️ 清空基线", use_container_width=True, key="anomaly_reset"):
+        detector.reset()
+        detector.save(state_path(ANOMALY_STATE_PATH, detector.shape))
+        st.rerun()
+
+
+def overlay_anomalies(fig: go.Figure, anomalies: dict, view: dict) -> go.Figure:
+    """在（共享的）图表副本上叠加异常像素与异常区域"""
+    fig = go.Figure(fig)
+    x_range, y_range = axis_ranges(next(iter(anomalies.values()))['mask'].shape, view)
+    styles = {'temp': ("温度异常", "#D50000"), 'speed': ("速度异常", "#AA00FF")}
+    
+    for q, a in anomalies.items():
+        name, color = styles.get(q, (q, "#000000"))
+        ys, xs = np.nonzero(a['mask'])
+        inside = (xs >= x_range[0]) & (xs <= x_range[1]) & (ys >= y_range[0]) & (ys <= y_range[1])
+        xs, ys = xs[inside], ys[inside]
+        step = max(1, -(-len(xs) // MAX_ANOMALY_MARKERS))
+        if len(xs):
+            fig.add_trace(go.Scatter(
+                x=xs[::step], y=ys[::step],
+                mode='markers',
+                marker=dict(symbol='x', size=4, color=color),
+                name=name,
+                hoverinfo='skip'
+            ))
+        for x0, x1, y0, y1 in a['regions']:
+            fig.add_shape(
+                type="rect",
+                x0=x0 - 0.5, x1=x1 + 0.5, y0=y0 - 0.5, y1=y1 + 0.5,
+                line=dict(color=color, width=2)
+            )
+    
+    fig.update_layout(showlegend=True, legend=dict(orientation="h", y=-0.08))
+    return fig
@@ -0,0 +1,157 @@
+"""
+外存与三维基底的预测（引擎见 utils.basis_store）
+- 大网格基底逐块合成降采样视图与全分辨率统计，全分辨率结果可逐块导出
+- 三维基底只合成所选切片（轴向平面或任意平面）
+"""
+
+import os
+
+import streamlit as st
+
+from pages.panels.common import EXCEL_FILE_PATH, get_basis_store, session_refs, store_result
+from utils.basis_store import BasisStore, is_out_of_core, peek_shape
+from utils.field_result import FieldResult
+from utils.field_stats import summarize
+from utils.predict import build_result
+from utils.profiling import timed
+from utils.pyramid import MAX_RENDER_CELLS
+from utils.resource_cache import content_key
+from utils.settings import get_settings
+from utils.synthesis import calculate_coefficients, load_basis, basis_shape, basis_digest
+
+# 三维基底的切片方式；网格轴按 (Z, Y, X) 排列
+SLICE_MODES = {
+    "轴向平面": "axis",
+    "任意平面": "plane"
+}
+
+AXIS_LABELS = ("Z", "Y", "X")
+
+DEFAULT_NORMAL = (1.0, 0.0, 1.0)
+
+
+def run_out_of_core_synthesis(p1: float, p2: float, p3: float, p4: float):
+    """
+    大网格基底的预测：逐块合成得到降采样视图（不超过 MAX_RENDER_CELLS 个单元）与全分辨率温度统计，
+    整个场从不驻留内存；全分辨率结果可逐块导出
+    """
+    try:
+        with st.spinner("正在按块合成热力特性场..."):
+            store = get_basis_store(EXCEL_FILE_PATH, os.path.getmtime(EXCEL_FILE_PATH))
+            if len(store.shape) != 2:
+                st.error(f"❌ 暂不支持 {len(store.shape)} 维网格 {store.shape} 的基底")
+                return
+            
+            params = (p1, p2, p3, p4)
+            coefficients = calculate_coefficients(*params)
+            factor = store.downsample_factor(MAX_RENDER_CELLS)
+            
+            def compute():
+                with timed("synthesis.out_of_core.view"):
+                    view = store.downsample(coefficients, factor)
+                result = FieldResult.from_field(view)
+                with timed("synthesis.out_of_core.stats"):
+                    result.stats = {'temp': store.summarize(coefficients), 'speed': summarize(result.speed)}
+                return result
+            
+            key = content_key("basis_out_of_core", store.digest, store.shape, factor, p1, p2, p3, p4)
+            store_result(key, compute, params, "基底合成（外存）")
+            st.session_state.out_of_core = {'key': key, 'params': params, 'factor': factor, 'shape': store.shape}
+        
+        st.success("✅ 预测完成！")
+        st.rerun()
+        
+    except Exception as e:
+        st.error(f"❌ 预测失败: {str(e)}")
+
+
+def export_full_resolution(info: dict) -> str:
+    """把外存结果的全分辨率温度场逐块写入输出目录（系统设置 → 输出目录）"""
+    store = get_basis_store(EXCEL_FILE_PATH, os.path.getmtime(EXCEL_FILE_PATH))
+    out_dir = get_settings().advanced.output_dir
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"field_{info['key'][:12]}.npy")
+    with timed("synthesis.out_of_core.export"):
+        return store.to_npy(calculate_coefficients(*info['params']), path)
+
+
+def render_slice_controls():
+    """三维基底的切片控件 → 切片描述 ('axis', 轴, 层) / ('plane', 中心, 法向)；二维基底返回 None"""
+    grid = peek_shape(EXCEL_FILE_PATH) if os.path.exists(EXCEL_FILE_PATH) else None
+    grid = grid or st.session_state.get('slice_state', {}).get('shape')
+    if grid is None or len(grid) != 3:
+        return None
+    
+    with st.expander("🧊 三维切片", expanded=True):
+        mode = st.radio("切片方式", list(SLICE_MODES.keys()), horizontal=True)
+        if SLICE_MODES[mode] == "axis":
+            axis = st.selectbox("法向轴", range(3), index=0,
+                                format_func=lambda i: f"{AXIS_LABELS[i]} 轴（{grid[i]} 层）")
+            index = st.slider("层位置", 0, grid[axis] - 1, grid[axis] // 2)
+            return ("axis", int(axis), int(index))
+        
+        st.caption("中心与法向以网格下标为单位")
+        center, normal = [], []
+        for i, col in enumerate(st.columns(3)):
+            with col:
+                center.append(st.number_input(f"中心 {AXIS_LABELS[i]}", 0.0, float(grid[i] - 1),
+                                              float(grid[i] // 2), 1.0, key=f"slice_center_{i}"))
+                normal.append(st.number_input(f"法向 {AXIS_LABELS[i]}", -1.0, 1.0,
+                                              DEFAULT_NORMAL[i], 0.1, key=f"slice_normal_{i}"))
+        return ("plane", tuple(center), tuple(normal))
+
+
+def slice_store() -> BasisStore:
+    """切片用的基底：大文件内存映射，否则包装已缓存的内存基底（不复制）"""
+    if is_out_of_core(EXCEL_FILE_PATH):
+        return get_basis_store(EXCEL_FILE_PATH, os.path.getmtime(EXCEL_FILE_PATH))
+    return BasisStore(load_basis(EXCEL_FILE_PATH), basis_shape(EXCEL_FILE_PATH), basis_digest(EXCEL_FILE_PATH))
+
+
+def compute_slice(store: BasisStore, params: tuple, spec: tuple) -> FieldResult:
+    """只合成切片上的单元，得到与二维结果相同接口的 FieldResult（统计量为切片上的统计）"""
+    coefficients = calculate_coefficients(*params)
+    with timed("synthesis.slice"):
+        if spec[0] == "axis":
+            field = store.axis_slice(coefficients, spec[1], spec[2])
+        else:
+            field = store.plane_slice(coefficients, spec[1], spec[2])[0]
+    return build_result(field)
+
+
+def run_slice_synthesis(p1: float, p2: float, p3: float, p4: float, spec: tuple = None):
+    """三维基底的预测：不合成整个三维场，只计算所选切片"""
+    try:
+        with st.spinner("正在合成切片..."):
+            store = slice_store()
+            if len(store.shape) != 3:
+                st.error(f"❌ 暂不支持 {len(store.shape)} 维网格 {store.shape} 的基底")
+                return
+            
+            params = (p1, p2, p3, p4)
+            spec = spec or ("axis", 0, store.shape[0] // 2)
+            key = content_key("basis_slice", store.digest, store.shape, spec, *params)
+            store_result(key, lambda: compute_slice(store, params, spec), params, "基底合成（切片）")
+            st.session_state.slice_state = {'key': key, 'params': params, 'spec': spec, 'shape': store.shape}
+        
+        st.success("✅ 预测完成！")
+        st.rerun()
+        
+    except Exception as e:
+        st.error(f"❌ 预测失败: {str(e)}")
+
+
+def refresh_slice(spec: tuple):
+    """切片位置改变时，按上次运行的工况重新切片（不追加预测记录）→ 新结果，无需更新时返回 None"""
+    state = st.session_state.get('slice_state')
+    if state is None or state['spec'] == spec or state['key'] != session_refs().key('result'):
+        return None
+    try:
+        store = slice_store()
+        key = content_key("basis_slice", store.digest, store.shape, spec, *state['params'])
+        result = session_refs().get_or_create('result', key, lambda: compute_slice(store, state['params'], spec))
+    except ValueError as e:
+        st.warning(f"⚠️ {e}")
+        return None
+    st.session_state.slice_state = dict(state, key=key, spec=spec)
+    return result
@@ -0,0 +1,514 @@
+"""
+热力场预测图表
+- 热力图、等值线图（交互式或服务端栅格）、矢量图、流线图、组合图
+- 按视图范围与分辨率从多分辨率金字塔取数
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+
+from pages.panels.common import IMG_HEIGHT, IMG_WIDTH, field_colormap, chart_height
+from utils.derived import QUANTITIES as DERIVED_QUANTITIES
+from utils.kernels import trace_streamlines, polyline, arrow_endpoints
+from utils.profiling import timed
+from utils.pyramid import FieldPyramid, MAX_RENDER_CELLS
+
+# 服务端等值线数量
+N_CONTOUR_LEVELS = 15
+
+# 每条流线的最大追踪步数
+N_STREAMLINE_STEPS = 25
+
+LAYER_CHARTS = ("heatmap", "contour")
+
+
+def create_chart(img_data: np.ndarray, flow_data: dict, chart_type: str,
+                 view: dict = None, pyramids: dict = None, layer: str = "temp") -> go.Figure:
+    """根据类型创建图表；热力图/等值线图显示 layer 指定的物理量（温度或派生量）"""
+    pyramids = pyramids or {}
+    temp = pyramids.get('temp') or FieldPyramid(img_data)
+    if chart_type in LAYER_CHARTS and layer != "temp":
+        label = DERIVED_QUANTITIES[layer]
+        field = flow_data[layer]
+        pyramid = pyramids.get(layer) or FieldPyramid(field)
+        if (view or {}).get('backend') == "raster":
+            return create_raster_chart(field, chart_type, view, pyramid, label)
+        if chart_type == "heatmap":
+            return create_heatmap_chart(field, view, pyramid, label)
+        return create_contour_chart(field, view, pyramid, label)
+    if (view or {}).get('backend') == "raster" and chart_type in LAYER_CHARTS:
+        return create_raster_chart(img_data, chart_type, view, temp)
+    if chart_type == "heatmap":
+        return create_heatmap_chart(img_data, view, temp)
+    elif chart_type == "contour":
+        return create_contour_chart(img_data, view, temp)
+    
+    speed = pyramids.get('speed') or FieldPyramid(flow_data['speed'])
+    if chart_type == "vector":
+        return create_vector_chart(img_data, flow_data, view, speed)
+    elif chart_type == "streamline":
+        return create_streamline_chart(img_data, flow_data, view, temp)
+    elif chart_type == "combined":
+        return create_combined_chart(img_data, flow_data, view, temp)
+    return create_heatmap_chart(img_data, view, temp)
+
+
+def field_view(field: np.ndarray, view: dict = None, pyramid: FieldPyramid = None) -> tuple:
+    """按视图范围与分辨率从金字塔取数据 → (z, x, y, 标题后缀)"""
+    view = view or {}
+    pyramid = pyramid or FieldPyramid(field)
+    z, x, y, level = pyramid.view(
+        view.get('x_range'),
+        view.get('y_range'),
+        view.get('max_cells', MAX_RENDER_CELLS),
+        view.get('level')
+    )
+    size = f"{field.shape[0]}×{field.shape[1]}"
+    if level > 0:
+        size += f" · 显示 1:{2 ** level}"
+    return z, x, y, size
+
+
+def axis_ranges(shape: tuple, view: dict = None) -> tuple:
+    """坐标轴范围 (x_range, y_range)"""
+    view = view or {}
+    x_range = view.get('x_range') or (0, shape[1])
+    y_range = view.get('y_range') or (0, shape[0])
+    return list(x_range), list(y_range)
+
+
+@timed("chart.heatmap")
+def create_heatmap_chart(img_data: np.ndarray, view: dict = None,
+                         pyramid: FieldPyramid = None, label: str = "温度") -> go.Figure:
+    """热力图"""
+    z, x, y, size = field_view(img_data, view, pyramid)
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Heatmap(
+        z=z,
+        x=x,
+        y=y,
+        colorscale=field_colormap(),
+        colorbar=dict(
+            title=dict(text=f"{label}值", side="right"),
+            thickness=15,
+            len=0.9
+        )
+    ))
+    
+    fig.update_layout(
+        title=dict(
+            text=f"{label}场热力图 ({size})",
+            x=0.5,
+            font=dict(size=14, color="#333")
+        ),
+        xaxis=dict(
+            title="X 位置",
+            scaleanchor="y",
+            scaleratio=1,
+            showgrid=False
+        ),
+        yaxis=dict(
+            title="Y 位置",
+            autorange="reversed",
+            showgrid=False
+        ),
+        height=chart_height(),
+        margin=dict(l=50, r=20, t=50, b=40)
+    )
+    
+    return fig
+
+
+@timed("chart.contour")
+def create_contour_chart(img_data: np.ndarray, view: dict = None,
+                         pyramid: FieldPyramid = None, label: str = "温度") -> go.Figure:
+    """等值线图"""
+    z, x, y, size = field_view(img_data, view, pyramid)
+    
+    fig = go.Figure()
+    
+    # 填充等值线
+    fig.add_trace(go.Contour(
+        z=z,
+        x=x,
+        y=y,
+        colorscale=field_colormap(),
+        contours=dict(
+            showlabels=True,
+            labelfont=dict(size=9, color='white')
+        ),
+        colorbar=dict(
+            title=dict(text=f"{label}值", side="right"),
+            thickness=15,
+            len=0.9
+        ),
+        line=dict(width=1)
+    ))
+    
+    fig.update_layout(
+        title=dict(
+            text=f"{label}场等值线图 ({size})",
+            x=0.5,
+            font=dict(size=14, color="#333")
+        ),
+        xaxis=dict(
+            title="X 位置",
+            scaleanchor="y",
+            scaleratio=1,
+            showgrid=False
+        ),
+        yaxis=dict(
+            title="Y 位置",
+            autorange="reversed",
+            showgrid=False
+        ),
+        height=chart_height(),
+        margin=dict(l=50, r=20, t=50, b=40)
+    )
+    
+    return fig
+
+
+@timed("chart.raster")
+def create_raster_chart(img_data: np.ndarray, chart_type: str, view: dict = None,
+                        pyramid: FieldPyramid = None, label: str = "温度") -> go.Figure:
+    """服务端渲染的热力图/等值线图：PNG 图像 + 服务端计算的等值线"""
+    from utils.raster import rasterize, encode_png, png_data_uri, contour_lines, contour_levels
+    
+    z, x, y, size = field_view(img_data, view, pyramid)
+    zmin, zmax = float(np.nanmin(z)), float(np.nanmax(z))
+    
+    levels = None
+    if chart_type == "contour":
+        levels = contour_levels(z, N_CONTOUR_LEVELS)
+    
+    png = encode_png(rasterize(z, field_colormap(), zmin, zmax, levels=levels))
+    dx = x[1] - x[0] if len(x) > 1 else 1
+    dy = y[1] - y[0] if len(y) > 1 else 1
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Image(
+        source=png_data_uri(png),
+        x0=x[0],
+        dx=dx,
+        y0=y[0],
+        dy=dy,
+        hoverinfo='skip'
+    ))
+    
+    # 颜色条（图像迹线不带颜色条）
+    fig.add_trace(go.Scatter(
+        x=[None],
+        y=[None],
+        mode='markers',
+        marker=dict(
+            colorscale=field_colormap(),
+            cmin=zmin,
+            cmax=zmax,
+            color=[zmin],
+            showscale=True,
+            colorbar=dict(
+                title=dict(text=f"{label}值", side="right"),
+                thickness=15,
+                len=0.9
+            )
+        ),
+        showlegend=False,
+        hoverinfo='skip'
+    ))
+    
+    annotations = []
+    if levels is not None:
+        line_x, line_y = [], []
+        ix, iy = np.arange(len(x)), np.arange(len(y))
+        for level in levels:
+            lines = contour_lines(z, level)
+            for line in lines:
+                line_x.extend(np.interp(line[:, 0], ix, x).tolist() + [None])
+                line_y.extend(np.interp(line[:, 1], iy, y).tolist() + [None])
+            
+            # 标签：标注在该等值线最长折线的中点
+            if lines:
+                longest = max(lines, key=len)
+                if len(longest) >= 8:
+                    mx, my = longest[len(longest) // 2]
+                    annotations.append(dict(
+                        x=float(np.interp(mx, ix, x)),
+                        y=float(np.interp(my, iy, y)),
+                        text=f"{level:.3g}",
+                        showarrow=False,
+                        font=dict(size=9, color='white')
+                    ))
+        
+        fig.add_trace(go.Scatter(
+            x=line_x,
+            y=line_y,
+            mode='lines',
+            line=dict(color='rgba(0,0,0,0.6)', width=1),
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+    
+    title = f"{label}场等值线图" if chart_type == "contour" else f"{label}场热力图"
+    fig.update_layout(
+        title=dict(
+            text=f"{title} ({size} · 服务端渲染)",
+            x=0.5,
+            font=dict(size=14, color="#333")
+        ),
+        xaxis=dict(
+            title="X 位置",
+            scaleanchor="y",
+            scaleratio=1,
+            showgrid=False
+        ),
+        yaxis=dict(
+            title="Y 位置",
+            autorange="reversed",
+            showgrid=False
+        ),
+        height=chart_height(),
+        margin=dict(l=50, r=20, t=50, b=40),
+        annotations=annotations
+    )
+    
+    return fig
+
+
+@timed("chart.vector")
+def create_vector_chart(img_data: np.ndarray, flow_data: dict, view: dict = None,
+                        pyramid: FieldPyramid = None) -> go.Figure:
+    """流场矢量图（统一箭头大小）"""
+    h, w = img_data.shape
+    z, zx, zy, size = field_view(flow_data['speed'], view, pyramid)
+    x_range, y_range = axis_ranges((h, w), view)
+    
+    # 降采样（大网格时按尺寸放大步长，控制箭头数量）
+    step = max(8, int(np.ceil(max(h, w) / 24)))
+    
+    fig = go.Figure()
+    
+    # 背景：速度大小热力图
+    fig.add_trace(go.Heatmap(
+        z=z,
+        x=zx,
+        y=zy,
+        colorscale='Blues',
+        opacity=0.6,
+        colorbar=dict(
+            title=dict(text="速度大小", side="right"),
+            thickness=15,
+            len=0.9,
+            x=1.02
+        )
+    ))
+    
+    # 创建箭头（统一箭头大小，端点一次向量化算出）
+    annotations = arrow_annotations(flow_data, step, 5 * step / 8, width=1.5, color="red")
+    
+    fig.update_layout(
+        title=dict(
+            text=f"流场矢量图 ({size})",
+            x=0.5,
+            font=dict(size=14, color="#333")
+        ),
+        xaxis=dict(
+            title="X 位置",
+            scaleanchor="y",
+            scaleratio=1,
+            showgrid=False,
+            range=x_range
+        ),
+        yaxis=dict(
+            title="Y 位置",
+            showgrid=False,
+            range=y_range[::-1]
+        ),
+        height=chart_height(),
+        margin=dict(l=50, r=70, t=50, b=40),
+        annotations=annotations
+    )
+    
+    return fig
+
+
+@timed("chart.streamline")
+def create_streamline_chart(img_data: np.ndarray, flow_data: dict, view: dict = None,
+                            pyramid: FieldPyramid = None) -> go.Figure:
+    """流线图"""
+    h, w = img_data.shape
+    z, x, y, size = field_view(img_data, view, pyramid)
+    x_range, y_range = axis_ranges((h, w), view)
+    
+    fig = go.Figure()
+    
+    # 背景：温度场热力图
+    fig.add_trace(go.Heatmap(
+        z=z,
+        x=x,
+        y=y,
+        colorscale=field_colormap(),
+        opacity=0.5,
+        colorbar=dict(
+            title=dict(text="温度值", side="right"),
+            thickness=15,
+            len=0.9
+        )
+    ))
+    
+    # 生成流线起点（大网格时按尺寸放大间距与步长）
+    step = max(6, int(np.ceil(max(h, w) / 32)))
+    ds = 2.0 * step / 6
+    seeds_y, seeds_x = np.mgrid[0:h:step * 2, 0:w:step * 2]
+    
+    # 所有起点一次追踪（numba 编译版或 NumPy 向量化版），全部流线合并为一条以 NaN 分隔的折线
+    with timed("kernel.streamlines"):
+        xs, ys = polyline(*trace_streamlines(
+            flow_data['u'], flow_data['v'], flow_data['speed'],
+            seeds_x.ravel(), seeds_y.ravel(), ds, N_STREAMLINE_STEPS
+        ))
+    fig.add_trace(go.Scatter(
+        x=xs,
+        y=ys,
+        mode='lines',
+        line=dict(color='white', width=1.2),
+        connectgaps=False,
+        showlegend=False,
+        hoverinfo='skip'
+    ))
+    
+    fig.update_layout(
+        title=dict(
+            text=f"流线分布图 ({size})",
+            x=0.5,
+            font=dict(size=14, color="#333")
+        ),
+        xaxis=dict(
+            title="X 位置",
+            scaleanchor="y",
+            scaleratio=1,
+            showgrid=False,
+            range=x_range
+        ),
+        yaxis=dict(
+            title="Y 位置",
+            showgrid=False,
+            range=y_range[::-1]
+        ),
+        height=chart_height(),
+        margin=dict(l=50, r=20, t=50, b=40)
+    )
+    
+    return fig
+
+
+@timed("chart.combined")
+def create_combined_chart(img_data: np.ndarray, flow_data: dict, view: dict = None,
+                          pyramid: FieldPyramid = None) -> go.Figure:
+    """组合图（等值线+矢量）"""
+    h, w = img_data.shape
+    z, zx, zy, size = field_view(img_data, view, pyramid)
+    x_range, y_range = axis_ranges((h, w), view)
+    
+    # 降采样
+    step = max(10, int(np.ceil(max(h, w) / 19)))
+    
+    fig = go.Figure()
+    
+    # 等值线填充
+    fig.add_trace(go.Contour(
+        z=z,
+        x=zx,
+        y=zy,
+        colorscale=field_colormap(),
+        opacity=0.7,
+        contours=dict(showlabels=False),
+        colorbar=dict(
+            title=dict(text="温度值", side="right"),
+            thickness=15,
+            len=0.9
+        ),
+        line=dict(width=0.5, color='white')
+    ))
+    
+    # 矢量箭头
+    annotations = arrow_annotations(flow_data, step, 6 * step / 10, width=1.5, color="black")
+    
+    fig.update_layout(
+        title=dict(
+            text=f"等值线+矢量组合图 ({size})",
+            x=0.5,
+            font=dict(size=14, color="#333")
+        ),
+        xaxis=dict(
+            title="X 位置",
+            scaleanchor="y",
+            scaleratio=1,
+            showgrid=False,
+            range=x_range
+        ),
+        yaxis=dict(
+            title="Y 位置",
+            showgrid=False,
+            range=y_range[::-1]
+        ),
+        height=chart_height(),
+        margin=dict(l=50, r=20, t=50, b=40),
+        annotations=annotations
+    )
+    
+    return fig
+
+
+def arrow_annotations(flow_data: dict, step: int, scale: float, width: float, color: str) -> list:
+    """每隔 step 个单元一个归一化箭头（长度 scale）的 Plotly 标注"""
+    with timed("kernel.arrows"):
+        x0, y0, x1, y1 = arrow_endpoints(flow_data['u'], flow_data['v'], flow_data['speed'], step, scale)
+    return [
+        dict(x=xe, y=ye, ax=xs, ay=ys, xref="x", yref="y", axref="x", ayref="y", showarrow=True,
+             arrowhead=2, arrowsize=1, arrowwidth=width, arrowcolor=color)
+        for xs, ys, xe, ye in zip(x0.tolist(), y0.tolist(), x1.tolist(), y1.tolist())
+    ]
+
+
+def create_empty_chart() -> go.Figure:
+    """空白占位图"""
+    fig = go.Figure()
+    
+    # 边框
+    fig.add_shape(
+        type="rect",
+        x0=0, y0=0, x1=IMG_WIDTH, y1=IMG_HEIGHT,
+        fillcolor="rgba(240, 248, 255, 0.5)",
+        line=dict(color="#1565C0", width=2, dash="dash")
+    )
+    
+    # 提示文字
+    fig.add_annotation(
+        x=IMG_WIDTH/2, y=IMG_HEIGHT/2,
+        text="等待预测...",
+        font=dict(size=20, color="#1565C0"),
+        showarrow=False
+    )
+    
+    fig.update_layout(
+        xaxis=dict(
+            range=[-5, IMG_WIDTH+5],
+            scaleanchor="y",
+            scaleratio=1,
+            showgrid=False,
+            showticklabels=False
+        ),
+        yaxis=dict(
+            range=[IMG_HEIGHT+5, -5],
+            showgrid=False,
+            showticklabels=False
+        ),
+        height=chart_height(),
+        margin=dict(l=20, r=20, t=20, b=20)
+    )
+    
+    return fig
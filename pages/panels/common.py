@@ -0,0 +1,136 @@
+"""
+热力场预测页面与各面板共用的会话状态与基底配置
+- 基底文件路径与默认网格尺寸
+- 会话持有的共享结果、预测记录
+- 显示设置（颜色映射、图表高度）与坐标/读数文本解析
+"""
+
+import os
+
+import numpy as np
+import streamlit as st
+
+from utils.basis_store import BasisStore, is_out_of_core
+from utils.predict import BASIS_PATH, check_basis
+from utils.resource_cache import STORE, SessionRefs
+from utils.settings import get_settings
+from utils.synthesis import basis_shape, basis_digest
+
+# ==================== 后台固定配置 ====================
+# 基底数据文件：默认为 data/8张图.xlsx，可用环境变量 CFD_BASIS_PATH 指定其他文件（如大网格 .npy / Zarr 基底）
+# 例如 CFD_BASIS_PATH=D:\data\basis_3d.npy streamlit run app.py
+EXCEL_FILE_PATH = BASIS_PATH
+
+# 默认图像尺寸（数据文件未记录尺寸时使用）
+IMG_HEIGHT = 190
+IMG_WIDTH = 87
+
+# 会话内保留的预测记录条数
+HISTORY_LIMIT = 100
+
+
+@st.cache_resource(show_spinner=False)
+def get_basis_store(basis_path: str, basis_mtime: float) -> BasisStore:
+    """外存基底（内存映射，按基底文件修改时间缓存）"""
+    return BasisStore.open(basis_path, default_shape=(IMG_HEIGHT, IMG_WIDTH))
+
+
+def basis_identity() -> tuple:
+    """
+    当前基底的 (内容摘要, 网格尺寸)
+    外存基底取自内存映射的 BasisStore，不把基底整体读入内存；其余取自已缓存的内存基底
+    """
+    if is_out_of_core(EXCEL_FILE_PATH):
+        store = get_basis_store(EXCEL_FILE_PATH, os.path.getmtime(EXCEL_FILE_PATH))
+        return store.digest, store.shape
+    return basis_digest(EXCEL_FILE_PATH), basis_shape(EXCEL_FILE_PATH, (IMG_HEIGHT, IMG_WIDTH))
+
+
+def in_memory_basis(feature: str) -> bool:
+    """需要整体读入基底的功能在外存基底下停用并提示 → 当前基底是否可用"""
+    if is_out_of_core(EXCEL_FILE_PATH):
+        st.info(f"ℹ️ 当前为外存基底（{EXCEL_FILE_PATH}），{feature}需要将基底整体读入内存，已停用")
+        return False
+    return True
+
+
+def validate_basis(basis: np.ndarray, shape: tuple) -> bool:
+    """检查基底数据尺寸"""
+    try:
+        check_basis(basis, shape)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return False
+    return True
+
+
+def session_refs() -> SessionRefs:
+    """当前会话持有的共享资源键"""
+    if 'shared_refs' not in st.session_state:
+        st.session_state.shared_refs = SessionRefs(STORE)
+    return st.session_state.shared_refs
+
+
+def store_result(key: str, compute, params: tuple, engine: str):
+    """取得（必要时计算）共享结果，会话只保存其键；同时追加一条预测记录"""
+    result = session_refs().get_or_create('result', key, compute)
+    st.session_state.calculated = True
+    st.session_state.result_inputs = {'params': tuple(params), 'engine': engine}
+    
+    history = st.session_state.setdefault('prediction_history', [])
+    history.append(history_record(params, engine, result.stats))
+    del history[:-HISTORY_LIMIT]
+
+
+def history_record(params: tuple, engine: str, stats: dict) -> dict:
+    """预测记录：输入参数 + 统计摘要"""
+    import time
+    p1, p2, p3, p4 = params
+    return {
+        'time': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'engine': engine,
+        'params': f"水温={p1:.1f}°C, 流量={p2:.1f}m³/s, 压力={p3:.2f}kPa, 热负荷={p4:.0f}MW",
+        'max': stats['temp']['max'],
+        'min': stats['temp']['min'],
+        'mean': stats['temp']['mean'],
+        'std': stats['temp']['std'],
+        'speed_max': stats['speed']['max'],
+        'speed_mean': stats['speed']['mean']
+    }
+
+
+def get_result():
+    """当前会话的结果（FieldResult），无结果时返回 None"""
+    if 'shared_refs' not in st.session_state:
+        return None
+    return st.session_state.shared_refs.get('result')
+
+
+def field_colormap() -> str:
+    """场图颜色映射（系统设置 → 默认颜色映射）"""
+    return get_settings().display.default_colormap.lower()
+
+
+def chart_height() -> int:
+    """场图高度（系统设置 → 默认图表高度）"""
+    return get_settings().display.chart_height
+
+
+def parse_points(text: str):
+    """解析每行一个 x,y 的坐标文本；为空或格式错误时返回 None"""
+    rows = [line.replace('，', ',').split(',') for line in (text or "").splitlines() if line.strip()]
+    if not rows:
+        return None
+    try:
+        return np.array([[float(r[0]), float(r[1])] for r in rows])
+    except (ValueError, IndexError):
+        return None
+
+
+def parse_values(text: str):
+    """解析每行一个数值的文本；为空或格式错误时返回 None"""
+    try:
+        values = [float(line.replace('，', ',').split(',')[-1]) for line in (text or "").splitlines() if line.strip()]
+    except ValueError:
+        return None
+    return np.array(values) if values else None
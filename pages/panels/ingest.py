@@ -0,0 +1,131 @@
+"""
+实时数据接入面板：选择数据源并启停接入器，滚动窗口由后台持续更新（引擎见 utils.ingest）
+"""
+
+import os
+
+import streamlit as st
+
+from pages.panels.common import EXCEL_FILE_PATH, IMG_HEIGHT, IMG_WIDTH, store_result, validate_basis, in_memory_basis
+from utils.ingest import DEBOUNCE_S, LiveAttachment, file_tail, socket_source, mock_opc_source, find_ingestor
+from utils.resource_cache import content_key
+from utils.synthesis import load_basis, basis_shape, basis_digest
+
+# 实时数据源选项
+LIVE_SOURCES = {
+    "模拟 OPC": "mock",
+    "文件追踪": "file",
+    "Socket": "socket"
+}
+
+# 实时面板刷新间隔（秒）
+LIVE_REFRESH_S = 1.0
+
+
+def render_live_section(base: tuple):
+    """实时数据接入：选择数据源并启停接入器，结果窗口由后台持续更新"""
+    with st.expander("📡 实时数据接入"):
+        if not in_memory_basis("实时数据接入"):
+            return
+        
+        source = st.radio("数据源", list(LIVE_SOURCES.keys()), horizontal=True, key="live_source")
+        kind = LIVE_SOURCES[source]
+        
+        if kind == "mock":
+            interval = st.number_input("推送间隔 (s)", 0.05, 10.0, 0.2, 0.05, key="live_interval")
+            spec = f"mock:{interval}:{base}"
+            factory = lambda: mock_opc_source(base, interval)
+        elif kind == "file":
+            path = st.text_input("数据文件路径（CSV 或 JSON 行）", value="data/plant_stream.csv", key="live_path")
+            spec = f"file:{path}"
+            factory = lambda: file_tail(path)
+        else:
+            c1, c2 = st.columns(2)
+            host = c1.text_input("主机", value="127.0.0.1", key="live_host")
+            port = c2.number_input("端口", 1, 65535, 9000, 1, key="live_port")
+            spec = f"socket:{host}:{port}"
+            factory = lambda: socket_source(host, int(port))
+        
+        debounce = st.slider("去抖时间 (s)", 0.0, 5.0, DEBOUNCE_S, 0.1, key="live_debounce")
+        
+        b1, b2 = st.columns(2)
+        start_clicked = b1.button("▶️ 启动接入", use_container_width=True, key="live_start")
+        stop_clicked = b2.button("⏹️ 停止接入", use_container_width=True, key="live_stop")
+        
+        if start_clicked:
+            # 去抖参数属于数据源描述：不同去抖设置的会话各自使用独立的接入器
+            start_live(f"{spec}:debounce={debounce}", factory, debounce)
+        if stop_clicked:
+            live_attachment().detach()
+        
+        spec = live_attachment().spec
+        if spec is not None:
+            render_live_panel(spec)
+
+
+def live_attachment() -> LiveAttachment:
+    """当前会话引用的接入器（切换数据源时释放旧的，会话结束时自动释放）"""
+    if 'live_attachment' not in st.session_state:
+        st.session_state.live_attachment = LiveAttachment()
+    return st.session_state.live_attachment
+
+
+def start_live(spec: str, factory, debounce: float):
+    """启动（或接入已在运行的）数据源接入器，并释放本会话之前接入的数据源"""
+    if not os.path.exists(EXCEL_FILE_PATH):
+        st.error(f"❌ 数据文件不存在: {EXCEL_FILE_PATH}")
+        return
+    
+    basis = load_basis(EXCEL_FILE_PATH)
+    shape = basis_shape(EXCEL_FILE_PATH, (IMG_HEIGHT, IMG_WIDTH))
+    if not validate_basis(basis, shape):
+        return
+    
+    live_attachment().attach(spec, factory, basis, shape, basis_digest(EXCEL_FILE_PATH), debounce=debounce)
+
+
+@st.fragment(run_every=LIVE_REFRESH_S)
+def render_live_panel(spec: str):
+    """接入状态与滚动窗口（局部定时刷新，只读取后台已算好的结果）"""
+    ingestor = find_ingestor(spec)
+    if ingestor is None:
+        st.caption("接入器未运行")
+        return
+    
+    status = ingestor.status()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("状态", "运行中" if status['running'] else "已停止")
+    c2.metric("接收测点", status['received'])
+    c3.metric("完成预测", status['predicted'])
+    c4.metric("批次", status['batches'])
+    if status['error']:
+        st.error(f"❌ 接入失败: {status['error']}")
+    
+    window = ingestor.snapshot()
+    if not window:
+        st.caption("等待数据...")
+        return
+    
+    latest = window[-1]
+    stats = latest['result'].stats
+    p1, p2, p3, p4 = latest['params']
+    st.caption(f"最新工况：水温={p1:.2f}°C, 流量={p2:.2f}m³/s, 压力={p3:.3f}kPa, 热负荷={p4:.1f}MW")
+    
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("最大值", f"{stats['temp']['max']:.4f}")
+    m2.metric("最小值", f"{stats['temp']['min']:.4f}")
+    m3.metric("平均值", f"{stats['temp']['mean']:.4f}")
+    m4.metric("最大速度", f"{stats['speed']['max']:.4f}")
+    
+    import pandas as pd
+    trend = pd.DataFrame({
+        "最大值": [s['result'].stats['temp']['max'] for s in window],
+        "平均值": [s['result'].stats['temp']['mean'] for s in window],
+        "最小值": [s['result'].stats['temp']['min'] for s in window]
+    }, index=pd.to_datetime([s['t'] for s in window], unit='s'))
+    st.line_chart(trend, height=200)
+    
+    if st.button("📌 设为当前结果", key="live_pin"):
+        result = latest['result']
+        store_result(content_key("live", spec, latest['t'], latest['params']), lambda: result, latest['params'], "实时数据")
+        st.rerun()
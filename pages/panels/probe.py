@@ -0,0 +1,75 @@
+"""
+剖面与区域统计面板：折线剖面、矩形/多边形区域平均、任意点取值（引擎见 utils.probe）
+"""
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from pages.panels.common import parse_points
+from utils.field_result import FieldResult
+from utils.profiling import timed
+
+# 探针可查询的物理量
+PROBE_QUANTITIES = {
+    "温度": "temp",
+    "u": "u",
+    "v": "v",
+    "速度": "speed"
+}
+
+
+def render_probe_panel(result: FieldResult):
+    """折线剖面、矩形/多边形区域平均、任意点取值（坐标为网格下标）"""
+    probe = result.probe
+    h, w = result.shape
+
+    quantity = st.selectbox("物理量", list(PROBE_QUANTITIES.keys()), index=0, key="probe_quantity")
+    name = PROBE_QUANTITIES[quantity]
+
+    # 剖面线
+    st.markdown("**剖面线**")
+    c1, c2, c3, c4 = st.columns(4)
+    x0 = c1.number_input("起点 X", 0.0, float(w - 1), 0.0, 1.0, key="probe_x0")
+    y0 = c2.number_input("起点 Y", 0.0, float(h - 1), float(h // 2), 1.0, key="probe_y0")
+    x1 = c3.number_input("终点 X", 0.0, float(w - 1), float(w - 1), 1.0, key="probe_x1")
+    y1 = c4.number_input("终点 Y", 0.0, float(h - 1), float(h // 2), 1.0, key="probe_y1")
+
+    with timed("probe.profile"):
+        prof = probe.profile([[x0, y0], [x1, y1]], quantities=(name,))
+    fig = go.Figure(go.Scatter(x=prof['distance'], y=prof[name], mode='lines', line=dict(color='#1565C0')))
+    fig.update_layout(
+        height=220,
+        margin=dict(l=10, r=10, t=10, b=10),
+        xaxis_title="沿线距离 (单元)",
+        yaxis_title=quantity
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    # 矩形区域
+    st.markdown("**矩形区域平均**")
+    rx = st.slider("区域 X", 0, w - 1, (0, w - 1), key="probe_rx")
+    ry = st.slider("区域 Y", 0, h - 1, (0, h - 1), key="probe_ry")
+    cols = st.columns(len(PROBE_QUANTITIES))
+    with timed("probe.rect_mean"):
+        for col, (label, q) in zip(cols, PROBE_QUANTITIES.items()):
+            col.metric(label, f"{probe.rect_mean(rx[0], rx[1], ry[0], ry[1], q):.4f}")
+
+    # 任意点 / 多边形
+    text = st.text_area(
+        "点坐标（每行 x,y）",
+        placeholder="10,20\n40.5,95\n...",
+        key="probe_points"
+    )
+    points = parse_points(text)
+    if text and points is None:
+        st.warning("坐标格式有误，应为每行 x,y")
+    elif points is not None:
+        values = probe.sample_points(points)
+        st.dataframe(
+            {"x": points[:, 0], "y": points[:, 1],
+             **{label: values[q] for label, q in PROBE_QUANTITIES.items()}},
+            use_container_width=True,
+            hide_index=True
+        )
+        if len(points) >= 3:
+            st.metric(f"多边形内平均{quantity}", f"{probe.polygon_mean(points, name):.4f}")
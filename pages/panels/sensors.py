@@ -0,0 +1,92 @@
+"""
+测点重构面板：由少量测点读数重构整场，并提供布点优化（引擎见 utils.sensors）
+"""
+
+import os
+
+import numpy as np
+import streamlit as st
+
+from pages.panels.common import (EXCEL_FILE_PATH, IMG_HEIGHT, IMG_WIDTH, store_result, validate_basis,
+                                 in_memory_basis, parse_points, parse_values)
+from utils.field_stats import basis_moments
+from utils.inverse import InverseSolver
+from utils.predict import build_result
+from utils.profiling import timed
+from utils.resource_cache import content_key
+from utils.sensors import qr_placement, get_layout
+from utils.synthesis import load_basis, basis_shape, basis_digest
+
+
+def render_sensor_section(result):
+    """测点重构：由少量测点读数重构整场，并提供布点优化"""
+    with st.expander("🌡️ 测点重构"):
+        if not os.path.exists(EXCEL_FILE_PATH):
+            st.error(f"❌ 数据文件不存在: {EXCEL_FILE_PATH}")
+            return
+        if not in_memory_basis("测点重构"):
+            return
+        basis = load_basis(EXCEL_FILE_PATH)
+        shape = basis_shape(EXCEL_FILE_PATH, (IMG_HEIGHT, IMG_WIDTH))
+        if not validate_basis(basis, shape):
+            return
+        
+        n_sensors = st.slider("测点数", 8, 100, 30, key="sensor_count")
+        if st.button("📐 优化布点", use_container_width=True, key="sensor_place"):
+            with timed("sensors.placement"):
+                positions = qr_placement(basis, shape, n_sensors)
+            st.session_state.sensor_positions = "\n".join(f"{x:g},{y:g}" for x, y in positions)
+        
+        positions = parse_points(st.text_area(
+            "测点位置（每行 x,y）",
+            placeholder="10,20\n40.5,95\n...",
+            key="sensor_positions"
+        ))
+        if positions is None:
+            st.caption("请输入测点位置或点击【优化布点】")
+            return
+        
+        try:
+            layout = get_layout(basis, shape, positions, basis_digest(EXCEL_FILE_PATH))
+        except ValueError as e:
+            st.error(f"❌ {str(e)}")
+            return
+        st.caption(f"测点数: {layout.n_sensors} · 观测矩阵条件数: {layout.condition:.1f}")
+        
+        simulate = result is not None and st.checkbox("由当前结果模拟读数", value=False, key="sensor_simulate")
+        if simulate:
+            noise = st.number_input("读数噪声 σ", 0.0, 10.0, 0.0, 0.01, key="sensor_noise")
+            values = result.probe.sample_points(positions, ("temp",))['temp']
+            values = values + np.random.default_rng(0).normal(0.0, noise, len(values))
+        else:
+            values = parse_values(st.text_area(
+                "测点读数（每行一个值，顺序与测点位置一致）",
+                key="sensor_values"
+            ))
+        
+        if values is None or len(values) != layout.n_sensors:
+            st.caption(f"读数个数应为 {layout.n_sensors}")
+            return
+        rms = float(np.sqrt(np.mean(layout.residual(values) ** 2)))
+        st.caption(f"测点处拟合 RMS 残差: {rms:.4f}")
+        
+        if st.button("🔄 重构整场", type="primary", key="sensor_run"):
+            run_reconstruction(layout, values, basis)
+
+
+def run_reconstruction(layout, values: np.ndarray, basis: np.ndarray):
+    """由测点读数重构整场并设为当前结果（运行参数由系数反推，用于预测记录）"""
+    digest = basis_digest(EXCEL_FILE_PATH)
+    
+    with timed("sensors.reconstruct"):
+        coefficients = layout.coefficients(values)
+    params, _, _ = InverseSolver(basis, digest).fit_params(coefficients)
+    
+    def compute():
+        field = layout.reconstruct(values)
+        moments = basis_moments(basis[:, :8], digest)
+        return build_result(field, coefficients, moments)
+    
+    key = content_key("sensors", digest, layout.positions, np.asarray(values, dtype=float), layout.ridge)
+    store_result(key, compute, tuple(params[0]), "测点重构")
+    st.rerun()
@@ -0,0 +1,77 @@
+"""
+代理模型预测：降阶代理模型（POD-RBF）训练、推理与验证指标（引擎见 utils.surrogate）
+"""
+
+import os
+
+import streamlit as st
+
+from pages.panels.common import EXCEL_FILE_PATH, IMG_HEIGHT, IMG_WIDTH, store_result, validate_basis, in_memory_basis
+from utils.predict import build_result
+from utils.profiling import timed
+from utils.resource_cache import content_key
+from utils.synthesis import load_basis, basis_shape, basis_digest
+
+# 归档的高保真场快照（可选，npz: params + fields）
+SURROGATE_ARCHIVE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "surrogate_archive.npz")
+
+
+def run_surrogate_synthesis(p1: float, p2: float, p3: float, p4: float):
+    """使用降阶代理模型执行热力特性场预测（与 run_synthesis 相同的结果接口）"""
+    
+    if not os.path.exists(EXCEL_FILE_PATH):
+        st.error(f"❌ 数据文件不存在: {EXCEL_FILE_PATH}")
+        st.info("请将Excel数据文件放置于项目 data 文件夹下")
+        return
+    if not in_memory_basis("代理模型"):
+        return
+    
+    try:
+        with st.spinner("正在加载代理模型..."):
+            with timed("synthesis.load_basis"):
+                basis = load_basis(EXCEL_FILE_PATH)
+            shape = basis_shape(EXCEL_FILE_PATH, (IMG_HEIGHT, IMG_WIDTH))
+            if not validate_basis(basis, shape):
+                return
+            model, report = get_surrogate_model(EXCEL_FILE_PATH, os.path.getmtime(EXCEL_FILE_PATH))
+        
+        def compute():
+            with timed("surrogate.predict"):
+                synthesized_img = model.predict(p1, p2, p3, p4)
+            return build_result(synthesized_img)
+        
+        key = content_key("surrogate", basis_digest(EXCEL_FILE_PATH), shape, p1, p2, p3, p4)
+        store_result(key, compute, (p1, p2, p3, p4), "代理模型")
+        st.session_state.surrogate_report = report
+        
+        st.success("✅ 预测完成！")
+        st.rerun()
+        
+    except Exception as e:
+        st.error(f"❌ 预测失败: {str(e)}")
+
+
+@st.cache_resource(show_spinner=False)
+def get_surrogate_model(basis_path: str, basis_mtime: float):
+    """训练并缓存代理模型（基底文件修改后自动重新训练）"""
+    from utils.surrogate import train_surrogate
+    
+    basis = load_basis(basis_path)
+    shape = basis_shape(basis_path, (IMG_HEIGHT, IMG_WIDTH))
+    return train_surrogate(basis, shape, archive_path=SURROGATE_ARCHIVE_PATH)
+
+
+def render_surrogate_report():
+    """统计栏中的代理模型验证指标（本会话尚未用代理模型预测时不显示）"""
+    report = st.session_state.get('surrogate_report')
+    if report is None:
+        return
+    st.markdown("---")
+    st.markdown("**代理模型**")
+    st.metric("验证误差 (相对L2)", f"{report['rel_l2_mean']:.2e}")
+    st.metric("单次推理", f"{report['latency_ms']:.3f} ms")
+    st.caption(
+        f"训练样本: {report['n_train']} ({report['source']}) · "
+        f"模态数: {report['n_modes']} · "
+        f"批量吞吐: {report['batch_throughput']:.0f} 场/秒"
+    )
@@ -0,0 +1,197 @@
+"""
+瞬态模式面板：以当前参数为基准生成工况时间序列，逐帧合成并播放（引擎见 utils.transient）
+"""
+
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from pages.panels.common import (EXCEL_FILE_PATH, IMG_HEIGHT, IMG_WIDTH, session_refs, validate_basis,
+                                 in_memory_basis, field_colormap, chart_height)
+from utils.profiling import timed
+from utils.resource_cache import content_key
+from utils.synthesis import load_basis, basis_shape, basis_digest
+from utils.transient import (MAX_FRAMES, build_schedule, read_schedule, check_schedule, iter_frames, frame_coords,
+                             animation_nbytes, time_label)
+
+
+def render_transient_section(base: tuple):
+    """瞬态模式：以当前参数为基准生成工况时间序列，逐帧合成并播放"""
+    with st.expander("⏱️ 瞬态模式（工况时间序列）"):
+        if not in_memory_basis("瞬态模式"):
+            return
+        
+        source = st.radio("工况来源", ["爬升 / 漂移", "上传 CSV"], horizontal=True, key="transient_source")
+        
+        if source == "上传 CSV":
+            file = st.file_uploader("工况文件（列 t, p1, p2, p3, p4）", type=['csv'], key="transient_file")
+            schedule = None
+            if file is not None:
+                try:
+                    schedule = read_schedule(file)
+                except Exception as e:
+                    st.error(f"❌ 工况文件读取失败: {str(e)}")
+        else:
+            c1, c2, c3 = st.columns(3)
+            duration = c1.number_input("时长 (h)", 0.5, 72.0, 8.0, 0.5, key="transient_duration")
+            n_steps = c2.number_input("时间步数", 2, 10000, 96, 1, key="transient_steps")
+            p4_end = c3.number_input("热负荷终值 (MW)", 0.0, 2000.0, float(base[3]), 10.0, key="transient_p4_end")
+            c4, c5 = st.columns(2)
+            amplitude = c4.number_input("循环水温度漂移幅值 (°C)", 0.0, 10.0, 0.0, 0.5, key="transient_p1_amp")
+            period = c5.number_input("漂移周期 (h)", 0.5, 72.0, 8.0, 0.5, key="transient_p1_period")
+            schedule = build_schedule(
+                base, n_steps, duration,
+                ramps={3: p4_end},
+                drifts={0: (amplitude, period)}
+            )
+        
+        playback = st.radio(
+            "播放方式",
+            ["动画 (Plotly)", "逐帧推送"],
+            horizontal=True,
+            key="transient_playback",
+            help="动画一次性发送抽帧后的降采样帧；逐帧推送边合成边刷新，不保留历史帧"
+        )
+        
+        if st.button("▶️ 生成瞬态过程", key="transient_run") and schedule is not None:
+            run_transient(*schedule, streaming=(playback == "逐帧推送"))
+        elif session_refs().key('transient') is not None:
+            fig, trend = session_refs().get('transient')
+            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(trend, use_container_width=True)
+
+
+def run_transient(t: np.ndarray, params: np.ndarray, unit: str = "h", streaming: bool = False):
+    """合成工况序列对应的场序列（生成器逐块合成，不整体驻留内存）；unit 为 None 时 t 为步号"""
+    if not os.path.exists(EXCEL_FILE_PATH):
+        st.error(f"❌ 数据文件不存在: {EXCEL_FILE_PATH}")
+        return
+    try:
+        check_schedule(t, params)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return
+    
+    try:
+        basis = load_basis(EXCEL_FILE_PATH)
+        shape = basis_shape(EXCEL_FILE_PATH, (IMG_HEIGHT, IMG_WIDTH))
+        if not validate_basis(basis, shape):
+            return
+        
+        if streaming:
+            stream_transient(t, params, basis, shape, unit)
+            return
+        
+        # 相同基底与工况序列的动画在所有会话间共享；图表对象无法直接计量，按帧数据大小估计
+        key = content_key("transient", basis_digest(EXCEL_FILE_PATH), shape, t, params, unit, MAX_FRAMES)
+        with st.spinner("正在生成瞬态过程..."):
+            animation = session_refs().get_or_create(
+                'transient',
+                key,
+                lambda: create_transient_animation(t, iter_frames(basis, shape, params), shape, unit),
+                nbytes=animation_nbytes(len(params), shape)
+            )
+        fig, trend = animation
+        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(trend, use_container_width=True)
+        
+    except Exception as e:
+        st.error(f"❌ 瞬态计算失败: {str(e)}")
+
+
+@timed("chart.transient_animation")
+def create_transient_animation(t: np.ndarray, frames, shape: tuple, unit: str = "h") -> tuple:
+    """
+    由帧生成器构建 Plotly 动画与逐步趋势图 → (动画, 趋势图)
+    帧按步号命名（动画与滑块按名称定位帧，时间步长很小时格式化的时间会重名），时间只用作滑块标签
+    """
+    x, y = frame_coords(shape)
+    anim_frames, labels, summaries = [], [], []
+    zmin, zmax = np.inf, -np.inf
+    for i, summary, z in frames:
+        summaries.append(summary)
+        if z is None:
+            continue
+        zmin, zmax = min(zmin, summary['min']), max(zmax, summary['max'])
+        anim_frames.append(go.Frame(data=[go.Heatmap(z=z)], traces=[0], name=str(i)))
+        labels.append(f"{t[i]:g}")
+    
+    fig = go.Figure(
+        data=[go.Heatmap(
+            z=anim_frames[0].data[0].z,
+            x=x,
+            y=y,
+            zmin=zmin,
+            zmax=zmax,
+            colorscale=field_colormap(),
+            colorbar=dict(title=dict(text="温度值", side="right"), thickness=15, len=0.9)
+        )],
+        frames=anim_frames
+    )
+    play_args = dict(frame=dict(duration=150, redraw=True), transition=dict(duration=0), fromcurrent=True)
+    fig.update_layout(
+        title=dict(text=f"温度场瞬态过程 ({len(t)} 步 · {len(anim_frames)} 帧)", x=0.5, font=dict(size=14, color="#333")),
+        xaxis=dict(title="X 位置", scaleanchor="y", scaleratio=1, showgrid=False),
+        yaxis=dict(title="Y 位置", autorange="reversed", showgrid=False),
+        height=chart_height(),
+        margin=dict(l=50, r=20, t=50, b=40),
+        updatemenus=[dict(
+            type="buttons",
+            direction="left",
+            x=0, y=-0.08,
+            buttons=[
+                dict(label="▶", method="animate", args=[None, play_args]),
+                dict(label="⏸", method="animate",
+                     args=[[None], dict(frame=dict(duration=0, redraw=False), mode="immediate")])
+            ]
+        )],
+        sliders=[dict(
+            x=0.1, y=-0.08, len=0.9,
+            currentvalue=dict(prefix="t = " if unit else "步 "),
+            steps=[dict(method="animate", label=label,
+                        args=[[f.name], dict(frame=dict(duration=0, redraw=True), mode="immediate")])
+                   for f, label in zip(anim_frames, labels)]
+        )]
+    )
+    
+    return fig, create_transient_trend(t, summaries, unit)
+
+
+def create_transient_trend(t: np.ndarray, summaries: list, unit: str = "h") -> go.Figure:
+    """逐步最大/平均/最小温度"""
+    fig = go.Figure()
+    for name, label, color in (('max', "最大值", "#C62828"), ('mean', "平均值", "#1565C0"), ('min', "最小值", "#2E7D32")):
+        fig.add_trace(go.Scatter(x=t, y=[s[name] for s in summaries], mode='lines', name=label, line=dict(color=color)))
+    fig.update_layout(
+        height=250,
+        margin=dict(l=10, r=10, t=30, b=10),
+        xaxis_title=time_label(unit),
+        yaxis_title="温度值",
+        legend=dict(orientation="h", y=1.15)
+    )
+    return fig
+
+
+def stream_transient(t: np.ndarray, params: np.ndarray, basis: np.ndarray, shape: tuple, unit: str = "h"):
+    """逐帧推送：每合成一帧即刷新图表，只保留当前帧与逐步摘要"""
+    x, y = frame_coords(shape)
+    chart = st.empty()
+    progress = st.progress(0.0)
+    summaries = []
+    for i, summary, z in iter_frames(basis, shape, params):
+        summaries.append(summary)
+        if z is not None:
+            fig = go.Figure(go.Heatmap(z=z, x=x, y=y, colorscale=field_colormap()))
+            fig.update_layout(
+                title=dict(text=f"t = {t[i]:.2f} {unit}" if unit else f"步 {int(t[i])}", x=0.5,
+                           font=dict(size=14, color="#333")),
+                xaxis=dict(scaleanchor="y", scaleratio=1, showgrid=False),
+                yaxis=dict(autorange="reversed", showgrid=False),
+                height=chart_height(),
+                margin=dict(l=50, r=20, t=50, b=40)
+            )
+            chart.plotly_chart(fig, use_container_width=True)
+        progress.progress((i + 1) / len(params))
+    st.plotly_chart(create_transient_trend(t[:len(summaries)], summaries, unit), use_container_width=True)
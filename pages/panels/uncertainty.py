@@ -0,0 +1,105 @@
+"""
+不确定性分析面板：输入参数按分布抽样，蒙特卡洛传播得到逐像素置信图（引擎见 utils.uncertainty）
+"""
+
+import os
+
+import streamlit as st
+
+from pages.panels.charts import create_heatmap_chart
+from pages.panels.common import EXCEL_FILE_PATH, IMG_HEIGHT, IMG_WIDTH, session_refs, validate_basis, in_memory_basis
+from utils.profiling import timed
+from utils.resource_cache import content_key
+from utils.synthesis import load_basis, basis_shape, basis_digest
+from utils.uncertainty import sample_inputs, propagate
+
+# 不确定性分析的输入分布选项
+UNCERTAINTY_DISTRIBUTIONS = {
+    "固定": "fixed",
+    "正态": "normal",
+    "均匀": "uniform"
+}
+
+
+def render_uncertainty_section(base: tuple):
+    """不确定性分析：输入参数按分布抽样，蒙特卡洛传播得到逐像素置信图"""
+    with st.expander("🎲 不确定性分析（蒙特卡洛）"):
+        if not in_memory_basis("不确定性分析"):
+            return
+        
+        specs = []
+        cols = st.columns(4)
+        for col, (label, mean, default_dist, default_scale) in zip(cols, (
+            ("循环水温度", base[0], "固定", 0.5),
+            ("循环水流量", base[1], "正态", 2.0),
+            ("蒸汽压力", base[2], "固定", 0.1),
+            ("热负荷", base[3], "正态", 20.0)
+        )):
+            with col:
+                dist = st.selectbox(label, list(UNCERTAINTY_DISTRIBUTIONS.keys()),
+                                    index=list(UNCERTAINTY_DISTRIBUTIONS.keys()).index(default_dist),
+                                    key=f"mc_dist_{label}")
+                scale = st.number_input("σ / 半宽", 0.0, 1000.0, default_scale, key=f"mc_scale_{label}")
+            specs.append({'dist': UNCERTAINTY_DISTRIBUTIONS[dist], 'mean': mean, 'scale': scale})
+        
+        c1, c2 = st.columns(2)
+        n_samples = c1.number_input("样本数 M", 100, 100_000, 10_000, 100, key="mc_samples")
+        budget_mb = c2.number_input("内存预算 (MB)", 16, 1024, 64, 16, key="mc_budget")
+        
+        if st.button("🎲 运行不确定性分析", key="mc_run"):
+            run_uncertainty(specs, int(n_samples), int(budget_mb))
+        
+        out = session_refs().get('uncertainty')
+        if out is not None:
+            render_uncertainty_maps(out)
+
+
+def run_uncertainty(specs: list, n_samples: int, budget_mb: int):
+    """抽样并传播（相同基底 + 分布 + 样本数的结果在所有会话间共享）"""
+    if not os.path.exists(EXCEL_FILE_PATH):
+        st.error(f"❌ 数据文件不存在: {EXCEL_FILE_PATH}")
+        return
+    try:
+        basis = load_basis(EXCEL_FILE_PATH)
+        shape = basis_shape(EXCEL_FILE_PATH, (IMG_HEIGHT, IMG_WIDTH))
+        if not validate_basis(basis, shape):
+            return
+        
+        def compute():
+            params = sample_inputs(specs, n_samples, rng=0)
+            with timed("uncertainty.propagate"):
+                return propagate(basis, shape, params, budget_bytes=budget_mb * 1024 * 1024)
+        
+        key = content_key("uncertainty", basis_digest(EXCEL_FILE_PATH), shape,
+                          [sorted(s.items()) for s in specs], n_samples, budget_mb)
+        with st.spinner(f"正在传播 {n_samples} 组样本..."):
+            session_refs().get_or_create('uncertainty', key, compute)
+    except Exception as e:
+        st.error(f"❌ 不确定性分析失败: {str(e)}")
+
+
+def render_uncertainty_maps(out: dict):
+    """置信图：均值、标准差、分位数与置信带宽"""
+    p = out['percentiles']
+    lo_p, hi_p = min(p), max(p)
+    maps = {
+        "均值": out['mean'],
+        "标准差": out['std'],
+        **{f"P{q}": band for q, band in p.items()},
+        f"置信带宽 (P{hi_p}−P{lo_p})": p[hi_p] - p[lo_p]
+    }
+    
+    c1, c2, c3 = st.columns(3)
+    c1.metric("最大标准差", f"{out['std'].max():.4f}")
+    c2.metric("平均标准差", f"{out['std'].mean():.4f}")
+    c3.metric("耗时", f"{out['elapsed_s']:.2f} s")
+    st.caption(
+        f"样本数: {out['n_samples']} · 每块: {out['chunk']} · 分箱: {out['bins']} · "
+        f"估计内存占用: {out['memory_bytes'] / 1024**2:.1f} MB"
+    )
+    
+    name = st.selectbox("置信图", list(maps.keys()), index=1, key="mc_map")
+    fig = create_heatmap_chart(maps[name])
+    fig.update_layout(title=dict(text=f"{name}（{out['n_samples']} 样本）"), height=450)
+    fig.update_traces(colorbar=dict(title=dict(text=name, side="right")))
+    st.plotly_chart(fig, use_container_width=True)
@@ -3,8 +3,13 @@
 """
 
 import streamlit as st
+import pandas as pd
 from components.header import render_header, render_section_header
 from utils.constants import THEMES, LANGUAGES
+from utils import profiling
+from utils.resource_cache import STORE
+from utils import settings as settings_store
+from utils.settings import get_settings, save_settings, Settings
 
 def show():
     """渲染系统设置页面"""
@@ -30,8 +35,26 @@ def show():
         render_about()
 
 
+def save_and_report(settings: Settings, message: str) -> bool:
+    """保存设置并提示；写入失败（目录只读、磁盘已满等）时显示错误，返回是否保存成功"""
+    try:
+        save_settings(settings)
+    except OSError as e:
+        st.error(f"❌ 设置保存失败: {e}")
+        return False
+    st.success(message)
+    return True
+
+
+def option_index(options, value) -> int:
+    """已保存的值在选项中的位置（不在其中时取第一项）"""
+    options = list(options)
+    return options.index(value) if value in options else 0
+
+
 def render_display_settings():
     """渲染显示设置"""
+    saved = get_settings().display
     render_section_header("🎨 主题与外观")
     
     col1, col2 = st.columns(2)
@@ -40,37 +63,38 @@ def render_display_settings():
         theme = st.selectbox(
             "主题",
             THEMES,
-            index=0
+            index=option_index(THEMES, saved.theme)
         )
         
         language = st.selectbox(
             "语言",
             LANGUAGES,
-            index=0
+            index=option_index(LANGUAGES, saved.language)
         )
         
         font_size = st.slider(
             "字体大小",
             min_value=12,
             max_value=24,
-            value=16,
+            value=saved.font_size,
             step=1
         )
     
     with col2:
         chart_style = st.selectbox(
             "图表样式",
-            ["默认", "科技风", "简约", "彩色"]
+            settings_store.CHART_STYLES,
+            index=option_index(settings_store.CHART_STYLES, saved.chart_style)
         )
         
         animation = st.toggle(
             "启用动画效果",
-            value=True
+            value=saved.animation
         )
         
         show_grid = st.toggle(
             "显示网格线",
-            value=True
+            value=saved.show_grid
         )
     
     st.markdown("---")
@@ -82,15 +106,18 @@ def render_display_settings():
     with col1:
         default_colormap = st.selectbox(
             "默认颜色映射",
-            ["Jet", "Rainbow", "Viridis", "Plasma", "Hot"]
+            settings_store.COLORMAPS,
+            index=option_index(settings_store.COLORMAPS, saved.default_colormap),
+            help="用于热力场预测页面的场图"
         )
         
         chart_height = st.slider(
             "默认图表高度",
             min_value=200,
             max_value=800,
-            value=400,
-            step=50
+            value=saved.chart_height,
+            step=50,
+            help="用于热力场预测页面的场图"
         )
     
     with col2:
@@ -98,13 +125,13 @@ def render_display_settings():
             "图像分辨率 (DPI)",
             min_value=72,
             max_value=300,
-            value=150,
+            value=saved.dpi,
             step=10
         )
         
         auto_refresh = st.toggle(
             "自动刷新图表",
-            value=False
+            value=saved.auto_refresh
         )
     
     # 保存按钮
@@ -113,64 +140,78 @@ def render_display_settings():
     col1, col2, col3 = st.columns([2, 1, 2])
     with col2:
         if st.button("💾 保存设置", type="primary", use_container_width=True):
-            st.session_state['display_settings'] = {
-                'theme': theme,
-                'language': language,
-                'font_size': font_size,
-                'chart_style': chart_style,
-                'animation': animation,
-                'show_grid': show_grid,
-                'default_colormap': default_colormap,
-                'chart_height': chart_height,
-                'dpi': dpi,
-                'auto_refresh': auto_refresh
-            }
-            st.success("✅ 显示设置已保存！")
+            save_and_report(get_settings().update(
+                'display',
+                theme=theme,
+                language=language,
+                font_size=font_size,
+                chart_style=chart_style,
+                animation=animation,
+                show_grid=show_grid,
+                default_colormap=default_colormap,
+                chart_height=chart_height,
+                dpi=dpi,
+                auto_refresh=auto_refresh
+            ), "✅ 显示设置已保存！")
+
+
+# 预测引擎选项（与热力场预测页面一致）
+ENGINE_LABELS = {
+    "basis": "基底合成",
+    "surrogate": "代理模型 (POD-RBF)"
+}
 
 
 def render_calculation_settings():
     """渲染计算设置"""
+    saved = get_settings().compute
     render_section_header("⚡ 求解器设置")
     
     col1, col2 = st.columns(2)
     
     with col1:
-        solver_type = st.selectbox(
-            "求解器类型",
-            ["SIMPLE", "SIMPLEC", "PISO", "耦合求解器"]
+        engine = st.selectbox(
+            "默认预测引擎",
+            settings_store.ENGINES,
+            index=option_index(settings_store.ENGINES, saved.engine),
+            format_func=ENGINE_LABELS.get
         )
         
         max_iterations = st.number_input(
             "最大迭代次数",
-            min_value=100,
-            max_value=100000,
-            value=1000,
-            step=100
+            min_value=10,
+            max_value=10000,
+            value=saved.max_iterations,
+            step=10,
+            help="参数反演（LM 迭代）的迭代上限"
         )
         
         convergence_criteria = st.select_slider(
             "收敛标准",
-            options=[1e-3, 1e-4, 1e-5, 1e-6, 1e-7],
-            value=1e-5,
-            format_func=lambda x: f"{x:.0e}"
+            options=settings_store.TOLERANCES,
+            value=saved.tolerance,
+            format_func=lambda x: f"{x:.0e}",
+            help="参数反演的步长收敛容差"
         )
     
     with col2:
         time_scheme = st.selectbox(
             "时间离散格式",
-            ["一阶隐式", "二阶隐式", "Crank-Nicolson"]
+            settings_store.TIME_SCHEMES,
+            index=option_index(settings_store.TIME_SCHEMES, saved.time_scheme)
         )
         
         spatial_scheme = st.selectbox(
             "空间离散格式",
-            ["一阶迎风", "二阶迎风", "QUICK", "中心差分"]
+            settings_store.SPATIAL_SCHEMES,
+            index=option_index(settings_store.SPATIAL_SCHEMES, saved.spatial_scheme)
         )
         
         under_relaxation = st.slider(
             "欠松弛因子",
             min_value=0.1,
             max_value=1.0,
-            value=0.7,
+            value=saved.under_relaxation,
             step=0.05
         )
     
@@ -183,12 +224,14 @@ def render_calculation_settings():
     with col1:
         mesh_type = st.selectbox(
             "网格类型",
-            ["结构化网格", "非结构化网格", "混合网格"]
+            settings_store.MESH_TYPES,
+            index=option_index(settings_store.MESH_TYPES, saved.mesh_type)
         )
         
         mesh_quality = st.selectbox(
             "网格质量",
-            ["粗糙 (快速)", "中等 (平衡)", "精细 (精确)", "超精细 (研究级)"]
+            settings_store.MESH_QUALITIES,
+            index=option_index(settings_store.MESH_QUALITIES, saved.mesh_quality)
         )
     
     with col2:
@@ -196,7 +239,7 @@ def render_calculation_settings():
             "最小网格尺寸 (mm)",
             min_value=0.1,
             max_value=100.0,
-            value=1.0,
+            value=saved.min_cell_size,
             step=0.1
         )
         
@@ -204,7 +247,7 @@ def render_calculation_settings():
             "网格增长率",
             min_value=1.0,
             max_value=2.0,
-            value=1.2,
+            value=saved.growth_rate,
             step=0.05
         )
     
@@ -217,21 +260,23 @@ def render_calculation_settings():
     with col1:
         enable_parallel = st.toggle(
             "启用并行计算",
-            value=True
+            value=saved.parallel
         )
         
+        num_cores = saved.num_cores
         if enable_parallel:
             num_cores = st.slider(
                 "CPU核心数",
                 min_value=1,
                 max_value=32,
-                value=4
+                value=saved.num_cores,
+                help="报告渲染、预测调度等工作线程数；安装 threadpoolctl 时同时限制 BLAS 线程数"
             )
     
     with col2:
         enable_gpu = st.toggle(
             "启用GPU加速",
-            value=False
+            value=saved.gpu
         )
         
         if enable_gpu:
@@ -246,11 +291,32 @@ def render_calculation_settings():
     col1, col2, col3 = st.columns([2, 1, 2])
     with col2:
         if st.button("💾 保存设置", type="primary", use_container_width=True, key="save_calc"):
-            st.success("✅ 计算设置已保存！")
+            save_and_report(get_settings().update(
+                'compute',
+                engine=engine,
+                max_iterations=max_iterations,
+                tolerance=convergence_criteria,
+                time_scheme=time_scheme,
+                spatial_scheme=spatial_scheme,
+                under_relaxation=under_relaxation,
+                mesh_type=mesh_type,
+                mesh_quality=mesh_quality,
+                min_cell_size=min_cell_size,
+                growth_rate=growth_rate,
+                parallel=enable_parallel,
+                num_cores=num_cores,
+                gpu=enable_gpu
+            ), "✅ 计算设置已保存！")
+
+
+def toggle_memory_tracking():
+    """调试模式开关的回调：tracemalloc 是进程级的，只在用户切换时开启/关闭，页面重绘不改变"""
+    profiling.enable_memory_tracking(st.session_state.debug_mode)
 
 
 def render_advanced_settings():
     """渲染高级设置"""
+    saved = get_settings().advanced
     render_section_header("🔧 高级选项")
     
     st.warning("⚠️ 以下设置仅供高级用户使用，修改不当可能影响系统稳定性。")
@@ -261,60 +327,85 @@ def render_advanced_settings():
         debug_mode = st.toggle(
             "调试模式",
             value=False,
-            help="启用后会显示详细的调试信息"
+            help="启用后会显示详细的调试信息；切换时开启/关闭整个进程的内存增量记录",
+            key="debug_mode",
+            on_change=toggle_memory_tracking
         )
         
         log_level = st.selectbox(
             "日志级别",
-            ["ERROR", "WARNING", "INFO", "DEBUG"]
+            settings_store.LOG_LEVELS,
+            index=option_index(settings_store.LOG_LEVELS, saved.log_level)
         )
         
         cache_size = st.slider(
             "缓存大小 (MB)",
-            min_value=100,
+            min_value=64,
             max_value=4096,
-            value=512,
-            step=100
+            value=saved.cache_size_mb,
+            step=64,
+            help="共享结果缓存中空闲条目的内存上限，保存后立即生效"
         )
     
     with col2:
         auto_save = st.toggle(
             "自动保存",
-            value=True
+            value=saved.auto_save
         )
         
+        save_interval = saved.save_interval
         if auto_save:
             save_interval = st.number_input(
                 "保存间隔 (分钟)",
                 min_value=1,
                 max_value=60,
-                value=5
+                value=saved.save_interval
             )
         
         backup_enabled = st.toggle(
             "启用备份",
-            value=True
+            value=saved.backup
         )
     
+    # 调试模式下显示性能诊断（内存增量记录只在切换开关时改变）
+    if debug_mode:
+        st.markdown("---")
+        render_diagnostics_panel()
+    
     st.markdown("---")
     
     render_section_header("📁 文件路径")
     
     work_dir = st.text_input(
         "工作目录",
-        value="/home/user/cfd_projects"
+        value=saved.work_dir
     )
     
     output_dir = st.text_input(
         "输出目录",
-        value="/home/user/cfd_results"
+        value=saved.output_dir
     )
     
     temp_dir = st.text_input(
         "临时文件目录",
-        value="/tmp/cfd_temp"
+        value=saved.temp_dir
     )
     
+    col1, col2, col3 = st.columns([2, 1, 2])
+    with col2:
+        if st.button("💾 保存设置", type="primary", use_container_width=True, key="save_advanced"):
+            save_and_report(get_settings().update(
+                'advanced',
+                log_level=log_level,
+                cache_size_mb=cache_size,
+                auto_save=auto_save,
+                save_interval=save_interval,
+                backup=backup_enabled,
+                work_dir=work_dir,
+                output_dir=output_dir,
+                temp_dir=temp_dir
+            ), "✅ 高级设置已保存！")
+    
     st.markdown("---")
     
     render_section_header("🔄 系统维护")
@@ -323,31 +414,76 @@ def render_advanced_settings():
     
     with col1:
         if st.button("🧹 清理缓存", use_container_width=True):
-            with st.spinner("正在清理..."):
-                import time
-                time.sleep(1)
-            st.success("✅ 缓存已清理！")
+            freed = STORE.stats()['idle_mb']
+            STORE.clear_idle()
+            st.success(f"✅ 缓存已清理！释放 {freed:.1f} MB")
     
     with col2:
         if st.button("🔄 重置设置", use_container_width=True):
-            st.warning("确定要重置所有设置吗？")
+            if save_and_report(Settings(), "✅ 已恢复默认设置"):
+                st.rerun()
     
     with col3:
-        if st.button("📤 导出配置", use_container_width=True):
-            config = {
-                "debug_mode": debug_mode,
-                "log_level": log_level,
-                "cache_size": cache_size,
-                "work_dir": work_dir,
-                "output_dir": output_dir
-            }
-            import json
-            st.download_button(
-                "📥 下载配置文件",
-                json.dumps(config, indent=2),
-                "cfd_config.json",
-                "application/json"
-            )
+        st.download_button(
+            "📤 导出配置",
+            settings_store.dumps(get_settings(), "json"),
+            "cfd_config.json",
+            "application/json",
+            use_container_width=True
+        )
+    
+    uploaded = st.file_uploader("📥 导入配置 (JSON / TOML)", type=["json", "toml"], key="settings_import")
+    if uploaded is not None and st.button("✅ 应用导入的配置", key="settings_import_apply"):
+        fmt = "json" if uploaded.name.lower().endswith(".json") else "toml"
+        try:
+            imported = settings_store.loads(uploaded.getvalue().decode("utf-8"), fmt)
+        except (ValueError, UnicodeDecodeError) as e:
+            st.error(f"❌ 配置文件无法解析: {e}")
+        else:
+            if save_and_report(imported, "✅ 配置已导入并生效"):
+                st.rerun()
+
+
+def render_diagnostics_panel():
+    """渲染性能诊断面板"""
+    render_section_header("⏱️ 性能诊断")
+    
+    cache = STORE.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("共享缓存条目", f"{cache['entries']} ({cache['referenced']} 使用中)")
+    col2.metric("共享缓存占用", f"{cache['total_mb']:.1f} MB")
+    col3.metric("空闲上限", f"{cache['budget_mb']:.0f} MB")
+    col4.metric("命中/未命中", f"{cache['hits']}/{cache['misses']}")
+    
+    rows = profiling.summary()
+    if not rows:
+        st.info("暂无计时数据，请先在【热力场预测】页面运行一次预测")
+        return
+    
+    df = pd.DataFrame(rows).rename(columns={
+        'stage': "阶段",
+        'count': "次数",
+        'p50_ms': "p50 (ms)",
+        'p95_ms': "p95 (ms)",
+        'mean_ms': "平均 (ms)",
+        'last_ms': "最近 (ms)",
+        'mem_kb': "内存增量 (KB)"
+    })
+    st.dataframe(df.round(3), use_container_width=True, hide_index=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            "📥 导出计时数据 (JSON)",
+            profiling.export_json(include_samples=True),
+            "performance_profile.json",
+            "application/json",
+            use_container_width=True
+        )
+    with col2:
+        if st.button("🧹 清空计时数据", use_container_width=True):
+            profiling.reset()
+            st.rerun()
 
 
 def render_about():
@@ -0,0 +1,225 @@
+"""
+核电凝汽器热力特性场预测 - 本地 HTTP 服务（ASGI / Starlette）
+运行：python service.py [--host 127.0.0.1] [--port 8600]  或  uvicorn service:app
+
+接口（场数据以二进制返回，不使用 JSON 浮点列表）：
+- POST /predict          {"params": [p1, p2, p3, p4], "quantities": ["temp", ...]} → (Q, H, W)
+- POST /predict/batch    {"params": [[p1, p2, p3, p4], ...], "quantities": [...]}  → (N, Q, H, W)
+- GET  /fields/{id}?quantities=temp,speed                                        → (Q, H, W)
+- GET  /health
+quantities 可选 temp、u、v、speed 及派生量 vorticity、divergence、heat_flux、laplacian（见 utils.derived）
+默认返回 NPY（application/x-npy）；请求头 Accept 含 application/vnd.apache.arrow.stream 时返回 Arrow IPC
+场 ID 放在响应头 X-Field-Id（批量为 X-Field-Ids，逗号分隔），统计摘要放在 X-Field-Stats（JSON）
+/predict 的并发请求经微批调度器合并为一次矩阵乘；设置环境变量 CFD_MICRO_BATCH=0 可关闭（逐个计算，便于对比）
+派生量计算与 NPY / Arrow 编码在线程池中执行，不阻塞事件循环
+请求参数错误（BadRequest）返回 400，其余异常（含基底校验等内部 ValueError）返回 500 / 503
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from utils.derived import QUANTITIES as DERIVED
+from utils.predict import BASIS_PATH, DEFAULT_SHAPE, compute_batch, dispatcher, predict_batch, predict_key
+from utils.resource_cache import STORE
+from utils.settings import get_settings
+
+# 基底文件与页面相同：环境变量 CFD_BASIS_PATH 优先（见 utils.predict），大基底按块合成
+SERVICE_BASIS_PATH = BASIS_PATH
+MICRO_BATCH = os.environ.get("CFD_MICRO_BATCH", "1") != "0"
+DEFAULT_PORT = 8600
+# 单次批量请求的最大工况数
+MAX_BATCH = 1024
+
+QUANTITIES = ("temp", "u", "v", "speed") + tuple(DERIVED)
+NPY_MIME = "application/x-npy"
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# ==================== 编码 ====================
+
+def encode_npy(array: np.ndarray) -> bytes:
+    out = io.BytesIO()
+    np.lib.format.write_array(out, np.ascontiguousarray(array), allow_pickle=False)
+    return out.getvalue()
+
+
+def encode_arrow(array: np.ndarray, quantities: list) -> bytes:
+    """每个物理量一列（展平的 float32），形状记录在 schema 元数据中"""
+    import pyarrow as pa
+    cols = [pa.array(np.ascontiguousarray(array[..., i, :, :]).ravel()) for i in range(len(quantities))]
+    schema = pa.schema([pa.field(q, pa.float32()) for q in quantities],
+                       metadata={"shape": json.dumps(array.shape)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(pa.record_batch(cols, schema=schema))
+    return sink.getvalue().to_pybytes()
+
+
+def encode_fields(results: list, quantities: list, batch: bool, arrow: bool) -> tuple:
+    """结果 → (数组形状, 编码后的字节)；单个结果为 (Q, H, W)，批量为 (N, Q, H, W)"""
+    arrays = [stack(result, quantities) for result in results]
+    array = np.stack(arrays) if batch else arrays[0]
+    content = encode_arrow(array, quantities) if arrow else encode_npy(array)
+    return array.shape, content
+
+
+async def field_response(request: Request, results: list, quantities: list, headers: dict,
+                         batch: bool = False) -> Response:
+    """派生量与编码都是整场运算，放到线程池中执行"""
+    arrow = ARROW_MIME in request.headers.get("accept", "")
+    shape, content = await run_in_threadpool(encode_fields, results, quantities, batch, arrow)
+    headers = dict(headers, **{"X-Quantities": ",".join(quantities), "X-Shape": ",".join(map(str, shape))})
+    return Response(content, media_type=ARROW_MIME if arrow else NPY_MIME, headers=headers)
+
+
+def stack(result, quantities: list) -> np.ndarray:
+    derived = [q for q in quantities if q in DERIVED]
+    if derived:
+        result.derived(*derived)
+    return np.stack([np.asarray(result[q], dtype=np.float32) for q in quantities])
+
+
+def stats_header(result) -> str:
+    return json.dumps({
+        name: {k: round(float(result.stats[name][k]), 6) for k in ('max', 'min', 'mean', 'std')}
+        for name in ('temp', 'speed')
+    }, separators=(",", ":"))
+
+
+# ==================== 参数解析 ====================
+
+def parse_quantities(value) -> list:
+    if value is None:
+        return ["temp"]
+    names = value.split(",") if isinstance(value, str) else list(value)
+    names = [n.strip() for n in names if n.strip()]
+    unknown = [n for n in names if n not in QUANTITIES]
+    if unknown or not names:
+        raise BadRequest(f"未知的物理量: {unknown}，可选 {list(QUANTITIES)}")
+    return names
+
+
+def parse_params(value, batch: bool) -> np.ndarray:
+    try:
+        params = np.asarray(value, dtype=float)
+    except (TypeError, ValueError):
+        raise BadRequest("params 应为数值数组")
+    expected = 2 if batch else 1
+    if params.ndim != expected or params.shape[-1] != 4 or not np.isfinite(params).all():
+        raise BadRequest("params 应为 4 个参数" + ("的二维数组" if batch else ""))
+    if batch and not 0 < len(params) <= MAX_BATCH:
+        raise BadRequest(f"批量工况数应在 1~{MAX_BATCH} 之间")
+    return params
+
+
+async def read_json(request: Request) -> dict:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise BadRequest("请求体应为 JSON")
+    if not isinstance(body, dict):
+        raise BadRequest("请求体应为 JSON 对象")
+    return body
+
+
+# ==================== 接口 ====================
+
+async def predict_endpoint(request: Request) -> Response:
+    body = await read_json(request)
+    params = parse_params(body.get("params"), batch=False)
+    quantities = parse_quantities(body.get("quantities"))
+    key = await run_in_threadpool(predict_key, params, SERVICE_BASIS_PATH, DEFAULT_SHAPE)
+    result = STORE.get(key)
+    if result is None:
+        if MICRO_BATCH:
+            future = dispatcher(SERVICE_BASIS_PATH, DEFAULT_SHAPE).submit(tuple(params.tolist()))
+            result = await asyncio.wrap_future(future)
+        else:
+            result = (await run_in_threadpool(compute_batch, params, SERVICE_BASIS_PATH, DEFAULT_SHAPE))[0]
+        result = STORE.put(key, result)
+    return await field_response(request, [result], quantities,
+                                {"X-Field-Id": key, "X-Field-Stats": stats_header(result)})
+
+
+async def predict_batch_endpoint(request: Request) -> Response:
+    body = await read_json(request)
+    params = parse_params(body.get("params"), batch=True)
+    quantities = parse_quantities(body.get("quantities"))
+    items = await run_in_threadpool(predict_batch, params, SERVICE_BASIS_PATH, DEFAULT_SHAPE)
+    return await field_response(request, [result for _, result in items], quantities,
+                                {"X-Field-Ids": ",".join(key for key, _ in items)}, batch=True)
+
+
+async def field_endpoint(request: Request) -> Response:
+    key = request.path_params["field_id"]
+    quantities = parse_quantities(request.query_params.get("quantities"))
+    result = STORE.get(key)
+    if result is None:
+        return JSONResponse({"error": "场不存在或已被淘汰，请重新预测"}, status_code=404)
+    return await field_response(request, [result], quantities,
+                                {"X-Field-Id": key, "X-Field-Stats": stats_header(result)})
+
+
+async def health_endpoint(request: Request) -> Response:
+    return JSONResponse({
+        "status": "ok",
+        "basis": os.path.basename(SERVICE_BASIS_PATH),
+        "basis_available": os.path.exists(SERVICE_BASIS_PATH),
+        "cache": STORE.stats(),
+        "batching": dispatcher(SERVICE_BASIS_PATH, DEFAULT_SHAPE).stats() if MICRO_BATCH else None,
+    })
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    """启动时读取设置与基底，避免首个请求在事件循环中解析数据文件"""
+    get_settings()
+    if os.path.exists(SERVICE_BASIS_PATH):
+        await run_in_threadpool(predict_key, (0, 0, 0, 0), SERVICE_BASIS_PATH, DEFAULT_SHAPE)
+    yield
+
+
+async def bad_request(request: Request, exc: BadRequest) -> Response:
+    return JSONResponse({"error": str(exc)}, status_code=400)
+
+
+async def server_error(request: Request, exc: Exception) -> Response:
+    status = 503 if isinstance(exc, FileNotFoundError) else 500
+    return JSONResponse({"error": str(exc)}, status_code=status)
+
+
+app = Starlette(
+    routes=[
+        Route("/predict", predict_endpoint, methods=["POST"]),
+        Route("/predict/batch", predict_batch_endpoint, methods=["POST"]),
+        Route("/fields/{field_id}", field_endpoint, methods=["GET"]),
+        Route("/health", health_endpoint, methods=["GET"]),
+    ],
+    exception_handlers={BadRequest: bad_request, Exception: server_error},
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="热力特性场预测 HTTP 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 测试从任意目录运行时都能导入项目根目录下的模块（utils、bench_kernels）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
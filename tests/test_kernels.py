@@ -0,0 +1,97 @@
+"""
+加速内核一致性（小网格，完整基准见 bench_kernels.py）
+- NumPy 版：派生量与整场 np.gradient 逐元素相同（任意块大小），流线、箭头与原逐点循环一致
+- numba 版（已安装时）：与 NumPy 版逐元素相同，多线程并发调用结果不变
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+import bench_kernels as bench
+from utils import kernels
+from utils.derived import QUANTITIES, compute_derived
+
+SHAPE = (48, 37)
+DS = 2.0
+STEP = 8
+SCALE = 5.0
+
+
+@pytest.fixture(scope="module")
+def field():
+    result = bench.make_field(SHAPE)
+    sy, sx = np.mgrid[0:SHAPE[0]:3, 0:SHAPE[1]:3]
+    seeds = (sx.ravel().astype(np.float64), sy.ravel().astype(np.float64))
+    return result, seeds
+
+
+@pytest.fixture(autouse=True)
+def restore_backend():
+    yield
+    kernels._compiled = None  # 下次调用时按环境重新检测
+
+
+def run(name: str, field) -> dict:
+    result, seeds = field
+    if kernels.set_backend(name) != name:
+        pytest.skip(f"{name} 不可用")
+    return bench.run_backend(name, result, seeds, DS, STEP, SCALE, repeat=1)['out']
+
+
+def reference(field) -> dict:
+    result, seeds = field
+    u, v, speed = result.u, result.v, result.speed
+    return {
+        'streamlines': bench.reference_streamlines(u, v, speed, *seeds, DS),
+        'arrows': bench.reference_arrows(u, v, speed, STEP, SCALE),
+        'derived': bench.reference_derived(u, v),
+    }
+
+
+def test_numpy_matches_reference(field):
+    diff = bench.compare_reference(run("numpy", field), reference(field))
+    assert diff['derived_equal']
+    assert diff['streamline_count_mismatch'] == 0
+    assert diff['streamline_max_dev'] < 1e-3
+    assert diff['arrow_max_dev'] < 1e-4
+
+
+@pytest.mark.parametrize("block_cells", [1, 37, 100, 1 << 16])
+def test_blocked_derived_matches_gradient(field, block_cells):
+    result, _ = field
+    kernels.set_backend("numpy")
+    out = compute_derived(result.u, result.v, list(QUANTITIES), block_cells=block_cells)
+    expected = bench.reference_derived(result.u, result.v)
+    for name in QUANTITIES:
+        assert bench.same(out[name], expected[name]), name
+
+
+def test_numba_matches_numpy(field):
+    numpy_out = run("numpy", field)
+    numba_out = run("numba", field)
+    assert bench.compare_backends(numpy_out, numba_out) == []
+
+
+def test_numba_concurrent_calls(field):
+    result, seeds = field
+    expected = run("numba", field)
+    u, v, speed = result.u, result.v, result.speed
+    failures = []
+
+    def worker():
+        for _ in range(20):
+            out = {
+                'streamlines': kernels.trace_streamlines(u, v, speed, *seeds, DS, bench.N_STEPS),
+                'arrows': expected['arrows'],
+                'derived': compute_derived(u, v, list(QUANTITIES)),
+            }
+            failures.extend(bench.compare_backends(expected, out))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert failures == []
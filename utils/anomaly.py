@@ -0,0 +1,159 @@
+"""
+预测场异常检测
+- 对已纳入基线的结果逐像素维护均值/方差（Welford 增量算法），各物理量一组
+- 新结果逐像素计算 z 分数，超过阈值的像素记为异常；按块统计异常像素占比得到异常区域
+- 全部为向量化 O(像素数) 运算；状态按网格尺寸分文件保存为 npz，重启后自动恢复（基底变化时重新积累）
+- 纳入基线的结果按内容键去重，同一结果不会被重复计入；version 在基线变化时递增，供调用方缓存检测结果
+"""
+
+import os
+import threading
+
+import numpy as np
+
+from utils.probe import summed_area_table
+
+# 参与检测的物理量
+QUANTITIES = ("temp", "speed")
+# 开始判定前至少需要的基线样本数
+MIN_SAMPLES = 5
+# 默认 z 分数阈值、区域块大小与区域判定的异常像素占比
+Z_THRESHOLD = 3.0
+BLOCK = 8
+MIN_FRACTION = 0.25
+# 方差下限，避免基线中恒定像素的 z 分数发散
+VAR_FLOOR = 1e-12
+
+
+class WelfordDetector:
+    """逐像素 Welford 统计 + z 分数异常判定"""
+
+    def __init__(self, shape: tuple, quantities: tuple = QUANTITIES, tag: str = None):
+        self.shape = tuple(shape)
+        self.quantities = tuple(quantities)
+        self.tag = tag                # 基底摘要等标识，变化时状态作废
+        self._lock = threading.Lock()
+        self.version = 0
+        self._clear()
+
+    def _clear(self):
+        n = len(self.quantities)
+        self.count = 0
+        self.mean = np.zeros((n,) + self.shape)
+        self.m2 = np.zeros((n,) + self.shape)
+        self.accepted = set()         # 已纳入基线的结果键
+
+    def reset(self):
+        with self._lock:
+            self._clear()
+            self.version += 1
+
+    def _stack(self, result) -> np.ndarray:
+        return np.stack([np.asarray(result[q], dtype=np.float64) for q in self.quantities])
+
+    # ---------- 基线 ----------
+    def update(self, result, key: str = None) -> bool:
+        """将一个结果纳入基线；key 已纳入过时忽略，返回是否纳入"""
+        x = self._stack(result)
+        with self._lock:
+            if key is not None:
+                if key in self.accepted:
+                    return False
+                self.accepted.add(key)
+            self.version += 1
+            self.count += 1
+            delta = x - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (x - self.mean)
+        return True
+
+    @property
+    def variance(self) -> np.ndarray:
+        return self.m2 / max(self.count - 1, 1)
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= MIN_SAMPLES
+
+    # ---------- 判定 ----------
+    def zscore(self, result) -> np.ndarray:
+        """各物理量的逐像素 z 分数 (Q, H, W)"""
+        x = self._stack(result)
+        with self._lock:
+            std = np.sqrt(np.maximum(self.variance, VAR_FLOOR))
+            return (x - self.mean) / std
+
+    def detect(self, result, threshold: float = Z_THRESHOLD, block: int = BLOCK,
+               min_fraction: float = MIN_FRACTION) -> dict:
+        """
+        返回 {物理量: {'mask', 'count', 'fraction', 'max_z', 'regions'}}
+        regions：异常像素占比不低于 min_fraction 的块 [(x0, x1, y0, y1), ...]（含端点）
+        基线样本不足时返回空字典
+        """
+        if not self.ready:
+            return {}
+        z = self.zscore(result)
+        h, w = self.shape
+        out = {}
+        for q, zq in zip(self.quantities, z):
+            mask = np.abs(zq) > threshold
+            out[q] = {
+                'mask': mask,
+                'count': int(mask.sum()),
+                'fraction': float(mask.mean()),
+                'max_z': float(np.abs(zq).max()),
+                'regions': flagged_blocks(mask, block, min_fraction),
+            }
+        return out
+
+    # ---------- 持久化 ----------
+    def save(self, path: str):
+        """原子写入（先写临时文件再替换）"""
+        with self._lock:
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                np.savez(f, count=self.count, mean=self.mean, m2=self.m2,
+                         shape=np.array(self.shape), quantities=np.array(self.quantities),
+                         tag=np.array(self.tag or ""), accepted=np.array(sorted(self.accepted), dtype=str))
+            os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, shape: tuple, quantities: tuple = QUANTITIES, tag: str = None) -> "WelfordDetector":
+        """读取保存的状态；文件不存在或与当前网格/物理量/标识不一致时返回空检测器"""
+        detector = cls(shape, quantities, tag)
+        if not os.path.exists(path):
+            return detector
+        try:
+            with np.load(path) as z:
+                if (tuple(z['shape']) == detector.shape
+                        and tuple(z['quantities']) == detector.quantities
+                        and str(z['tag']) == (tag or "")):
+                    detector.count = int(z['count'])
+                    detector.mean = z['mean'].astype(np.float64)
+                    detector.m2 = z['m2'].astype(np.float64)
+                    if 'accepted' in z.files:
+                        detector.accepted = {str(k) for k in z['accepted']}
+        except (OSError, KeyError, ValueError):
+            pass
+        return detector
+
+
+def state_path(path: str, shape: tuple) -> str:
+    """按网格尺寸区分的状态文件：data/anomaly_state.npz → data/anomaly_state_190x87.npz"""
+    root, ext = os.path.splitext(path)
+    return f"{root}_{'x'.join(str(n) for n in shape)}{ext}"
+
+
+def flagged_blocks(mask: np.ndarray, block: int = BLOCK, min_fraction: float = MIN_FRACTION) -> list:
+    """按 block×block 块统计异常像素占比（积分图），返回占比达标的块 (x0, x1, y0, y1)"""
+    h, w = mask.shape
+    s = summed_area_table(mask)
+    ys = np.arange(0, h, block)
+    xs = np.arange(0, w, block)
+    y1 = np.minimum(ys + block, h)
+    x1 = np.minimum(xs + block, w)
+    counts = (s[y1[:, None], x1[None, :]] - s[ys[:, None], x1[None, :]]
+              - s[y1[:, None], xs[None, :]] + s[ys[:, None], xs[None, :]])
+    area = (y1 - ys)[:, None] * (x1 - xs)[None, :]
+    bi, bj = np.nonzero(counts >= min_fraction * area)
+    return [(int(xs[j]), int(x1[j] - 1), int(ys[i]), int(y1[i] - 1)) for i, j in zip(bi, bj)]
@@ -0,0 +1,364 @@
+"""
+外存基底（大网格 / 三维基底）
+- .npy 以内存映射方式打开，Zarr 目录按需读取（需安装 zarr）；基底矩阵形如 (单元数, 模态数)，
+  或 (*网格尺寸, 模态数)
+- 合成按行块进行：每块只读取该块的基底行并做矩阵乘，块大小由内存预算决定，
+  且对齐到首轴的整层（便于降采样与切片）
+- 基于块流的消费者：统计量（两遍扫描）、全分辨率导出（.npy / CSV）、降采样视图，均不驻留整个场
+- 切片：轴向平面或任意平面（三维），只读取并合成切片所需的单元，不计算完整的 N 维场
+"""
+
+import hashlib
+import os
+
+import numpy as np
+
+from utils.synthesis import N_MODES
+
+# 超过此大小的 .npy 基底走外存路径；Zarr 目录总是走外存路径
+OUT_OF_CORE_BYTES = 256 * 1024 * 1024
+# 每块的内存预算
+BLOCK_BYTES = 64 * 1024 * 1024
+# 分位数用的细分箱数（统计量第二遍扫描）
+FINE_BINS = 4096
+
+
+def peek_shape(path: str):
+    """只读文件头得到网格尺寸（.npy / .npz / Zarr），无法确定时返回 None"""
+    ext = os.path.splitext(path.rstrip("/\\"))[1].lower()
+    if not os.path.exists(path):
+        return None
+    if ext == ".npy":
+        shape = np.load(path, mmap_mode="r").shape
+        if len(shape) > 2:
+            return tuple(shape[:-1])
+        sidecar = os.path.splitext(path)[0] + ".shape.json"
+        if os.path.exists(sidecar):
+            import json
+            with open(sidecar, encoding="utf-8") as f:
+                return tuple(json.load(f))
+        return None
+    if ext == ".npz":
+        with np.load(path) as z:
+            if "shape" in z.files:
+                return tuple(int(n) for n in z["shape"])
+            with z.zip.open("basis.npy") as f:
+                version = np.lib.format.read_magic(f)
+                read = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+                shape = read(f)[0]
+            return tuple(shape[:-1]) if len(shape) > 2 else None
+    if ext == ".zarr":
+        import zarr
+        array = zarr.open(path, mode="r")
+        shape = tuple(array.attrs.get("shape", ())) or array.shape[:-1]
+        return tuple(shape) if len(shape) >= 2 else None
+    return None
+
+
+def is_out_of_core(path: str) -> bool:
+    ext = os.path.splitext(path.rstrip("/\\"))[1].lower()
+    if ext == ".zarr":
+        return True
+    return ext == ".npy" and os.path.exists(path) and os.path.getsize(path) > OUT_OF_CORE_BYTES
+
+
+class BasisStore:
+    """
+    按行块访问的基底：array 为 np.memmap / zarr 数组，形如 (单元数, 模态数) 或 (*网格尺寸, 模态数)
+    N 维的 np.memmap 展平为二维视图；N 维 zarr 数组不能 reshape，按首轴整层读取、按多维下标取值
+    """
+
+    def __init__(self, array, shape: tuple = None, identity: str = ""):
+        if array.ndim > 2:
+            shape = tuple(shape or array.shape[:-1])
+            if isinstance(array, np.ndarray):
+                array = array.reshape(-1, array.shape[-1])
+        self.array = array
+        # N 维 zarr 数组自身的网格尺寸（展平下标按它换算为多维下标），二维数组为 None
+        self._grid = tuple(array.shape[:-1]) if array.ndim > 2 else None
+        self.n_cells, self.n_modes = int(np.prod(array.shape[:-1])), int(array.shape[-1])
+        if self.n_modes < N_MODES:
+            raise ValueError(f"基底需要至少{N_MODES}列，当前只有{self.n_modes}列")
+        self.shape = tuple(shape) if shape is not None else (self.n_cells,)
+        if int(np.prod(self.shape)) != self.n_cells:
+            raise ValueError(f"基底行数({self.n_cells})与网格尺寸 {self.shape} 不匹配")
+        self.plane_cells = int(np.prod(self.shape[1:]))
+        self._moments = None
+        self.digest = hashlib.blake2b(
+            f"{identity}{array.dtype}{array.shape}{self.shape}".encode(), digest_size=16
+        ).hexdigest()
+
+    @classmethod
+    def open(cls, path: str, shape: tuple = None, default_shape: tuple = None) -> "BasisStore":
+        """
+        打开基底文件；摘要由路径、大小与修改时间得到（不读取全部内容）
+        (单元数, 模态数) 形式的基底按 shape、同名 .shape.json、default_shape（单元数相符时）的顺序确定网格尺寸
+        """
+        stat = os.stat(path)
+        identity = f"{os.path.abspath(path)}{stat.st_size}{stat.st_mtime_ns}"
+        if os.path.splitext(path.rstrip("/\\"))[1].lower() == ".zarr":
+            import zarr
+            array = zarr.open(path, mode="r")
+            shape = shape or tuple(array.attrs.get("shape", ())) or None
+        else:
+            array = np.load(path, mmap_mode="r")
+            sidecar = os.path.splitext(path)[0] + ".shape.json"
+            if shape is None and os.path.exists(sidecar):
+                import json
+                with open(sidecar, encoding="utf-8") as f:
+                    shape = tuple(json.load(f))
+        if shape is None and array.ndim == 2 and default_shape and int(np.prod(default_shape)) == array.shape[0]:
+            shape = tuple(default_shape)
+        return cls(array, shape, identity)
+
+    # ---------- 块迭代 ----------
+    def block_rows(self, n_out: int = 1, budget_bytes: int = BLOCK_BYTES, align: int = 1) -> int:
+        """每块行数：基底块 (行, 8) 与输出 (行, n_out) 的 float64 副本不超过预算，并对齐到 align 个整层"""
+        per_row = (N_MODES + n_out) * 8
+        planes = max(1, budget_bytes // (per_row * self.plane_cells))
+        planes = max(align, planes // align * align)
+        return planes * self.plane_cells
+
+    def iter_blocks(self, coefficients, budget_bytes: int = BLOCK_BYTES, align: int = 1):
+        """
+        逐块合成 → (起始行, 块)；coefficients 为 (8,) 时块为 (行,)，为 (M, 8) 时块为 (行, M)
+        """
+        c = np.asarray(coefficients, dtype=np.float64)
+        n_out = 1 if c.ndim == 1 else len(c)
+        rows = self.block_rows(n_out, budget_bytes, align)
+        for start in range(0, self.n_cells, rows):
+            yield start, self._read(start, start + rows) @ c.T
+
+    def synthesize(self, coefficients) -> np.ndarray:
+        """完整合成（仅用于可以驻留内存的场）：(8,) → 网格尺寸，(M, 8) → (M, *网格尺寸)"""
+        c = np.asarray(coefficients, dtype=np.float64)
+        out = np.empty(c.shape[:-1] + (self.n_cells,))
+        for start, block in self.iter_blocks(c):
+            out[..., start:start + len(block)] = block.T
+        return out.reshape(c.shape[:-1] + self.shape)
+
+    def moments(self, budget_bytes: int = BLOCK_BYTES) -> tuple:
+        """
+        基底前 8 列的均值 μ 与总体协方差 Σ（与 utils.field_stats.basis_moments 相同），
+        逐块合并（Chan 公式），首次计算后缓存在实例上
+        """
+        if self._moments is None:
+            rows = self.block_rows(N_MODES, budget_bytes)
+            count, mu, m2 = 0, np.zeros(N_MODES), np.zeros((N_MODES, N_MODES))
+            for start in range(0, self.n_cells, rows):
+                block = self._read(start, start + rows)
+                n = len(block)
+                block_mu = block.mean(axis=0)
+                centered = block - block_mu
+                delta = block_mu - mu
+                total = count + n
+                mu = mu + delta * n / total
+                m2 += centered.T @ centered + np.outer(delta, delta) * count * n / total
+                count = total
+            self._moments = (mu, m2 / count)
+        return self._moments
+
+    # ---------- 按行 / 按单元读取 ----------
+    def _read(self, start: int, stop: int) -> np.ndarray:
+        """展平后第 start~stop 行的基底 (行, 8)"""
+        if self._grid is None:
+            return np.asarray(self.array[start:stop, :N_MODES], dtype=np.float64)
+        # N 维 zarr：读取覆盖该范围的首轴整层，再截取
+        layer = int(np.prod(self._grid[1:]))
+        lo, hi = start // layer, -(-min(stop, self.n_cells) // layer)
+        sel = (slice(lo, hi),) + (slice(None),) * (len(self._grid) - 1) + (slice(0, N_MODES),)
+        block = np.asarray(self.array[sel], dtype=np.float64).reshape(-1, N_MODES)
+        return block[start - lo * layer:stop - lo * layer]
+
+    def _rows(self, flat: np.ndarray) -> np.ndarray:
+        """指定单元（已排序、无重复）的基底行"""
+        if self._grid is not None:
+            # 坐标选取：各轴下标与列下标广播为 (单元数, 8)
+            coords = np.unravel_index(flat, self._grid)
+            sel = tuple(c[:, None] for c in coords) + (np.arange(N_MODES)[None, :],)
+            return np.asarray(self.array.vindex[sel], dtype=np.float64)
+        if hasattr(self.array, "oindex"):
+            return np.asarray(self.array.oindex[flat, :N_MODES], dtype=np.float64)
+        return np.asarray(self.array[flat, :N_MODES], dtype=np.float64)
+
+    def values_at(self, coefficients, flat) -> np.ndarray:
+        """只合成指定单元的值：flat 为展平下标（任意形状，可重复）"""
+        flat = np.asarray(flat, dtype=np.intp)
+        unique, inverse = np.unique(flat.ravel(), return_inverse=True)
+        values = self._rows(unique) @ np.asarray(coefficients, dtype=np.float64)
+        return values[inverse].reshape(flat.shape)
+
+    # ---------- 切片 ----------
+    def axis_slice(self, coefficients, axis: int, index: int) -> np.ndarray:
+        """垂直于 axis 的第 index 层 → 形状为去掉该轴的网格尺寸"""
+        n = self.shape[axis]
+        if not 0 <= index < n:
+            raise ValueError(f"层位置 {index} 超出范围 0~{n - 1}")
+        out_shape = self.shape[:axis] + self.shape[axis + 1:]
+        if axis == 0:
+            start = index * self.plane_cells
+            block = self._read(start, start + self.plane_cells)
+            return (block @ np.asarray(coefficients, dtype=np.float64)).reshape(out_shape)
+        coords = list(np.indices(out_shape, sparse=True))
+        coords.insert(axis, np.intp(index))
+        flat = np.ravel_multi_index(np.broadcast_arrays(*coords), self.shape)
+        return self.values_at(coefficients, flat)
+
+    def plane_slice(self, coefficients, center, normal, spacing: float = 1.0) -> tuple:
+        """
+        三维任意平面：过 center、法向为 normal（均为网格下标坐标），按 spacing 采样
+        → (值 (nu, nv)，采样点坐标 (nu, nv, 3))；体外的点为 NaN，结果裁剪到与体相交的范围
+        只读取采样点周围 8 个角点的基底行，三线性插值
+        """
+        if len(self.shape) != 3:
+            raise ValueError("任意平面切片仅支持三维网格")
+        dims = np.asarray(self.shape, dtype=float)
+        center = np.asarray(center, dtype=float)
+        normal = np.asarray(normal, dtype=float)
+        if not np.any(normal):
+            raise ValueError("平面法向不能为零向量")
+        normal = normal / np.linalg.norm(normal)
+
+        # 平面内的正交方向
+        helper = np.eye(3)[np.argmin(np.abs(normal))]
+        u = np.cross(normal, helper)
+        u /= np.linalg.norm(u)
+        v = np.cross(normal, u)
+
+        # 以 center 为原点的整数步长，轴向平面上采样点与网格节点重合
+        half = int(np.ceil(np.linalg.norm(dims - 1) / spacing))
+        steps = np.arange(-half, half + 1) * spacing
+        pts = center + steps[:, None, None] * u + steps[None, :, None] * v
+        inside = np.all((pts >= 0) & (pts <= dims - 1), axis=-1)
+        if not inside.any():
+            raise ValueError("平面与网格不相交")
+        rows, cols = np.flatnonzero(inside.any(axis=1)), np.flatnonzero(inside.any(axis=0))
+        sl = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+        pts, inside = pts[sl], inside[sl]
+
+        # 三线性插值：每个点 8 个角点
+        p = pts[inside]
+        i0 = np.clip(np.floor(p).astype(np.intp), 0, np.maximum(np.asarray(self.shape) - 2, 0))
+        t = p - i0
+        corners = []
+        weights = []
+        for offset in np.ndindex(2, 2, 2):
+            off = np.asarray(offset)
+            idx = np.minimum(i0 + off, np.asarray(self.shape) - 1)
+            corners.append(np.ravel_multi_index(idx.T, self.shape))
+            weights.append(np.prod(np.where(off, t, 1 - t), axis=1))
+        corner_values = self.values_at(coefficients, np.stack(corners))
+        values = np.full(inside.shape, np.nan)
+        values[inside] = (corner_values * np.stack(weights)).sum(axis=0)
+        return values, pts
+
+    # ---------- 消费者 ----------
+    def summarize(self, coefficients, percentiles: tuple = None, bins: int = None,
+                  budget_bytes: int = BLOCK_BYTES) -> dict:
+        """
+        与 utils.field_stats.summarize 相同格式的统计摘要（两遍扫描，内存与网格大小无关）
+        最值/均值/标准差精确；分位数按 FINE_BINS 细分箱插值，误差不超过 (最大-最小)/FINE_BINS
+        """
+        from utils.field_stats import PERCENTILES, HIST_BINS
+        percentiles = percentiles or PERCENTILES
+        bins = bins or HIST_BINS
+
+        count, mean, m2 = 0, 0.0, 0.0
+        vmin, vmax = np.inf, -np.inf
+        for _, block in self.iter_blocks(coefficients, budget_bytes):
+            block = block[np.isfinite(block)]
+            if not block.size:
+                continue
+            n = block.size
+            block_mean = float(block.mean())
+            block_m2 = float(((block - block_mean) ** 2).sum())
+            delta = block_mean - mean
+            total = count + n
+            mean += delta * n / total
+            m2 += block_m2 + delta ** 2 * count * n / total
+            count = total
+            vmin, vmax = min(vmin, float(block.min())), max(vmax, float(block.max()))
+        if count == 0:
+            return {'count': 0}
+
+        span = vmax - vmin
+        fine = np.zeros(FINE_BINS, dtype=np.int64)
+        if span > 0:
+            for _, block in self.iter_blocks(coefficients, budget_bytes):
+                block = block[np.isfinite(block)]
+                idx = ((block - vmin) * (FINE_BINS / span)).astype(np.intp)
+                np.minimum(idx, FINE_BINS - 1, out=idx)
+                fine += np.bincount(idx, minlength=FINE_BINS)
+        else:
+            fine[0] = count
+
+        # 分位数：在累计分布上按 (n-1)·q 的次序位置插值
+        cdf = np.cumsum(fine)
+        width = span / FINE_BINS if span > 0 else 0.0
+        pct = {}
+        for p in percentiles:
+            rank = p / 100.0 * (count - 1) + 0.5
+            k = int(min(np.searchsorted(cdf, rank), FINE_BINS - 1))
+            before = cdf[k - 1] if k > 0 else 0
+            frac = (rank - before) / fine[k] if fine[k] else 0.5
+            pct[int(p)] = vmin + (k + min(max(frac, 0.0), 1.0)) * width
+
+        # 细分箱合并为显示用的粗直方图
+        edges = np.linspace(vmin, vmax if span > 0 else vmin + 1.0, bins + 1)
+        coarse = np.add.reduceat(fine, (np.arange(bins) * FINE_BINS) // bins)
+
+        return {
+            'count': int(count),
+            'min': vmin,
+            'max': vmax,
+            'mean': mean,
+            'std': float(np.sqrt(m2 / count)),
+            'percentiles': pct,
+            'hist_counts': coarse.tolist(),
+            'hist_edges': edges.tolist(),
+        }
+
+    def downsample(self, coefficients, factor: int, budget_bytes: int = BLOCK_BYTES) -> np.ndarray:
+        """块均值降采样：每个轴按 factor 合并（边缘不足一组的按实际个数平均）"""
+        out_shape = tuple(-(-n // factor) for n in self.shape)
+        out = np.empty(out_shape)
+        lead = 0
+        for start, block in self.iter_blocks(coefficients, budget_bytes, align=factor):
+            slab = block.reshape((-1,) + self.shape[1:])
+            for axis in range(slab.ndim):
+                slab = _pool(slab, factor, axis)
+            out[lead:lead + len(slab)] = slab
+            lead += len(slab)
+        return out
+
+    def downsample_factor(self, max_cells: int) -> int:
+        """使降采样后的单元数不超过 max_cells 的最小因子"""
+        factor = 1
+        while np.prod([-(-n // factor) for n in self.shape]) > max_cells:
+            factor += 1
+        return factor
+
+    def to_npy(self, coefficients, path: str, dtype=np.float32, budget_bytes: int = BLOCK_BYTES) -> str:
+        """全分辨率场逐块写入 .npy（形状为网格尺寸）"""
+        out = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=self.shape)
+        flat = out.reshape(-1)
+        for start, block in self.iter_blocks(coefficients, budget_bytes):
+            flat[start:start + len(block)] = block
+        out.flush()
+        del out
+        return path
+
+    def to_csv(self, coefficients, file, budget_bytes: int = BLOCK_BYTES, fmt: str = "%.6g"):
+        """全分辨率场逐块写入 CSV：每行为末轴上的一行数据"""
+        width = self.shape[-1]
+        for _, block in self.iter_blocks(coefficients, budget_bytes):
+            np.savetxt(file, block.reshape(-1, width), fmt=fmt, delimiter=",")
+
+
+def _pool(x: np.ndarray, factor: int, axis: int) -> np.ndarray:
+    n = x.shape[axis]
+    if factor == 1 or n == 1:
+        return x
+    starts = np.arange(0, n, factor)
+    counts = np.minimum(factor, n - starts).reshape((-1,) + (1,) * (x.ndim - axis - 1))
+    return np.add.reduceat(x, starts, axis=axis) / counts
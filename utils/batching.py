@@ -0,0 +1,125 @@
+"""
+请求合并与微批处理
+- 调用方 submit(item) 立即得到 Future；后台收集线程取出已排队的请求，若仍有批次在计算，
+  再最多等待 max_wait_s 或凑满 max_batch 个请求，即把这一批交给处理函数
+- 空闲时不等待：低负载下单个请求不增加延迟，负载越高批量越大
+- 同一批内相同的 item 只处理一次，结果分发给所有等待者
+- 处理在小线程池中执行，上一批计算时下一批已在收集；resize() 可在运行中调整线程数
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# 默认收集窗口（秒）、最大批量与处理线程数
+MAX_WAIT_S = 0.002
+MAX_BATCH = 64
+WORKERS = 2
+
+
+class MicroBatcher:
+    """
+    handler(items: list) -> list：按顺序返回每个 item 的结果，item 需可哈希
+    """
+
+    def __init__(self, handler, max_batch: int = MAX_BATCH, max_wait_s: float = MAX_WAIT_S,
+                 workers: int = WORKERS, name: str = "batcher"):
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_s
+        self.name = name
+        self._queue = queue.SimpleQueue()
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._inflight = 0
+        self.requests = 0
+        self.unique = 0
+        self.batches = 0
+
+    def submit(self, item) -> Future:
+        future = Future()
+        self._queue.put((item, future))
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._collect, name=f"{self.name}-collect", daemon=True)
+                    self._thread.start()
+        return future
+
+    def resize(self, workers: int):
+        """换用新线程数的线程池；已提交到旧线程池的批次照常完成"""
+        with self._lock:
+            if workers == self.workers:
+                return
+            old = self._pool
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=self.name)
+            self.workers = workers
+        old.shutdown(wait=False)
+
+    def __call__(self, item):
+        """同步调用：提交并等待结果"""
+        return self.submit(item).result()
+
+    def _collect(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait_s
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    pass
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0 or self._inflight == 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            # 在锁内提交，避免 resize() 恰好关闭了取到的旧线程池
+            with self._lock:
+                self._inflight += 1
+                self._pool.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: list):
+        try:
+            self._run(batch)
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+    def _run(self, batch: list):
+        waiters = {}
+        for item, future in batch:
+            if future.set_running_or_notify_cancel():
+                waiters.setdefault(item, []).append(future)
+        if not waiters:
+            return
+        items = list(waiters)
+        with self._lock:
+            self.requests += len(batch)
+            self.unique += len(items)
+            self.batches += 1
+        try:
+            results = self.handler(items)
+        except BaseException as e:
+            for futures in waiters.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+        for item, result in zip(items, results):
+            for future in waiters[item]:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'unique': self.unique,
+                'batches': self.batches,
+                'mean_batch': self.unique / self.batches if self.batches else 0.0,
+            }
@@ -0,0 +1,105 @@
+"""
+预测服务客户端（service.py）
+- 基于 requests.Session 的连接池，长连接复用（keep-alive），避免每次请求重新建立 TCP 连接
+- 场数据以 NPY（默认）或 Arrow IPC 接收，解码为 NumPy 数组
+"""
+
+import io
+import json
+
+import numpy as np
+
+DEFAULT_URL = "http://127.0.0.1:8600"
+NPY_MIME = "application/x-npy"
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+
+
+class ServiceError(RuntimeError):
+    pass
+
+
+def decode(content: bytes, mime: str) -> np.ndarray:
+    """响应体 → 数组（Arrow 各列按物理量重新堆叠）"""
+    if mime.startswith(ARROW_MIME):
+        import pyarrow as pa
+        table = pa.ipc.open_stream(content).read_all()
+        shape = json.loads(table.schema.metadata[b"shape"])
+        cols = [table.column(i).to_numpy() for i in range(table.num_columns)]
+        q_axis = len(shape) - 3
+        return np.stack([c.reshape(shape[:q_axis] + shape[q_axis + 1:]) for c in cols], axis=q_axis)
+    return np.load(io.BytesIO(content), allow_pickle=False)
+
+
+class PredictionClient:
+    """
+    用法：
+        with PredictionClient() as client:
+            out = client.predict((25, 2.5, 8, 600), quantities=("temp", "speed"))
+            out['fields']['temp']  # (H, W)
+    """
+
+    def __init__(self, base_url: str = DEFAULT_URL, pool_size: int = 8, timeout: float = 30.0,
+                 arrow: bool = False):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept"] = ARROW_MIME if arrow else NPY_MIME
+
+    # ---------- 请求 ----------
+    def _request(self, method: str, path: str, **kwargs):
+        resp = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+        if resp.status_code != 200:
+            try:
+                message = resp.json().get("error", resp.text)
+            except ValueError:
+                message = resp.text
+            raise ServiceError(f"{resp.status_code}: {message}")
+        return resp
+
+    def _fields(self, resp) -> tuple:
+        array = decode(resp.content, resp.headers.get("Content-Type", NPY_MIME))
+        quantities = resp.headers["X-Quantities"].split(",")
+        return array, quantities
+
+    def predict(self, params, quantities=("temp",)) -> dict:
+        """单个工况 → {'id', 'fields': {名称: (H, W)}, 'stats'}"""
+        resp = self._request("POST", "/predict",
+                             json={"params": [float(p) for p in params], "quantities": list(quantities)})
+        array, names = self._fields(resp)
+        return {
+            'id': resp.headers["X-Field-Id"],
+            'fields': dict(zip(names, array)),
+            'stats': json.loads(resp.headers["X-Field-Stats"]),
+        }
+
+    def predict_batch(self, params, quantities=("temp",)) -> dict:
+        """多个工况 → {'ids': [...], 'fields': (N, Q, H, W), 'quantities': [...]}"""
+        params = np.asarray(params, dtype=float).tolist()
+        resp = self._request("POST", "/predict/batch", json={"params": params, "quantities": list(quantities)})
+        array, names = self._fields(resp)
+        return {'ids': resp.headers["X-Field-Ids"].split(","), 'fields': array, 'quantities': names}
+
+    def field(self, field_id: str, quantities=("temp",)) -> dict:
+        """按 ID 取已计算的场 → {名称: (H, W)}"""
+        resp = self._request("GET", f"/fields/{field_id}", params={"quantities": ",".join(quantities)})
+        array, names = self._fields(resp)
+        return dict(zip(names, array))
+
+    def health(self) -> dict:
+        return self.session.get(self.base_url + "/health", timeout=self.timeout).json()
+
+    # ---------- 生命周期 ----------
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
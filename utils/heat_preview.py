@@ -0,0 +1,71 @@
+"""
+热传导温度场的拖动预览
+- 温度模型在 components.charts.create_temperature_field 中，只以其自身分辨率返回图表，
+  无法在粗网格上单独求值；因此这里不做低保真近似，也不在预览时求解
+- 每次输入稳定后的全分辨率结果按量化参数记录一份抽样副本（不超过 PREVIEW_SHAPE），
+  拖动滑块时命中同一档位即显示该副本，未命中时由页面沿用上一次结果
+- 量化档位比滑块步长更粗，拖回附近位置时直接命中
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# 抽样副本的网格上限 (ny, nx)
+PREVIEW_SHAPE = (25, 50)
+# 量化档位：功率、热导率、对流换热系数按对数等比分档（每档约 10%），环境温度按 °C 分档
+LOG_STEP = 0.1
+AMBIENT_STEP = 2
+# 记录条数上限（进程内共享，按最近使用淘汰）
+PREVIEW_CACHE_SIZE = 512
+
+_lock = threading.Lock()
+_fields = OrderedDict()   # 量化参数 -> (x, y, T)
+
+
+def quantize(params: dict) -> tuple:
+    """预览用的量化参数：功率/热导率/对流系数取对数后分档，环境温度按档位取整"""
+    def log_bin(v):
+        return round(float(np.log(v)) / LOG_STEP)
+
+    return (
+        log_bin(params['heat_source']),
+        log_bin(params['thermal_conductivity']),
+        round(params['ambient_temp'] / AMBIENT_STEP) * AMBIENT_STEP,
+        log_bin(params['convection_coeff'])
+    )
+
+
+def downsample(x: np.ndarray, y: np.ndarray, z: np.ndarray, shape: tuple) -> tuple:
+    """按整数步长抽样到不超过 shape 的网格"""
+    sy = max(1, -(-z.shape[0] // shape[0]))
+    sx = max(1, -(-z.shape[1] // shape[1]))
+    return x[::sx], y[::sy], z[::sy, ::sx]
+
+
+def remember_field(params: dict, fig, shape: tuple = PREVIEW_SHAPE):
+    """记录全分辨率结果（首条迹线为热力图的图表）的抽样副本，供同一档位的参数预览"""
+    trace = fig.data[0]
+    z = np.asarray(trace.z, dtype=float)
+    x = np.asarray(trace.x, dtype=float) if trace.x is not None else np.arange(z.shape[1], dtype=float)
+    y = np.asarray(trace.y, dtype=float) if trace.y is not None else np.arange(z.shape[0], dtype=float)
+    arrays = tuple(np.ascontiguousarray(a) for a in downsample(x, y, z, shape))
+    for a in arrays:
+        a.setflags(write=False)
+    key = quantize(params)
+    with _lock:
+        _fields[key] = arrays
+        _fields.move_to_end(key)
+        while len(_fields) > PREVIEW_CACHE_SIZE:
+            _fields.popitem(last=False)
+
+
+def preview_field(params: dict):
+    """同一档位已记录的温度场 → (x, y, T)（只读），未记录时返回 None"""
+    key = quantize(params)
+    with _lock:
+        arrays = _fields.get(key)
+        if arrays is not None:
+            _fields.move_to_end(key)
+    return arrays
@@ -0,0 +1,349 @@
+"""
+电厂实时数据接入
+- 数据源（asyncio 异步迭代器）：文件追踪（CSV / JSON 行）、TCP Socket 行协议、模拟 OPC 点位
+- 去抖 + 批处理：测点更新在静默 debounce 秒后（或累计到 max_batch / 超过 max_wait）一次性送入合成引擎
+- 一批工况一次矩阵乘合成，结果（场 + 统计摘要）进入定长滚动窗口，页面直接读取，不再重复计算
+- 事件循环在后台守护线程中运行；同一数据源（含去抖参数）在进程内只运行一个接入器，所有会话共享，
+  按会话引用计数，最后一个会话释放（停止、切换数据源或会话结束）时才停止
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+import weakref
+from collections import deque
+
+import numpy as np
+
+from utils.synthesis import N_MODES, calculate_coefficients_batch
+from utils.field_result import FieldResult
+from utils.field_stats import basis_moments, field_statistics_batch
+
+# 测点名（与前台参数一一对应）
+TAGS = ("p1", "p2", "p3", "p4")
+
+# 默认去抖时间、最长等待时间（秒）与单批上限
+DEBOUNCE_S = 0.5
+MAX_WAIT_S = 2.0
+MAX_BATCH = 64
+# 滚动窗口长度（条）
+WINDOW = 120
+
+
+def parse_line(line: str) -> dict:
+    """解析一行测量数据：JSON 对象，或逗号分隔的 p1,p2,p3,p4 / t,p1,p2,p3,p4；无法解析返回 None"""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    try:
+        if line.startswith("{"):
+            data = json.loads(line)
+            values = [float(data[tag]) for tag in TAGS]
+            t = float(data.get('t', time.time()))
+        else:
+            parts = [float(v) for v in line.split(",")]
+            if len(parts) == 4:
+                t, values = time.time(), parts
+            elif len(parts) == 5:
+                t, values = parts[0], parts[1:]
+            else:
+                return None
+    except (ValueError, KeyError, TypeError):
+        return None
+    return {'t': t, 'params': tuple(values)}
+
+
+# ==================== 数据源 ====================
+async def file_tail(path: str, poll: float = 0.5, from_start: bool = False):
+    """追踪文件新增行（类似 tail -f），文件被截断时从头重读"""
+    pos = 0 if from_start or not os.path.exists(path) else os.path.getsize(path)
+    buffer = ""
+    while True:
+        if os.path.exists(path):
+            size = os.path.getsize(path)
+            if size < pos:
+                pos, buffer = 0, ""
+            if size > pos:
+                with open(path, "r", encoding="utf-8") as f:
+                    f.seek(pos)
+                    buffer += f.read()
+                    pos = f.tell()
+                *lines, buffer = buffer.split("\n")
+                for line in lines:
+                    m = parse_line(line)
+                    if m is not None:
+                        yield m
+        await asyncio.sleep(poll)
+
+
+async def socket_source(host: str, port: int, retry: float = 2.0):
+    """TCP 行协议数据源，断线后自动重连"""
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            await asyncio.sleep(retry)
+            continue
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                m = parse_line(raw.decode("utf-8", errors="replace"))
+                if m is not None:
+                    yield m
+        finally:
+            writer.close()
+        await asyncio.sleep(retry)
+
+
+async def mock_opc_source(base: tuple, interval: float = 0.2, noise: tuple = (0.05, 0.2, 0.01, 2.0),
+                          seed: int = None):
+    """模拟 OPC 点位：各测点在基准值附近随机游走，按 interval 秒逐点推送"""
+    rng = random.Random(seed)
+    values = list(base)
+    while True:
+        for i, sigma in enumerate(noise):
+            # 向基准值回归的随机游走
+            values[i] += 0.05 * (base[i] - values[i]) + rng.gauss(0.0, sigma)
+            values[i] = max(values[i], 0.0)
+        yield {'t': time.time(), 'params': tuple(values)}
+        await asyncio.sleep(interval)
+
+
+# ==================== 接入器 ====================
+class LiveIngestor:
+    """消费一个数据源，去抖批处理后持续预测，维护最近结果的滚动窗口"""
+
+    def __init__(self, source_factory, basis: np.ndarray, shape: tuple, digest: str = None,
+                 debounce: float = DEBOUNCE_S, max_wait: float = MAX_WAIT_S,
+                 max_batch: int = MAX_BATCH, window: int = WINDOW):
+        self._source_factory = source_factory
+        self._modes = basis[:, :N_MODES]
+        self._moments = basis_moments(self._modes, digest)
+        self.shape = shape
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+
+        self._lock = threading.Lock()
+        self._lifecycle = threading.Lock()
+        self._window = deque(maxlen=window)
+        self._thread = None
+        self._loop = None
+        self._stopping = False
+        # 停止事件在启动前即存在：线程尚未进入事件循环时调用 stop() 也能生效
+        self._stop = asyncio.Event()
+        self.version = 0          # 每次有新结果时递增，页面据此判断是否需要刷新
+        self.received = 0
+        self.predicted = 0
+        self.batches = 0
+        self.error = None
+
+    # ---------- 生命周期 ----------
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, timeout: float = 2.0):
+        """
+        启动接入线程（已在运行时不做任何事）
+        上一次 stop() 超时、旧线程仍未退出时先等待其退出；仍未退出则不启动并记录错误，
+        避免两个事件循环同时写入滚动窗口与计数
+        """
+        with self._lifecycle:
+            thread = self._thread
+            if thread is not None and thread.is_alive():
+                if not self._stopping:
+                    return
+                thread.join(timeout)
+                if thread.is_alive():
+                    self.error = "上一次接入尚未停止，请稍后重试"
+                    return
+            self._stopping = False
+            self.error = None
+            # 事件循环与停止事件在线程启动前创建，stop() 随时可以投递
+            self._loop = asyncio.new_event_loop()
+            self._stop = asyncio.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._loop,), name="live-ingest", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """请求停止并等待线程退出；超时后线程仍保留，start() 据此等待其退出"""
+        with self._lifecycle:
+            loop, thread = self._loop, self._thread
+            self._stopping = True
+            if loop is not None:
+                try:
+                    loop.call_soon_threadsafe(self._stop.set)
+                except RuntimeError:
+                    pass  # 事件循环已结束
+            if thread is not None:
+                thread.join(timeout)
+                if not thread.is_alive():
+                    self._thread = None
+
+    def _run(self, loop: asyncio.AbstractEventLoop):
+        try:
+            loop.run_until_complete(self._main())
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            loop.close()
+            if self._loop is loop:
+                self._loop = None
+
+    async def _main(self):
+        queue = asyncio.Queue()
+        consumer = asyncio.ensure_future(self._consume(queue))
+        producer = asyncio.ensure_future(self._produce(queue))
+        stopper = asyncio.ensure_future(self._stop.wait())
+        done, pending = await asyncio.wait({consumer, producer, stopper}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in done:
+            if task is not stopper and task.exception() is not None:
+                raise task.exception()
+
+    async def _produce(self, queue: asyncio.Queue):
+        async for m in self._source_factory():
+            self.received += 1
+            queue.put_nowait(m)
+
+    async def _consume(self, queue: asyncio.Queue):
+        """去抖：首条到达后，静默 debounce 秒或等待超过 max_wait 或满 max_batch 即处理一批"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = min(self.debounce, deadline - loop.time())
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # 合成在线程池中执行，不阻塞数据接收
+            samples = await loop.run_in_executor(None, self._predict, batch)
+            with self._lock:
+                self._window.extend(samples)
+                self.predicted += len(samples)
+                self.batches += 1
+                self.version += 1
+
+    def _predict(self, batch: list) -> list:
+        """一批工况一次矩阵乘合成，梯度与统计量整批计算；连续相同工况只合成一次"""
+        params = np.array([m['params'] for m in batch], dtype=float)
+        keep = np.ones(len(params), dtype=bool)
+        keep[1:] = np.any(params[1:] != params[:-1], axis=1)
+        coeffs = calculate_coefficients_batch(params[keep])
+        fields = coeffs @ self._modes.T
+
+        results = FieldResult.from_fields(fields.reshape((-1,) + tuple(self.shape)))
+        samples = []
+        for m, result, stats in zip([m for m, k in zip(batch, keep) if k], results,
+                                    field_statistics_batch(results, coeffs, self._moments)):
+            result.stats = stats
+            samples.append({'t': m['t'], 'params': m['params'], 'result': result})
+        return samples
+
+    # ---------- 读取 ----------
+    def snapshot(self) -> list:
+        """滚动窗口的副本（按时间先后）"""
+        with self._lock:
+            return list(self._window)
+
+    def latest(self):
+        with self._lock:
+            return self._window[-1] if self._window else None
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                'running': self.running,
+                'received': self.received,
+                'predicted': self.predicted,
+                'batches': self.batches,
+                'window': len(self._window),
+                'error': self.error,
+            }
+
+
+# 进程级接入器：数据源描述 -> [LiveIngestor, 引用该接入器的会话数]
+_INGESTORS = {}
+_INGESTORS_LOCK = threading.Lock()
+
+
+def attach_ingestor(spec: str, source_factory, basis: np.ndarray, shape: tuple, digest: str = None,
+                    **kwargs) -> LiveIngestor:
+    """取得（必要时创建并启动）数据源对应的接入器并增加一次引用；同一数据源所有会话共享"""
+    with _INGESTORS_LOCK:
+        entry = _INGESTORS.get(spec)
+        if entry is None:
+            entry = _INGESTORS[spec] = [LiveIngestor(source_factory, basis, shape, digest, **kwargs), 0]
+        entry[1] += 1
+        ingestor = entry[0]
+    ingestor.start()
+    return ingestor
+
+
+def release_ingestor(spec: str):
+    """释放一次引用，没有会话引用时停止并移除接入器"""
+    with _INGESTORS_LOCK:
+        entry = _INGESTORS.get(spec)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] > 0:
+            return
+        del _INGESTORS[spec]
+    entry[0].stop()
+
+
+def find_ingestor(spec: str):
+    """已创建的接入器，不存在时返回 None"""
+    with _INGESTORS_LOCK:
+        entry = _INGESTORS.get(spec)
+        return entry[0] if entry is not None else None
+
+
+class LiveAttachment:
+    """
+    会话对接入器的引用（至多一个数据源）
+    接入新数据源时释放旧的；会话对象被回收时自动释放
+    """
+
+    def __init__(self):
+        self._spec = [None]
+        weakref.finalize(self, LiveAttachment._release, self._spec)
+
+    @staticmethod
+    def _release(spec: list):
+        if spec[0] is not None:
+            release_ingestor(spec[0])
+            spec[0] = None
+
+    @property
+    def spec(self):
+        return self._spec[0]
+
+    def attach(self, spec: str, source_factory, basis: np.ndarray, shape: tuple, digest: str = None,
+               **kwargs) -> LiveIngestor:
+        if spec == self._spec[0]:
+            ingestor = find_ingestor(spec)
+            if ingestor is not None:
+                ingestor.start()
+                return ingestor
+            self._spec[0] = None  # 引用已失效（例如接入器被外部移除）
+        ingestor = attach_ingestor(spec, source_factory, basis, shape, digest, **kwargs)
+        self.detach()
+        self._spec[0] = spec
+        return ingestor
+
+    def detach(self):
+        LiveAttachment._release(self._spec)
@@ -0,0 +1,170 @@
+"""
+反问题：由实测（或导入的）温度场反推运行参数 p1..p4
+- 第一步（线性）：场 ≈ 基底 · 系数，8 个系数的最小二乘解由基底 QR 分解闭式给出，多帧一次矩阵乘
+- 第二步（非线性）：在系数空间按基底 Gram 矩阵加权（等价于场空间误差）拟合 calculate_coefficients(p)，
+  所有帧 × 所有初值同时做向量化 Levenberg-Marquardt，参数限制在 PARAM_BOUNDS 内，每帧取最优初值
+- 场残差由正交分解直接得到：‖Bc(p) − y‖² = ‖Bĉ − y‖² + (c(p) − ĉ)ᵀG(c(p) − ĉ)，无需重新合成
+"""
+
+import time
+
+import numpy as np
+
+from utils.synthesis import N_MODES, calculate_coefficients_batch
+from utils.surrogate import PARAM_BOUNDS, sample_params
+
+# 默认初值数、迭代上限与收敛容差（归一化参数空间）
+N_STARTS = 8
+MAX_ITER = 50
+TOL = 1e-9
+# 数值雅可比的差分步长（归一化参数空间）
+FD_STEP = 1e-6
+
+# 分解缓存：基底摘要 -> (伪逆 (8, 单元数), Q, R)；Gram 矩阵 G = BᵀB = RᵀR
+_FACTOR_CACHE = {}
+
+
+def frames_from_table(values: np.ndarray, n_cells: int) -> np.ndarray:
+    """
+    将导入的表格整理为 (帧数, 单元数)
+    支持：单个网格 (H×W)、每列一帧 (单元数×帧数)、每行一帧 (帧数×单元数)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == n_cells:
+        return values.reshape(1, n_cells)
+    if values.ndim == 2 and values.shape[0] == n_cells:
+        return np.ascontiguousarray(values.T)
+    if values.ndim == 2 and values.shape[1] == n_cells:
+        return values
+    raise ValueError(f"无法将形状 {values.shape} 的数据整理为单元数为 {n_cells} 的场")
+
+
+class InverseSolver:
+    """基于基底矩阵与 calculate_coefficients 的参数反演"""
+
+    def __init__(self, basis: np.ndarray, digest: str = None, bounds: np.ndarray = PARAM_BOUNDS):
+        self.modes = basis[:, :N_MODES]
+        self.bounds = np.asarray(bounds, dtype=float)
+        cached = _FACTOR_CACHE.get(digest) if digest is not None else None
+        if cached is None:
+            q, r = np.linalg.qr(self.modes)
+            pinv = np.linalg.solve(r, q.T)
+            cached = (pinv, q, r)
+            if digest is not None:
+                _FACTOR_CACHE[digest] = cached
+        self._pinv, self._q, self._r = cached
+
+    # ---------- 第一步：系数 ----------
+    def fit_coefficients(self, frames: np.ndarray) -> tuple:
+        """
+        frames：(帧数, 单元数)；返回 (系数 (帧数, 8), 线性残差平方和 (帧数,))
+        含 NaN（缺测单元）的帧按有效单元单独求解
+        """
+        frames = np.asarray(frames, dtype=np.float64)
+        finite = np.isfinite(frames).all(axis=1)
+        coeffs = np.empty((len(frames), N_MODES))
+        sse = np.empty(len(frames))
+
+        if finite.any():
+            y = frames[finite]
+            coeffs[finite] = y @ self._pinv.T
+            proj = y @ self._q
+            sse[finite] = np.maximum(np.einsum('ij,ij->i', y, y) - np.einsum('ij,ij->i', proj, proj), 0.0)
+        for i in np.nonzero(~finite)[0]:
+            ok = np.isfinite(frames[i])
+            c, *_ = np.linalg.lstsq(self.modes[ok], frames[i, ok], rcond=None)
+            coeffs[i] = c
+            sse[i] = float(np.sum((self.modes[ok] @ c - frames[i, ok]) ** 2))
+        return coeffs, sse
+
+    # ---------- 第二步：参数 ----------
+    def _weighted(self, params: np.ndarray, target: np.ndarray) -> np.ndarray:
+        """加权系数残差 R·(c(p) − ĉ)，其平方和等于场空间的额外误差"""
+        return (calculate_coefficients_batch(params) - target) @ self._r.T
+
+    def fit_params(self, coeffs: np.ndarray, n_starts: int = N_STARTS, max_iter: int = MAX_ITER,
+                   rng=0, tol: float = TOL) -> tuple:
+        """
+        多初值向量化 LM 拟合：返回 (参数 (帧数, 4), 加权残差平方和 (帧数,), 迭代次数)
+        """
+        coeffs = np.atleast_2d(coeffs)
+        n_frames = len(coeffs)
+        lo, span = self.bounds[:, 0], self.bounds[:, 1] - self.bounds[:, 0]
+
+        # 每帧相同的一组拉丁超立方初值 → (帧数 × 初值数) 个独立问题
+        starts = (sample_params(n_starts, self.bounds, rng) - lo) / span
+        u = np.tile(starts, (n_frames, 1))
+        target = np.repeat(coeffs, n_starts, axis=0)
+        lam = np.full(len(u), 1e-3)
+        eye = np.eye(len(lo))
+
+        r = self._weighted(lo + u * span, target)
+        cost = np.einsum('ij,ij->i', r, r)
+        it = 0
+        for it in range(1, max_iter + 1):
+            # 中心差分雅可比 (问题数, 8, 4)
+            jac = np.empty(r.shape + (len(lo),))
+            for k in range(len(lo)):
+                step = np.zeros(len(lo))
+                step[k] = FD_STEP
+                jac[:, :, k] = (self._weighted(lo + (u + step) * span, target)
+                                - self._weighted(lo + (u - step) * span, target)) / (2 * FD_STEP)
+            jtj = np.einsum('nik,nil->nkl', jac, jac)
+            g = np.einsum('nik,ni->nk', jac, r)
+            damp = lam[:, None, None] * (jtj * eye + 1e-12 * eye)
+            delta = -np.linalg.solve(jtj + damp, g[..., None])[..., 0]
+
+            trial = np.clip(u + delta, 0.0, 1.0)
+            r_trial = self._weighted(lo + trial * span, target)
+            cost_trial = np.einsum('ij,ij->i', r_trial, r_trial)
+            better = cost_trial < cost
+            u = np.where(better[:, None], trial, u)
+            r = np.where(better[:, None], r_trial, r)
+            cost = np.where(better, cost_trial, cost)
+            lam = np.where(better, lam * 0.3, lam * 10.0)
+
+            # 全部问题步长足够小（或阻尼已发散）即停止
+            if np.all((np.max(np.abs(delta), axis=1) < tol) | (lam > 1e12)):
+                break
+
+        cost = cost.reshape(n_frames, n_starts)
+        best = np.argmin(cost, axis=1)
+        params = (lo + u * span).reshape(n_frames, n_starts, -1)[np.arange(n_frames), best]
+        return params, cost[np.arange(n_frames), best], it
+
+    # ---------- 完整流程 ----------
+    def solve(self, frames, n_starts: int = N_STARTS, max_iter: int = MAX_ITER, rng=0, tol: float = TOL) -> dict:
+        """
+        frames：单个场 (H, W) / (单元数,)，或多帧 (帧数, H, W) / (帧数, 单元数)
+        返回参数、系数、残差与吞吐量
+        """
+        frames = np.asarray(frames, dtype=np.float64)
+        n_cells = self.modes.shape[0]
+        if frames.size % n_cells:
+            raise ValueError(f"场的单元数与基底不一致（基底 {n_cells} 个单元，数据 {frames.size} 个值）")
+        frames = frames.reshape(-1, n_cells)
+
+        t0 = time.perf_counter()
+        coeffs, sse_linear = self.fit_coefficients(frames)
+        params, sse_extra, iterations = self.fit_params(coeffs, n_starts, max_iter, rng, tol)
+        # fit_params 的额外误差按完整基底的度量计算；含 NaN 的帧改用有效单元上的基底计算，
+        # 与其线性残差（同样只在有效单元上）属于同一范数
+        for i in np.nonzero(~np.isfinite(frames).all(axis=1))[0]:
+            ok = np.isfinite(frames[i])
+            diff = calculate_coefficients_batch(params[i])[0] - coeffs[i]
+            sse_extra[i] = float(np.sum((self.modes[ok] @ diff) ** 2))
+        elapsed = time.perf_counter() - t0
+
+        norms = np.sqrt(np.nansum(frames ** 2, axis=1))
+        sse = sse_linear + sse_extra
+        valid = np.isfinite(frames).sum(axis=1)
+        return {
+            'params': params,
+            'coefficients': coeffs,
+            'rms_linear': np.sqrt(sse_linear / valid),
+            'rms': np.sqrt(sse / valid),
+            'rel_l2': np.sqrt(sse) / np.maximum(norms, 1e-300),
+            'iterations': iterations,
+            'elapsed_s': elapsed,
+            'throughput': len(frames) / elapsed if elapsed > 0 else float('inf'),
+        }
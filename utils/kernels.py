@@ -0,0 +1,203 @@
+"""
+加速内核（可选 numba）
+- 热点循环：流线追踪（所有种子同时推进）、矢量箭头端点、派生量差分模板（见 utils.derived）
+- 安装 numba 时使用 @njit(parallel=True) 编译版（按种子 / 按行 prange 并行），否则使用 NumPy 向量化版；
+  两者的浮点运算顺序相同，结果逐元素一致（一致性检查与基准见 bench_kernels.py）
+- 首次调用时才导入并编译 numba（cache=True，编译结果写入 __pycache__，后续进程直接加载），不影响冷启动
+- 设置环境变量 CFD_NUMBA=0 可强制使用 NumPy 版（对比或排查时使用）
+- 编译版内核的调用串行进行：numba 默认的 workqueue 线程层不能被多个线程同时进入（会直接终止进程），
+  而页面会话与服务线程会并发调用；每次调用内部已按 prange 并行，串行不损失吞吐
+"""
+
+import os
+import threading
+
+import numpy as np
+
+# 低于该速度视为停滞：流线在此处终止、不绘制箭头
+MIN_SPEED = 0.001
+
+# 编译版内核中的并行循环；编译前替换为 numba.prange，未编译时即为 range
+prange = range
+
+_lock = threading.Lock()
+_call_lock = threading.Lock()  # 串行化编译版内核的调用
+_compiled = None  # None：尚未检测；{}：numba 不可用；否则为 {名称: 编译后的函数}
+
+
+def _compile() -> dict:
+    if os.environ.get("CFD_NUMBA", "1") == "0":
+        return {}
+    try:
+        import numba
+    except ImportError:
+        return {}
+    global prange
+    prange = numba.prange
+    jit = numba.njit(parallel=True, cache=True)
+    return {'trace': jit(_trace_loop), 'derived': jit(_derived_loop)}
+
+
+def _kernels() -> dict:
+    global _compiled
+    if _compiled is None:
+        with _lock:
+            if _compiled is None:
+                _compiled = _compile()
+    return _compiled
+
+
+def backend() -> str:
+    """当前使用的实现：numba / numpy"""
+    return "numba" if _kernels() else "numpy"
+
+
+def set_backend(name: str) -> str:
+    """切换实现（一致性检查与基准用）：numba 不可用时保持 numpy，返回实际使用的实现"""
+    global _compiled
+    with _lock:
+        _compiled = _compile() if name == "numba" else {}
+    return backend()
+
+
+# ==================== 流线追踪 ====================
+
+def trace_streamlines(u: np.ndarray, v: np.ndarray, speed: np.ndarray, seeds_x, seeds_y,
+                      ds: float, n_steps: int, min_speed: float = MIN_SPEED) -> tuple:
+    """
+    从各种子点沿归一化速度方向以步长 ds 追踪至多 n_steps 步（取所在单元的速度）
+    → (xs, ys, counts)：(种子数, n_steps + 1) 的坐标（未到达的步为 NaN）与每条流线的点数
+    速度低于 min_speed 或离开网格时终止
+    """
+    seeds_x = np.asarray(seeds_x, dtype=np.float64)
+    seeds_y = np.asarray(seeds_y, dtype=np.float64)
+    xs = np.full((len(seeds_x), n_steps + 1), np.nan)
+    ys = np.full((len(seeds_x), n_steps + 1), np.nan)
+    xs[:, 0] = seeds_x
+    ys[:, 0] = seeds_y
+    counts = np.ones(len(seeds_x), dtype=np.intp)
+
+    kernel = _kernels().get('trace')
+    if kernel is not None:
+        with _call_lock:
+            kernel(u, v, speed, seeds_x, seeds_y, float(ds), int(n_steps), float(min_speed), xs, ys, counts)
+    else:
+        _trace_numpy(u, v, speed, seeds_x, seeds_y, ds, n_steps, min_speed, xs, ys, counts)
+    return xs, ys, counts
+
+
+def _trace_loop(u, v, speed, seeds_x, seeds_y, ds, n_steps, min_speed, xs, ys, counts):
+    h, w = u.shape
+    for s in prange(seeds_x.shape[0]):
+        px = seeds_x[s]
+        py = seeds_y[s]
+        if not (0 <= px < w and 0 <= py < h):
+            continue
+        for k in range(1, n_steps + 1):
+            iy = int(py)
+            ix = int(px)
+            ss = np.float64(speed[iy, ix])
+            if ss <= min_speed:
+                break
+            nx = px + np.float64(u[iy, ix]) / ss * ds
+            ny = py + np.float64(v[iy, ix]) / ss * ds
+            if not (0 <= nx < w and 0 <= ny < h):
+                break
+            px = nx
+            py = ny
+            xs[s, k] = nx
+            ys[s, k] = ny
+            counts[s] += 1
+
+
+def _trace_numpy(u, v, speed, seeds_x, seeds_y, ds, n_steps, min_speed, xs, ys, counts):
+    """所有仍在推进的种子同步走一步，每步一次向量化取值"""
+    h, w = u.shape
+    px, py = seeds_x.copy(), seeds_y.copy()
+    active = np.flatnonzero((px >= 0) & (px < w) & (py >= 0) & (py < h))
+    for k in range(1, n_steps + 1):
+        if active.size == 0:
+            break
+        iy = py[active].astype(np.intp)
+        ix = px[active].astype(np.intp)
+        ss = speed[iy, ix].astype(np.float64)
+        moving = ss > min_speed
+        active, iy, ix, ss = active[moving], iy[moving], ix[moving], ss[moving]
+        nx = px[active] + u[iy, ix].astype(np.float64) / ss * ds
+        ny = py[active] + v[iy, ix].astype(np.float64) / ss * ds
+        inside = (nx >= 0) & (nx < w) & (ny >= 0) & (ny < h)
+        active, nx, ny = active[inside], nx[inside], ny[inside]
+        px[active] = nx
+        py[active] = ny
+        xs[active, k] = nx
+        ys[active, k] = ny
+        counts[active] += 1
+
+
+def polyline(xs: np.ndarray, ys: np.ndarray, counts: np.ndarray, min_points: int = 3) -> tuple:
+    """多条流线 → 以 NaN 分隔的单条折线 (x, y)，可用一个 Scatter 轨迹绘制全部流线"""
+    keep = counts >= min_points
+    xs, ys = xs[keep], ys[keep]
+    pad = np.full((len(xs), 1), np.nan)
+    return np.hstack([xs, pad]).ravel(), np.hstack([ys, pad]).ravel()
+
+
+# ==================== 矢量箭头 ====================
+
+def arrow_endpoints(u: np.ndarray, v: np.ndarray, speed: np.ndarray, step: int, scale: float,
+                    min_speed: float = MIN_SPEED) -> tuple:
+    """
+    每隔 step 个单元取一个箭头，方向归一化、长度为 scale → (x0, y0, x1, y1)，按行优先顺序
+    只是一次跨步取值，NumPy 向量化已足够，不需要编译版
+    """
+    s = np.asarray(speed[::step, ::step], dtype=np.float64)
+    iy, ix = np.nonzero(s > min_speed)
+    s = s[iy, ix]
+    x0 = (ix * step).astype(np.float64)
+    y0 = (iy * step).astype(np.float64)
+    x1 = x0 + np.asarray(u[::step, ::step], dtype=np.float64)[iy, ix] / s * scale
+    y1 = y0 + np.asarray(v[::step, ::step], dtype=np.float64)[iy, ix] / s * scale
+    return x0, y0, x1, y1
+
+
+# ==================== 派生量差分模板 ====================
+
+def derived_fused(u: np.ndarray, v: np.ndarray, slots, conductivity: float):
+    """
+    编译版的派生量融合模板：一次遍历同时写出所有请求的量
+    slots 依次对应 (涡量, 散度, 热流密度, 温度拉普拉斯)，值为输出层下标，-1 表示不需要
+    → (层数, H, W) float32；numba 不可用时返回 None，由调用方使用分块 NumPy 版
+    """
+    kernel = _kernels().get('derived')
+    if kernel is None:
+        return None
+    slots = np.asarray(slots, dtype=np.intp)
+    out = np.empty((int((slots >= 0).sum()),) + u.shape, dtype=np.float32)
+    with _call_lock:
+        kernel(u, v, slots, float(conductivity), out)
+    return out
+
+
+def _derived_loop(u, v, slots, conductivity, out):
+    # 差分与 np.gradient 相同：内部 (f[i+1] - f[i-1]) / 2，边界一阶单侧差分
+    h, w = u.shape
+    for i in prange(h):
+        i0 = max(i - 1, 0)
+        i1 = min(i + 1, h - 1)
+        dy = 2.0 if 0 < i < h - 1 else 1.0
+        for j in range(w):
+            j0 = max(j - 1, 0)
+            j1 = min(j + 1, w - 1)
+            dx = 2.0 if 0 < j < w - 1 else 1.0
+            du_dx = (np.float64(u[i, j1]) - np.float64(u[i, j0])) / dx
+            dv_dx = (np.float64(v[i, j1]) - np.float64(v[i, j0])) / dx
+            du_dy = (np.float64(u[i1, j]) - np.float64(u[i0, j])) / dy
+            dv_dy = (np.float64(v[i1, j]) - np.float64(v[i0, j])) / dy
+            if slots[0] >= 0:
+                out[slots[0], i, j] = dv_dx - du_dy
+            if slots[1] >= 0:
+                out[slots[1], i, j] = du_dx + dv_dy
+            if slots[2] >= 0:
+                out[slots[2], i, j] = np.hypot(np.float64(u[i, j]), np.float64(v[i, j])) * conductivity
+            if slots[3] >= 0:
+                out[slots[3], i, j] = du_dx - dv_dy
@@ -0,0 +1,189 @@
+"""
+极简 PDF 写出（仅依赖 zlib，无需第三方库）
+- 中文使用 PDF 阅读器内置的 Adobe 标准 CJK 字体 STSong-Light（UniGB-UCS2-H 编码），无需嵌入字体
+- 支持标题、段落（按宽度自动换行）、表格、图像（RGB 经 FlateDecode 压缩）与自动分页
+"""
+
+import zlib
+
+import numpy as np
+
+# A4 页面尺寸与页边距（pt）
+PAGE_SIZE = (595.0, 842.0)
+MARGIN = 50.0
+
+
+def _text_width(text: str, size: float) -> float:
+    """估算文本宽度：ASCII 半角，其余全角"""
+    return sum(0.5 if ord(ch) < 128 else 1.0 for ch in text) * size
+
+
+def _hex(text: str) -> str:
+    # 仅保留基本多文种平面字符（UCS-2）
+    return "".join(ch for ch in text if ord(ch) <= 0xFFFF).encode("utf-16-be").hex()
+
+
+class PdfDocument:
+    """按自上而下的流式布局写出 PDF"""
+
+    def __init__(self, page_size: tuple = PAGE_SIZE, margin: float = MARGIN):
+        self.width, self.height = page_size
+        self.margin = margin
+        self._pages = []        # 每页：(内容流片段列表, 使用的图像名列表)
+        self._images = []       # (名称, 宽, 高, 过滤器, 压缩后的图像数据)
+        self._new_page()
+
+    # ---------- 布局 ----------
+    @property
+    def content_width(self) -> float:
+        return self.width - 2 * self.margin
+
+    def _new_page(self):
+        self._pages.append(([], []))
+        self._y = self.height - self.margin
+
+    def _ensure(self, height: float):
+        if self._y - height < self.margin:
+            self._new_page()
+
+    def _text(self, x: float, y: float, text: str, size: float):
+        self._pages[-1][0].append(f"BT /F1 {size:g} Tf {x:.2f} {y:.2f} Td <{_hex(text)}> Tj ET")
+
+    def _wrap(self, text: str, size: float, width: float) -> list:
+        lines = []
+        for para in text.split("\n"):
+            line = ""
+            for ch in para:
+                if _text_width(line + ch, size) > width and line:
+                    lines.append(line)
+                    line = ""
+                line += ch
+            lines.append(line)
+        return lines
+
+    def spacer(self, height: float):
+        self._y -= height
+
+    def heading(self, text: str, size: float = 16):
+        self._ensure(size * 2)
+        self._y -= size * 1.4
+        self._text(self.margin, self._y, text, size)
+        self._y -= size * 0.4
+
+    def paragraph(self, text: str, size: float = 10.5, leading: float = 1.5):
+        for line in self._wrap(text, size, self.content_width):
+            self._ensure(size * leading)
+            self._y -= size * leading
+            self._text(self.margin, self._y, line, size)
+
+    def rule(self):
+        self._ensure(8)
+        self._y -= 4
+        self._pages[-1][0].append(
+            f"0.7 G 0.5 w {self.margin:.2f} {self._y:.2f} m {self.width - self.margin:.2f} {self._y:.2f} l S 0 G"
+        )
+        self._y -= 4
+
+    def table(self, rows: list, header: bool = True, size: float = 9.5, col_widths: list = None):
+        """rows：字符串二维列表；首行为表头时加粗线分隔"""
+        if not rows:
+            return
+        n = len(rows[0])
+        widths = col_widths or [self.content_width / n] * n
+        row_h = size * 1.8
+        for r, row in enumerate(rows):
+            self._ensure(row_h)
+            self._y -= row_h
+            x = self.margin
+            for cell, w in zip(row, widths):
+                cell = str(cell)
+                while cell and _text_width(cell, size) > w - 6:
+                    cell = cell[:-1]
+                self._text(x + 3, self._y + size * 0.5, cell, size)
+                x += w
+            gray = "0.3" if (header and r == 0) else "0.8"
+            self._pages[-1][0].append(
+                f"{gray} G 0.5 w {self.margin:.2f} {self._y:.2f} m "
+                f"{self.margin + sum(widths):.2f} {self._y:.2f} l S 0 G"
+            )
+
+    def image(self, rgb: np.ndarray, max_width: float = None, max_height: float = 360):
+        """RGB (H, W, 3) uint8 图像，按比例缩放到可用宽高内"""
+        h, w = rgb.shape[:2]
+        data = zlib.compress(np.ascontiguousarray(rgb[..., :3], dtype=np.uint8).tobytes(), 6)
+        self._place(w, h, "/FlateDecode", data, max_width, max_height)
+
+    def _place(self, w: int, h: int, filt: str, data: bytes, max_width: float, max_height: float):
+        max_width = max_width or self.content_width
+        scale = min(max_width / w, max_height / h)
+        dw, dh = w * scale, h * scale
+        self._ensure(dh + 6)
+        self._y -= dh + 6
+
+        name = f"Im{len(self._images) + 1}"
+        self._images.append((name, w, h, filt, data))
+        self._pages[-1][1].append(name)
+        x = self.margin + (self.content_width - dw) / 2
+        self._pages[-1][0].append(f"q {dw:.2f} 0 0 {dh:.2f} {x:.2f} {self._y:.2f} cm /{name} Do Q")
+
+    # ---------- 输出 ----------
+    def to_bytes(self) -> bytes:
+        objects = []
+
+        def add(body) -> int:
+            objects.append(body if isinstance(body, bytes) else body.encode("latin-1"))
+            return len(objects)
+
+        catalog = add("")                 # 占位，最后填写
+        pages_id = add("")
+        font_desc = add(
+            "<< /Type /FontDescriptor /FontName /STSong-Light /Flags 6 /FontBBox [-25 -254 1000 880] "
+            "/ItalicAngle 0 /Ascent 880 /Descent -120 /CapHeight 880 /StemV 93 >>"
+        )
+        cid_font = add(
+            "<< /Type /Font /Subtype /CIDFontType0 /BaseFont /STSong-Light "
+            "/CIDSystemInfo << /Registry (Adobe) /Ordering (GB1) /Supplement 2 >> "
+            f"/FontDescriptor {font_desc} 0 R /DW 1000 /W [1 95 500] >>"
+        )
+        font = add(
+            "<< /Type /Font /Subtype /Type0 /BaseFont /STSong-Light /Encoding /UniGB-UCS2-H "
+            f"/DescendantFonts [{cid_font} 0 R] >>"
+        )
+
+        image_ids = {}
+        for name, w, h, filt, data in self._images:
+            image_ids[name] = add(
+                f"<< /Type /XObject /Subtype /Image /Width {w} /Height {h} /ColorSpace /DeviceRGB "
+                f"/BitsPerComponent 8 /Filter {filt} /Length {len(data)} >>\nstream\n".encode("latin-1")
+                + data + b"\nendstream"
+            )
+
+        page_ids = []
+        for ops, names in self._pages:
+            stream = zlib.compress("\n".join(ops).encode("latin-1"))
+            content = add(
+                f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode("latin-1")
+                + stream + b"\nendstream"
+            )
+            xobjects = " ".join(f"/{n} {image_ids[n]} 0 R" for n in names)
+            page_ids.append(add(
+                f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 {self.width:g} {self.height:g}] "
+                f"/Resources << /Font << /F1 {font} 0 R >> /XObject << {xobjects} >> >> "
+                f"/Contents {content} 0 R >>"
+            ))
+
+        objects[catalog - 1] = f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode("latin-1")
+        kids = " ".join(f"{i} 0 R" for i in page_ids)
+        objects[pages_id - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("latin-1")
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for i, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += f"{i} 0 obj\n".encode("latin-1") + body + b"\nendobj\n"
+        xref = len(out)
+        out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+        for off in offsets:
+            out += f"{off:010d} 00000 n \n".encode("latin-1")
+        out += f"trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+        return bytes(out)
@@ -0,0 +1,173 @@
+"""
+基底合成预测（与界面无关）
+- 页面与 HTTP 服务共用：相同的基底缓存、缓存键与结果容器，同一进程内相同工况只计算一次
+- 批量预测：未命中缓存的工况去重后做一次矩阵乘，梯度与统计量也整批计算（不逐场循环）
+- 单工况预测经微批调度器合并：并发到达的请求凑成一批做一次矩阵乘（utils.batching）
+- 基底文件可由环境变量 CFD_BASIS_PATH 指定；大 .npy / Zarr 基底经 BasisStore 按块合成，不整体读入内存
+"""
+
+import os
+import threading
+
+import numpy as np
+
+from utils.synthesis import N_MODES, calculate_coefficients_batch, load_basis, basis_shape, basis_digest
+from utils.basis_store import BasisStore, is_out_of_core
+from utils.field_result import FieldResult
+from utils.field_stats import basis_moments, field_statistics, field_statistics_batch
+from utils.resource_cache import STORE, content_key
+from utils.profiling import timed
+from utils.batching import MicroBatcher
+from utils.settings import get_settings
+
+# 基底文件（环境变量 CFD_BASIS_PATH 优先）与默认网格尺寸，页面与服务共用
+DEFAULT_BASIS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "8张图.xlsx")
+BASIS_PATH = os.environ.get("CFD_BASIS_PATH") or DEFAULT_BASIS_PATH
+DEFAULT_SHAPE = (190, 87)
+
+# 外存基底：(绝对路径, 默认尺寸) -> (修改时间, BasisStore)
+_STORES = {}
+
+# 微批调度器：(基底路径, 默认尺寸) -> MicroBatcher
+_DISPATCHERS = {}
+_DISPATCHERS_LOCK = threading.Lock()
+
+
+def check_basis(basis: np.ndarray, shape: tuple):
+    """检查基底数据尺寸，不符时抛出 ValueError"""
+    if basis.shape[1] < N_MODES:
+        raise ValueError(f"数据文件需要至少{N_MODES}列，当前只有{basis.shape[1]}列")
+    expected_rows = int(np.prod(shape))
+    if basis.shape[0] != expected_rows:
+        raise ValueError(f"数据行数({basis.shape[0]})与图像尺寸({expected_rows})不匹配")
+
+
+def build_result(synthesized_img: np.ndarray, coefficients: list = None,
+                 moments: tuple = None) -> FieldResult:
+    """
+    由温度场计算流场数据（梯度），存入紧凑的 float32 结果容器，并附带统计摘要
+    给定系数与基底矩时，温度场均值/标准差由矩精确计算
+    """
+    with timed("synthesis.gradient"):
+        result = FieldResult.from_field(synthesized_img)
+    with timed("synthesis.stats"):
+        result.stats = field_statistics(result, coefficients, moments)
+    return result
+
+
+def basis_key(digest: str, shape: tuple, params) -> str:
+    """基底合成结果的共享缓存键（digest 为基底摘要）"""
+    return content_key("basis", digest, shape, *(float(p) for p in params))
+
+
+def open_store(path: str, default_shape: tuple = DEFAULT_SHAPE) -> BasisStore:
+    """外存基底（内存映射 / 按需读取），按文件修改时间缓存"""
+    key = (os.path.abspath(path), tuple(default_shape))
+    mtime = os.stat(path).st_mtime_ns
+    cached = _STORES.get(key)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, BasisStore.open(path, default_shape=default_shape))
+        _STORES[key] = cached
+    return cached[1]
+
+
+def _context(path: str, default_shape: tuple) -> tuple:
+    """→ (基底, 网格尺寸, 摘要)：大基底为按块读取的 BasisStore，其余为整体读入的矩阵"""
+    if is_out_of_core(path):
+        basis = open_store(path, default_shape)
+        shape, digest = basis.shape, basis.digest
+        if len(shape) == 1:
+            raise ValueError(f"数据行数({basis.n_cells})与图像尺寸({int(np.prod(default_shape))})不匹配")
+    else:
+        basis = load_basis(path)
+        shape = basis_shape(path, default_shape)
+        check_basis(basis, shape)
+        digest = basis_digest(path)
+    if len(shape) != 2:
+        raise ValueError(f"{len(shape)} 维网格 {shape} 的基底不能整体合成，请在页面中按切片查看")
+    return basis, shape, digest
+
+
+def compute_batch(params, path: str = BASIS_PATH, default_shape: tuple = DEFAULT_SHAPE) -> list:
+    """多个工况 (N, 4) → [FieldResult]：一次矩阵乘合成（外存基底逐块相乘），不读写共享缓存"""
+    basis, shape, digest = _context(path, default_shape)
+    params = np.atleast_2d(np.asarray(params, dtype=float))
+    with timed("synthesis.coefficients"):
+        coefficients = calculate_coefficients_batch(params)
+    if isinstance(basis, BasisStore):
+        with timed("synthesis.combine"):
+            imgs = basis.synthesize(coefficients)
+        moments = basis.moments()
+    else:
+        with timed("synthesis.combine"):
+            imgs = coefficients @ basis[:, :N_MODES].T
+        moments = basis_moments(basis[:, :N_MODES], digest)
+    with timed("synthesis.gradient"):
+        results = FieldResult.from_fields(imgs.reshape((-1,) + tuple(shape)))
+    with timed("synthesis.stats"):
+        for result, stats in zip(results, field_statistics_batch(results, coefficients, moments)):
+            result.stats = stats
+    return results
+
+
+def dispatcher(path: str = BASIS_PATH, default_shape: tuple = DEFAULT_SHAPE) -> MicroBatcher:
+    """单工况请求的微批调度器（进程内共享）：item 为 4 个参数的元组"""
+    key = (path, tuple(default_shape))
+    batcher = _DISPATCHERS.get(key)
+    if batcher is None:
+        # 先读取设置：首次读取会经 settings.apply 调用 resize_dispatchers，不能在持锁时进行
+        workers = get_settings().workers
+        with _DISPATCHERS_LOCK:
+            batcher = _DISPATCHERS.get(key)
+            if batcher is None:
+                batcher = MicroBatcher(lambda items: compute_batch(items, path, default_shape),
+                                       workers=workers, name="synthesis")
+                _DISPATCHERS[key] = batcher
+    return batcher
+
+
+def resize_dispatchers(workers: int):
+    """设置中的工作线程数变化时调整已创建的调度器（由 settings.apply 调用）"""
+    with _DISPATCHERS_LOCK:
+        batchers = list(_DISPATCHERS.values())
+    for batcher in batchers:
+        batcher.resize(workers)
+
+
+def synthesize_coalesced(params, path: str = BASIS_PATH, default_shape: tuple = DEFAULT_SHAPE):
+    """单工况结果（经微批调度器，与并发请求合并计算），不读写共享缓存"""
+    return dispatcher(path, default_shape)(tuple(float(p) for p in params))
+
+
+def predict_key(params, path: str = BASIS_PATH, default_shape: tuple = DEFAULT_SHAPE) -> str:
+    """单个工况结果的共享缓存键"""
+    _, shape, digest = _context(path, default_shape)
+    return basis_key(digest, shape, params)
+
+
+def predict(params, path: str = BASIS_PATH, default_shape: tuple = DEFAULT_SHAPE) -> tuple:
+    """单个工况 → (缓存键, FieldResult)；未命中缓存时经微批调度器计算"""
+    key = predict_key(params, path, default_shape)
+    return key, STORE.get_or_create(key, lambda: synthesize_coalesced(params, path, default_shape))
+
+
+def predict_batch(params, path: str = BASIS_PATH, default_shape: tuple = DEFAULT_SHAPE) -> list:
+    """
+    多个工况 (N, 4) → [(缓存键, FieldResult)]，顺序与输入一致
+    重复工况只计算一次，已缓存的直接复用
+    """
+    _, shape, digest = _context(path, default_shape)
+    params = np.atleast_2d(np.asarray(params, dtype=float))
+    keys = [basis_key(digest, shape, row) for row in params]
+
+    missing = {}
+    for i, key in enumerate(keys):
+        if key not in missing and key not in STORE:
+            missing[key] = i
+    if missing:
+        results = compute_batch(params[list(missing.values())], path, default_shape)
+        for key, result in zip(missing, results):
+            STORE.put(key, result)
+
+    # 同一批内刚生成的条目可能已被淘汰，此时逐个重算
+    return [(key, STORE.get(key) or predict(row, path, default_shape)[1]) for key, row in zip(keys, params)]
@@ -0,0 +1,167 @@
+"""
+场探针
+- 任意点批量双线性插值取值（全向量化，一次调用取多个物理量）
+- 折线剖面：按弧长等距采样
+- 区域平均：按需建立所选物理量的积分图（summed-area table），矩形查询 O(1)，多边形按行区间 O(行数)；
+  积分图为 float64 (H+1)×(W+1)，每个被查询的物理量一张，首次查询时建立并计入结果的内存占用
+坐标约定与图表一致：x 为列下标，y 为行下标
+"""
+
+import threading
+
+import numpy as np
+
+# 默认探测的物理量
+QUANTITIES = ("temp", "u", "v", "speed")
+
+
+def bilinear(field: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """双线性插值；超出网格范围的点返回 NaN"""
+    field = np.asarray(field)
+    h, w = field.shape
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    inside = (x >= 0) & (x <= w - 1) & (y >= 0) & (y <= h - 1)
+
+    xc = np.clip(x, 0, w - 1)
+    yc = np.clip(y, 0, h - 1)
+    j0 = np.minimum(np.floor(xc).astype(np.intp), max(w - 2, 0))
+    i0 = np.minimum(np.floor(yc).astype(np.intp), max(h - 2, 0))
+    j1 = np.minimum(j0 + 1, w - 1)
+    i1 = np.minimum(i0 + 1, h - 1)
+    tx = xc - j0
+    ty = yc - i0
+
+    top = field[i0, j0] * (1 - tx) + field[i0, j1] * tx
+    bottom = field[i1, j0] * (1 - tx) + field[i1, j1] * tx
+    out = top * (1 - ty) + bottom * ty
+    return np.where(inside, out, np.nan)
+
+
+def summed_area_table(field: np.ndarray) -> np.ndarray:
+    """积分图 S (H+1, W+1)，S[i, j] = field[:i, :j] 之和（float64）"""
+    field = np.asarray(field, dtype=np.float64)
+    sat = np.zeros((field.shape[0] + 1, field.shape[1] + 1))
+    np.cumsum(field, axis=0, out=sat[1:, 1:])
+    np.cumsum(sat[1:, 1:], axis=1, out=sat[1:, 1:])
+    return sat
+
+
+def polyline_points(vertices, spacing: float = 1.0) -> tuple:
+    """沿折线按弧长等距采样，返回 (x, y, 累计距离)"""
+    v = np.asarray(vertices, dtype=float).reshape(-1, 2)
+    seg = np.hypot(*np.diff(v, axis=0).T)
+    cum = np.concatenate([[0.0], np.cumsum(seg)])
+    total = cum[-1]
+    n = max(int(np.ceil(total / spacing)) + 1, 2)
+    dist = np.linspace(0.0, total, n)
+    return np.interp(dist, cum, v[:, 0]), np.interp(dist, cum, v[:, 1]), dist
+
+
+class FieldProbe:
+    """对一个结果（温度场 + 流场）做点/线/区域查询"""
+
+    def __init__(self, fields):
+        """fields：支持 fields[name] 取二维数组的映射（dict 或 FieldResult）"""
+        self._fields = fields
+        self._cache = {}
+        self._sat = {}
+        self._lock = threading.Lock()  # 探针随结果在会话间共享
+
+    def field(self, name: str) -> np.ndarray:
+        # speed 等按需计算的量只取一次
+        arr = self._cache.get(name)
+        if arr is None:
+            arr = np.asarray(self._fields[name])
+            self._cache[name] = arr
+        return arr
+
+    @property
+    def shape(self) -> tuple:
+        return self.field("temp").shape
+
+    @property
+    def nbytes(self) -> int:
+        """探针自身持有的内存：积分图 + 按需计算的物理量（temp/u/v 等视图不计）"""
+        with self._lock:
+            arrays = list(self._sat.values()) + list(self._cache.values())
+        return sum(a.nbytes for a in arrays if a.flags.owndata)
+
+    # ---------- 点 / 线 ----------
+    def sample(self, x, y, quantities=QUANTITIES) -> dict:
+        """批量取点：返回 {物理量: (N,) 数组}"""
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        return {q: bilinear(self.field(q), x, y) for q in quantities}
+
+    def sample_points(self, points, quantities=QUANTITIES) -> dict:
+        """points: (N, 2) 的 [x, y]"""
+        p = np.asarray(points, dtype=float).reshape(-1, 2)
+        return self.sample(p[:, 0], p[:, 1], quantities)
+
+    def profile(self, vertices, spacing: float = 1.0, quantities=QUANTITIES) -> dict:
+        """折线剖面：返回 {'x', 'y', 'distance', 物理量...}"""
+        x, y, dist = polyline_points(vertices, spacing)
+        out = {'x': x, 'y': y, 'distance': dist}
+        out.update(self.sample(x, y, quantities))
+        return out
+
+    # ---------- 区域平均 ----------
+    def sat(self, name: str) -> np.ndarray:
+        """所选物理量的积分图（首次查询时建立，之后随探针保留）"""
+        table = self._sat.get(name)
+        if table is None:
+            with self._lock:
+                table = self._sat.get(name)
+                if table is None:
+                    table = summed_area_table(self.field(name))
+                    self._sat[name] = table
+        return table
+
+    def rect_sum(self, x0: int, x1: int, y0: int, y1: int, name: str = "temp") -> tuple:
+        """矩形 [x0, x1] × [y0, y1]（含端点，单元下标）内的 (总和, 单元数)"""
+        h, w = self.shape
+        x0, x1 = sorted((int(np.clip(x0, 0, w - 1)), int(np.clip(x1, 0, w - 1))))
+        y0, y1 = sorted((int(np.clip(y0, 0, h - 1)), int(np.clip(y1, 0, h - 1))))
+        s = self.sat(name)
+        total = s[y1 + 1, x1 + 1] - s[y0, x1 + 1] - s[y1 + 1, x0] + s[y0, x0]
+        return float(total), (x1 - x0 + 1) * (y1 - y0 + 1)
+
+    def rect_mean(self, x0: int, x1: int, y0: int, y1: int, name: str = "temp") -> float:
+        total, n = self.rect_sum(x0, x1, y0, y1, name)
+        return total / n
+
+    def polygon_mean(self, vertices, name: str = "temp") -> float:
+        """
+        多边形内的平均值：取单元中心落在多边形内的单元（奇偶规则）
+        中心恰在边界上的单元：上边界包含、下边界不含（半开规则），左右边界均包含
+        """
+        v = np.asarray(vertices, dtype=float).reshape(-1, 2)
+        h, w = self.shape
+        s = self.sat(name)
+
+        xa, ya = v[:, 0], v[:, 1]
+        xb, yb = np.roll(xa, -1), np.roll(ya, -1)
+        rows = np.arange(max(int(np.ceil(ya.min())), 0), min(int(np.floor(ya.max())), h - 1) + 1)
+        if len(rows) == 0:
+            return float("nan")
+
+        # 每行与各边的交点（半开区间规则避免顶点重复计数）
+        yr = rows[:, None].astype(float)
+        crosses = (ya[None, :] <= yr) != (yb[None, :] <= yr)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            xi = xa + (yr - ya) * (xb - xa) / (yb - ya)
+        xi = np.where(crosses, xi, np.inf)
+        xi.sort(axis=1)
+
+        total, count = 0.0, 0
+        for r, xs in zip(rows, xi):
+            xs = xs[np.isfinite(xs)]
+            for left, right in zip(xs[0::2], xs[1::2]):
+                c0 = max(int(np.ceil(left)), 0)
+                c1 = min(int(np.floor(right)), w - 1)
+                if c1 < c0:
+                    continue
+                total += s[r + 1, c1 + 1] - s[r, c1 + 1] - s[r + 1, c0] + s[r, c0]
+                count += c1 - c0 + 1
+        return total / count if count else float("nan")
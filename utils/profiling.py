@@ -0,0 +1,110 @@
+"""
+热点路径计时
+- timed(name)：既可作上下文管理器，也可作装饰器
+- 每个阶段保留固定长度的样本环形缓冲区（进程内共享、线程安全）
+- 开启内存跟踪后同时记录每个阶段的内存增量（tracemalloc）
+- 汇总 p50/p95 并导出 JSON
+"""
+
+import json
+import threading
+import time
+import tracemalloc
+from collections import deque
+from functools import wraps
+
+# 每个阶段保留的样本数
+RING_SIZE = 256
+
+_lock = threading.Lock()
+_samples = {}   # name -> deque[(耗时秒, 内存增量字节 | None, 时间戳)]
+
+
+class timed:
+    """阶段计时：`with timed("synthesis.gemm"):` 或 `@timed("chart.heatmap")`"""
+
+    __slots__ = ("name", "_t0", "_m0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self._m0 = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._t0
+        mem = None
+        if self._m0 is not None and tracemalloc.is_tracing():
+            mem = tracemalloc.get_traced_memory()[0] - self._m0
+        record(self.name, elapsed, mem)
+        return False
+
+    def __call__(self, func):
+        name = self.name
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def record(name: str, elapsed: float, mem_delta: int = None):
+    """记录一个样本"""
+    sample = (elapsed, mem_delta, time.time())
+    with _lock:
+        # 追加与 summary() 的快照持有同一把锁，避免遍历时缓冲区被修改
+        _samples.setdefault(name, deque(maxlen=RING_SIZE)).append(sample)
+
+
+def enable_memory_tracking(enabled: bool = True):
+    """开启/关闭内存增量记录（tracemalloc 有额外开销，仅调试时开启）"""
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def reset():
+    """清空所有样本"""
+    with _lock:
+        _samples.clear()
+
+
+def summary() -> list:
+    """各阶段统计：次数、p50/p95/平均/最近一次（毫秒）、平均内存增量（KB）"""
+    import numpy as np
+
+    with _lock:
+        items = [(name, list(buf)) for name, buf in _samples.items()]
+
+    rows = []
+    for name, samples in sorted(items):
+        if not samples:
+            continue
+        t = np.array([s[0] for s in samples]) * 1e3
+        mem = [s[1] for s in samples if s[1] is not None]
+        rows.append({
+            'stage': name,
+            'count': len(t),
+            'p50_ms': float(np.percentile(t, 50)),
+            'p95_ms': float(np.percentile(t, 95)),
+            'mean_ms': float(t.mean()),
+            'last_ms': float(t[-1]),
+            'mem_kb': float(np.mean(mem)) / 1024 if mem else None,
+        })
+    return rows
+
+
+def export_json(include_samples: bool = False) -> str:
+    """导出统计结果（可选附带原始样本）"""
+    data = {'generated_at': time.strftime("%Y-%m-%d %H:%M:%S"), 'stages': summary()}
+    if include_samples:
+        with _lock:
+            data['samples'] = {
+                name: [{'ms': s[0] * 1e3, 'mem_bytes': s[1], 'time': s[2]} for s in buf]
+                for name, buf in _samples.items()
+            }
+    return json.dumps(data, ensure_ascii=False, indent=2)
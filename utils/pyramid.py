@@ -0,0 +1,122 @@
+"""
+多分辨率场金字塔
+- 逐级 2×2 块平均降采样（奇数尺寸按实际覆盖的单元取平均），层级按需生成并保持原数据精度
+- 按视图范围与单元数上限选择合适的层级，避免向浏览器发送全分辨率数组
+- 各层级坐标保持原始网格坐标（单元中心），图表轴无需换算
+- 金字塔在会话间共享：新层级在锁内生成到新列表后整体替换，读取方始终看到完整的层级列表
+"""
+
+import threading
+
+import numpy as np
+
+# 单张图表默认的最大渲染单元数
+MAX_RENDER_CELLS = 200_000
+
+
+def downsample2x(field: np.ndarray) -> np.ndarray:
+    """2×2 块平均降采样；NaN 单元不参与平均"""
+    h, w = field.shape
+    h2, w2 = (h + 1) // 2, (w + 1) // 2
+    padded = np.full((h2 * 2, w2 * 2), np.nan, dtype=field.dtype)
+    padded[:h, :w] = field
+    blocks = padded.reshape(h2, 2, w2, 2)
+    valid = ~np.isnan(blocks)
+    total = np.where(valid, blocks, 0.0).sum(axis=(1, 3))
+    count = valid.sum(axis=(1, 3))
+    with np.errstate(invalid='ignore'):
+        out = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+    return out.astype(field.dtype, copy=False)
+
+
+class FieldPyramid:
+    """二维场的多分辨率金字塔"""
+
+    def __init__(self, field: np.ndarray, min_size: int = 8):
+        field = np.asarray(field)
+        if not np.issubdtype(field.dtype, np.floating):
+            field = field.astype(float)
+        if field.ndim != 2:
+            raise ValueError(f"金字塔仅支持二维场，当前维度为 {field.ndim}")
+
+        self.shape = field.shape
+        self.levels = [field]   # 已生成的层级，其余层级按需生成
+        self._lock = threading.Lock()
+
+        shape = self.shape
+        self._n_levels = 1
+        while min(shape) > min_size:
+            shape = self._next_shape(shape)
+            self._n_levels += 1
+
+    @staticmethod
+    def _next_shape(shape: tuple) -> tuple:
+        return (shape[0] + 1) // 2, (shape[1] + 1) // 2
+
+    @property
+    def n_levels(self) -> int:
+        return self._n_levels
+
+    @property
+    def cached_nbytes(self) -> int:
+        """金字塔自身持有的内存（不含作为第 0 层的原数组视图）"""
+        return sum(level.nbytes for level in self.levels if level.flags.owndata)
+
+    def level(self, level: int) -> np.ndarray:
+        """取某一层级的数据（未生成时逐级生成）"""
+        levels = self.levels
+        if len(levels) <= level:
+            with self._lock:
+                levels = self.levels
+                if len(levels) <= level:
+                    levels = list(levels)
+                    while len(levels) <= level:
+                        levels.append(downsample2x(levels[-1]))
+                    self.levels = levels
+        return levels[level]
+
+    def level_shape(self, level: int) -> tuple:
+        shape = self.shape
+        for _ in range(level):
+            shape = self._next_shape(shape)
+        return shape
+
+    def coords(self, level: int) -> tuple:
+        """层级单元中心在原始网格中的坐标 (x, y)"""
+        f = 2 ** level
+        h, w = self.level_shape(level)
+        offset = (f - 1) / 2.0
+        x = np.minimum(np.arange(w) * f + offset, self.shape[1] - 1)
+        y = np.minimum(np.arange(h) * f + offset, self.shape[0] - 1)
+        return x, y
+
+    def choose_level(self, x_range: tuple = None, y_range: tuple = None,
+                     max_cells: int = MAX_RENDER_CELLS) -> int:
+        """选择视图内单元数不超过 max_cells 的最精细层级"""
+        x0, x1 = x_range if x_range is not None else (0, self.shape[1])
+        y0, y1 = y_range if y_range is not None else (0, self.shape[0])
+        cells = max(x1 - x0, 1) * max(y1 - y0, 1)
+        for level in range(self.n_levels):
+            if cells / 4 ** level <= max_cells:
+                return level
+        return self.n_levels - 1
+
+    def view(self, x_range: tuple = None, y_range: tuple = None,
+             max_cells: int = MAX_RENDER_CELLS, level: int = None) -> tuple:
+        """
+        取视图范围内的场数据
+        返回 (z, x, y, level)，x/y 为原始网格坐标
+        """
+        if level is None:
+            level = self.choose_level(x_range, y_range, max_cells)
+        level = int(np.clip(level, 0, self.n_levels - 1))
+
+        z = self.level(level)
+        x, y = self.coords(level)
+        if x_range is not None:
+            xm = (x >= x_range[0]) & (x <= x_range[1])
+            z, x = z[:, xm], x[xm]
+        if y_range is not None:
+            ym = (y >= y_range[0]) & (y <= y_range[1])
+            z, y = z[ym, :], y[ym]
+        return z, x, y, level
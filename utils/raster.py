@@ -0,0 +1,226 @@
+"""
+服务端栅格渲染
+- 颜色映射查找表（按名称与分辨率缓存）
+- 场数据栅格化为 RGBA 并编码为 PNG（仅依赖 zlib，无需图像库）
+- 移动立方体（marching squares）等值线提取，输出折线供 Plotly 线条迹线使用
+"""
+
+import base64
+import struct
+import zlib
+from functools import lru_cache
+
+import numpy as np
+import plotly.colors as pc
+
+# 颜色映射查找表分辨率
+LUT_SIZE = 256
+
+
+# ==================== 颜色映射 ====================
+
+def _parse_color(color: str) -> tuple:
+    if color.startswith('#'):
+        return pc.hex_to_rgb(color)
+    return pc.unlabel_rgb(color)
+
+
+@lru_cache(maxsize=32)
+def colormap_lut(name: str, n: int = LUT_SIZE) -> np.ndarray:
+    """颜色映射查找表 (n, 3) uint8"""
+    scale = pc.get_colorscale(name)
+    stops = np.array([float(s) for s, _ in scale])
+    rgb = np.array([_parse_color(c) for _, c in scale], dtype=float)
+    t = np.linspace(0.0, 1.0, n)
+    lut = np.stack([np.interp(t, stops, rgb[:, k]) for k in range(3)], axis=1)
+    lut = np.round(lut).astype(np.uint8)
+    lut.setflags(write=False)
+    return lut
+
+
+def rasterize(z: np.ndarray, colormap: str = "jet", zmin: float = None, zmax: float = None,
+              levels: np.ndarray = None, opacity: float = 1.0) -> np.ndarray:
+    """
+    场数据 → RGBA 图像 (H, W, 4) uint8
+    给定 levels 时按等值区间分段着色（填充等值线效果）；NaN 单元透明
+    """
+    z = np.asarray(z, dtype=float)
+    finite = np.isfinite(z)
+    if zmin is None:
+        zmin = float(np.min(z[finite])) if finite.any() else 0.0
+    if zmax is None:
+        zmax = float(np.max(z[finite])) if finite.any() else 1.0
+    span = zmax - zmin if zmax > zmin else 1.0
+
+    lut = colormap_lut(colormap)
+    if levels is not None:
+        # 每个区间取区间中点的颜色
+        bounds = np.concatenate([[zmin], np.asarray(levels, dtype=float), [zmax]])
+        mids = (bounds[:-1] + bounds[1:]) / 2
+        band = np.searchsorted(levels, np.where(finite, z, zmin))
+        t = (mids[band] - zmin) / span
+    else:
+        t = (np.where(finite, z, zmin) - zmin) / span
+    idx = np.clip((t * (len(lut) - 1)).round().astype(np.intp), 0, len(lut) - 1)
+
+    rgba = np.empty(z.shape + (4,), dtype=np.uint8)
+    rgba[..., :3] = lut[idx]
+    rgba[..., 3] = np.where(finite, int(round(255 * opacity)), 0)
+    return rgba
+
+
+def encode_png(rgba: np.ndarray, compress_level: int = 6) -> bytes:
+    """RGBA (H, W, 4) uint8 → PNG 字节"""
+    h, w, _ = rgba.shape
+    raw = np.empty((h, w * 4 + 1), dtype=np.uint8)
+    raw[:, 0] = 0  # 每行过滤类型：None
+    raw[:, 1:] = rgba.reshape(h, w * 4)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", w, h, 8, 6, 0, 0, 0)
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", header),
+        chunk(b"IDAT", zlib.compress(raw.tobytes(), compress_level)),
+        chunk(b"IEND", b""),
+    ])
+
+
+def png_data_uri(png: bytes) -> str:
+    return "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+
+
+# ==================== 等值线（marching squares） ====================
+
+# 单元角点：a=左上 b=右上 c=右下 d=左下；边：0上 1右 2下 3左
+# 情形编号 = a*8 + b*4 + c*2 + d（角点 ≥ 等值线值记为1）
+# 16/17 为鞍点情形 5/10 在单元中心值低于等值线时的走向
+_SEGMENTS = np.full((18, 2, 2), -1, dtype=np.intp)
+for _case, _segs in {
+    1: [(3, 2)], 2: [(2, 1)], 3: [(3, 1)], 4: [(0, 1)],
+    5: [(3, 0), (2, 1)], 6: [(0, 2)], 7: [(3, 0)], 8: [(3, 0)],
+    9: [(0, 2)], 10: [(0, 1), (3, 2)], 11: [(0, 1)], 12: [(3, 1)],
+    13: [(2, 1)], 14: [(3, 2)],
+    16: [(0, 1), (3, 2)], 17: [(3, 0), (2, 1)],
+}.items():
+    for _k, _seg in enumerate(_segs):
+        _SEGMENTS[_case, _k] = _seg
+
+
+def _edge_points(edge, i, j, a, b, c, d, level, h, w):
+    """边上插值点坐标 (x, y) 与全局边编号"""
+    def frac(p, q):
+        dq = q - p
+        return np.where(dq != 0, (level - p) / np.where(dq != 0, dq, 1.0), 0.5)
+
+    x = np.select(
+        [edge == 0, edge == 1, edge == 2],
+        [j + frac(a, b), j + 1.0, j + frac(d, c)],
+        j + 0.0
+    )
+    y = np.select(
+        [edge == 0, edge == 1, edge == 2],
+        [i + 0.0, i + frac(b, c), i + 1.0],
+        i + frac(a, d)
+    )
+    # 水平边 H(i, j) 编号 i*w + j；竖直边 V(i, j) 编号 h*w + i*w + j
+    edge_id = np.select(
+        [edge == 0, edge == 1, edge == 2],
+        [i * w + j, h * w + i * w + j + 1, (i + 1) * w + j],
+        h * w + i * w + j
+    )
+    return x, y, edge_id
+
+
+def contour_segments(z: np.ndarray, level: float) -> tuple:
+    """
+    提取等值线线段（全向量化）
+    返回 (segments (N, 2, 2) 的 [x, y] 端点, edge_ids (N, 2))，坐标单位为网格索引
+    """
+    z = np.asarray(z, dtype=float)
+    h, w = z.shape
+    a, b = z[:-1, :-1], z[:-1, 1:]
+    c, d = z[1:, 1:], z[1:, :-1]
+    case = ((a >= level).astype(np.int8) * 8 + (b >= level) * 4 + (c >= level) * 2 + (d >= level))
+    case = case.astype(np.intp)
+
+    # 鞍点：按单元中心值决定走向
+    center = (a + b + c + d) / 4
+    case = np.where((case == 5) & (center < level), 16, case)
+    case = np.where((case == 10) & (center < level), 17, case)
+    valid = np.isfinite(a) & np.isfinite(b) & np.isfinite(c) & np.isfinite(d)
+    case = np.where(valid, case, 0)
+
+    segs_x, segs_y, ids = [], [], []
+    for k in range(2):
+        edges = _SEGMENTS[case, k]          # (h-1, w-1, 2)
+        ii, jj = np.nonzero(edges[..., 0] >= 0)
+        if len(ii) == 0:
+            continue
+        corners = (a[ii, jj], b[ii, jj], c[ii, jj], d[ii, jj])
+        e = edges[ii, jj]
+        x0, y0, id0 = _edge_points(e[:, 0], ii, jj, *corners, level, h, w)
+        x1, y1, id1 = _edge_points(e[:, 1], ii, jj, *corners, level, h, w)
+        segs_x.append(np.stack([x0, x1], axis=1))
+        segs_y.append(np.stack([y0, y1], axis=1))
+        ids.append(np.stack([id0, id1], axis=1))
+
+    if not segs_x:
+        return np.empty((0, 2, 2)), np.empty((0, 2), dtype=np.intp)
+    segments = np.stack([np.concatenate(segs_x), np.concatenate(segs_y)], axis=2)
+    return segments, np.concatenate(ids)
+
+
+def contour_lines(z: np.ndarray, level: float) -> list:
+    """按共享边拼接线段为折线，返回 [(N, 2) 的 [x, y] 数组, ...]"""
+    segments, ids = contour_segments(z, level)
+    if len(segments) == 0:
+        return []
+
+    # 每条边至多被两个线段共享
+    owners = {}
+    for s, (e0, e1) in enumerate(ids.tolist()):
+        owners.setdefault(e0, []).append(s)
+        owners.setdefault(e1, []).append(s)
+
+    used = np.zeros(len(segments), dtype=bool)
+    lines = []
+
+    def walk(seg, edge, chain):
+        while True:
+            nxt = [t for t in owners[edge] if not used[t]]
+            if not nxt:
+                return
+            seg = nxt[0]
+            used[seg] = True
+            e0, e1 = ids[seg]
+            if e0 == edge:
+                chain.append(segments[seg, 1])
+                edge = e1
+            else:
+                chain.append(segments[seg, 0])
+                edge = e0
+
+    for s in range(len(segments)):
+        if used[s]:
+            continue
+        used[s] = True
+        forward = [segments[s, 0], segments[s, 1]]
+        walk(s, ids[s, 1], forward)
+        backward = []
+        walk(s, ids[s, 0], backward)
+        lines.append(np.array(backward[::-1] + forward))
+    return lines
+
+
+def contour_levels(z: np.ndarray, n: int = 15) -> np.ndarray:
+    """均匀分布的等值线值（不含最小/最大值）"""
+    finite = np.asarray(z)[np.isfinite(z)]
+    if finite.size == 0:
+        return np.array([])
+    lo, hi = float(finite.min()), float(finite.max())
+    if hi <= lo:
+        return np.array([])
+    return np.linspace(lo, hi, n + 2)[1:-1]
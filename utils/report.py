@@ -0,0 +1,443 @@
+"""
+分析报告生成
+- 从已保存的结果（场、统计量、输入参数、预测记录）组装报告，输出 HTML / PDF / Markdown
+- 图表渲染为静态图像：优先 kaleido，其次 matplotlib（Agg），均不可用时使用内置栅格渲染（utils.raster），全部离线
+- 图像在线程池中并行渲染，按 结果哈希 + 图名 + 渲染器 + 颜色映射 缓存在共享缓存中；结果不变时再次生成只重新排版
+  （调用方未给出结果键时由场内容计算，不使用对象 id——对象回收后 id 会被复用）
+- 报告内容先整理为与格式无关的块列表，再由各格式的写出函数排版
+"""
+
+import html
+import io
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.raster import rasterize, encode_png, png_data_uri, colormap_lut
+from utils.resource_cache import STORE, content_key
+from utils.settings import get_settings
+
+# 场图像的目标高度（像素，栅格渲染按整数倍放大）与直方图尺寸
+FIELD_IMAGE_HEIGHT = 480
+HIST_IMAGE_SIZE = (640, 240)
+
+# 报告中的图表：名称 -> (标题, 数据来源)；场图的颜色映射取自系统设置（默认颜色映射）
+FIGURES = {
+    'temp': ("温度场分布", "temp"),
+    'speed': ("流场速度分布", "speed"),
+    'hist': ("温度分布直方图", "stats"),
+}
+
+# 输出格式 -> (MIME, 扩展名)
+FORMATS = {
+    "HTML": ("text/html", ".html"),
+    "PDF": ("application/pdf", ".pdf"),
+    "Markdown": ("text/markdown", ".md"),
+}
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _submit_all(fn, items) -> dict:
+    """
+    在渲染线程池中提交全部任务 → {item: Future}
+    线程数取自设置（修改后下次生成报告时重建）；重建与提交在同一把锁内，
+    不会关闭其他会话正在提交的线程池（已提交的任务在旧线程池中照常完成）
+    """
+    global _EXECUTOR
+    workers = get_settings().workers
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None or _EXECUTOR._max_workers != workers:
+            if _EXECUTOR is not None:
+                _EXECUTOR.shutdown(wait=False)
+            _EXECUTOR = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report")
+        return {item: _EXECUTOR.submit(fn, item) for item in items}
+
+
+# ==================== 图像渲染 ====================
+
+# 静态图渲染器，按优先级排列；内置栅格渲染总是可用
+RENDERERS = ("kaleido", "matplotlib", "raster")
+
+_renderer_lock = threading.Lock()
+_unusable = set()   # 探测或渲染失败的渲染器，进程内不再使用
+
+
+def _probe(renderer: str) -> bool:
+    """渲染器能否使用：kaleido 还需本机浏览器，实际导出一张小图确认"""
+    try:
+        if renderer == "kaleido":
+            import plotly.graph_objects as go
+            go.Figure().to_image(format="png", width=16, height=16)
+        elif renderer == "matplotlib":
+            import matplotlib  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def available_renderer() -> str:
+    """可用的静态图渲染器：kaleido / matplotlib / raster（每个渲染器只探测一次）"""
+    with _renderer_lock:
+        for renderer in RENDERERS:
+            if renderer in _unusable:
+                continue
+            if renderer == "raster" or _probe(renderer):
+                return renderer
+            _unusable.add(renderer)
+    return "raster"
+
+
+def _fall_back(renderer: str):
+    """渲染失败：停用该渲染器 → 下一个可用的渲染器，已是内置栅格渲染时返回 None"""
+    if renderer == "raster":
+        return None
+    with _renderer_lock:
+        _unusable.add(renderer)
+    return available_renderer()
+
+
+def _to_rgb(rgba: np.ndarray) -> np.ndarray:
+    """按透明度合成到白色背景"""
+    alpha = rgba[..., 3:4].astype(np.float32) / 255.0
+    rgb = rgba[..., :3].astype(np.float32) * alpha + 255.0 * (1.0 - alpha)
+    return rgb.round().astype(np.uint8)
+
+
+def _raster_field(z: np.ndarray, colormap: str) -> np.ndarray:
+    """场 → 放大后的 RGBA 图像，右侧附色标"""
+    rgba = rasterize(z, colormap)
+    k = max(1, -(-FIELD_IMAGE_HEIGHT // z.shape[0]))
+    rgba = np.repeat(np.repeat(rgba, k, axis=0), k, axis=1)
+
+    h = rgba.shape[0]
+    lut = colormap_lut(colormap)
+    bar = lut[np.linspace(len(lut) - 1, 0, h).round().astype(np.intp)]
+    strip = np.full((h, 28, 4), 255, dtype=np.uint8)
+    strip[:, 12:, :3] = bar[:, None, :]
+    return np.concatenate([rgba, strip], axis=1)
+
+
+def _raster_hist(counts, size: tuple = HIST_IMAGE_SIZE) -> np.ndarray:
+    """直方图柱状图（RGBA）"""
+    w, h = size
+    counts = np.asarray(counts, dtype=float)
+    heights = np.round(counts / max(counts.max(), 1) * (h - 10)).astype(int)
+    col_bin = np.minimum(np.arange(w) * len(counts) // w, len(counts) - 1)
+    gap = (np.arange(w) * len(counts) % w) < len(counts)       # 柱间留白
+    filled = (np.arange(h)[::-1, None] < heights[col_bin][None, :]) & ~gap[None, :]
+    rgba = np.full((h, w, 4), 255, dtype=np.uint8)
+    rgba[filled, :3] = (21, 101, 192)
+    return rgba
+
+
+def field_colormap() -> str:
+    """场图颜色映射（系统设置 → 默认颜色映射）"""
+    return get_settings().display.default_colormap.lower()
+
+
+def _plotly_figure(name: str, z: np.ndarray, stats: dict, colormap: str):
+    import plotly.graph_objects as go
+    title, _ = FIGURES[name]
+    if name == 'hist':
+        edges = np.asarray(stats['hist_edges'])
+        fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=stats['hist_counts'],
+                               width=np.diff(edges), marker_color='#1565C0'))
+        fig.update_layout(width=HIST_IMAGE_SIZE[0], height=HIST_IMAGE_SIZE[1])
+    else:
+        fig = go.Figure(go.Heatmap(z=z, colorscale=colormap))
+        fig.update_layout(width=int(FIELD_IMAGE_HEIGHT * z.shape[1] / z.shape[0]) + 120,
+                          height=FIELD_IMAGE_HEIGHT,
+                          yaxis=dict(autorange="reversed", scaleanchor="x"))
+    fig.update_layout(title=title, margin=dict(l=40, r=20, t=40, b=30))
+    return fig
+
+
+def _matplotlib_rgba(name: str, z: np.ndarray, stats: dict, colormap: str) -> np.ndarray:
+    # 使用面向对象接口 + Agg 画布（线程安全，不依赖 pyplot 全局状态）
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    if name == 'hist':
+        fig = Figure(figsize=(HIST_IMAGE_SIZE[0] / 100, HIST_IMAGE_SIZE[1] / 100), dpi=100)
+        ax = fig.add_subplot()
+        edges = np.asarray(stats['hist_edges'])
+        ax.bar((edges[:-1] + edges[1:]) / 2, stats['hist_counts'], width=np.diff(edges), color='#1565C0')
+    else:
+        aspect = z.shape[1] / z.shape[0]
+        fig = Figure(figsize=(FIELD_IMAGE_HEIGHT / 100 * aspect + 1.5, FIELD_IMAGE_HEIGHT / 100), dpi=100)
+        ax = fig.add_subplot()
+        im = ax.imshow(z, cmap=colormap, origin="upper")
+        fig.colorbar(im, ax=ax)
+        ax.set_xlabel("X")
+        ax.set_ylabel("Y")
+    fig.tight_layout()
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+
+def render_figure(name: str, result, renderer: str, colormap: str = None) -> dict:
+    """
+    渲染一张图 → {'png': bytes, 'rgb': RGB 数组, 'size': (宽, 高)}
+    HTML / Markdown 嵌入 png，PDF 嵌入 rgb（无损）；kaleido 只渲染一次 PNG，再解码为 rgb
+    colormap 为空时使用系统设置的默认颜色映射
+    """
+    _, source = FIGURES[name]
+    colormap = colormap or field_colormap()
+    stats = result.stats['temp']
+    z = None if source == "stats" else np.asarray(result[source], dtype=np.float32)
+
+    if renderer == "kaleido":
+        # Pillow 随 Streamlit 一起安装，用于解码 kaleido 输出的 PNG
+        from PIL import Image
+        png = _plotly_figure(name, z, stats, colormap).to_image(format="png")
+        rgba = np.asarray(Image.open(io.BytesIO(png)).convert("RGBA"))
+        return {'png': png, 'rgb': _to_rgb(rgba), 'size': (rgba.shape[1], rgba.shape[0])}
+
+    if renderer == "matplotlib":
+        rgba = _matplotlib_rgba(name, z, stats, colormap)
+    elif name == 'hist':
+        rgba = _raster_hist(stats['hist_counts'])
+    else:
+        rgba = _raster_field(z, colormap)
+    return {'png': encode_png(rgba), 'rgb': _to_rgb(rgba), 'size': (rgba.shape[1], rgba.shape[0])}
+
+
+def result_digest(result) -> str:
+    """由图表用到的场计算结果键（统计量由温度场得出）"""
+    return content_key("report_result", *(np.asarray(result[source]) for source in ("temp", "speed")))
+
+
+def render_figures(result, result_key: str = None, names=tuple(FIGURES), renderer: str = None) -> tuple:
+    """
+    并行渲染（或从缓存取得）结果的全部图表 → ({名称: 图像}, 新渲染张数)
+    result_key 为空时按内容计算（result_digest）
+    """
+    renderer = renderer or available_renderer()
+    result_key = result_key or result_digest(result)
+    colormap = field_colormap()
+    rendered = []
+
+    def task(name):
+        used = renderer
+        while True:
+            # 缓存键取实际使用的渲染器：渲染失败时换下一个渲染器重新渲染
+            key = content_key("report_figure", result_key, name, used, colormap)
+
+            def factory():
+                image = render_figure(name, result, used, colormap)
+                rendered.append(name)
+                return image
+            try:
+                return STORE.get_or_create(key, factory)
+            except Exception:
+                used = _fall_back(used)
+                if used is None:
+                    raise
+
+    futures = _submit_all(task, names)
+    return {name: f.result() for name, f in futures.items()}, len(rendered)
+
+
+# ==================== 报告内容 ====================
+
+def _fmt(v: float) -> str:
+    return f"{v:.4f}"
+
+
+def build_blocks(data: dict, options: dict) -> list:
+    """
+    整理报告内容为块列表：('h', 文本, 级别) / ('p', 文本) / ('table', 行列表) / ('img', 图名, 标题) / ('hr',)
+    data：title, author, report_type, generated_at, inputs, engine, result, history
+    options：params, results, charts, stats, conclusions, raw_data（布尔）
+    """
+    result = data.get('result')
+    blocks = [
+        ('h', data['title'], 1),
+        ('p', f"作者：{data['author']}　生成时间：{data['generated_at']}　报告类型：{data['report_type']}"),
+        ('hr',),
+        ('h', "1. 概述", 2),
+        ('p', "本报告由CFD分析系统根据当前会话中已保存的预测结果自动生成。"
+              if result is not None else "当前会话尚无预测结果，报告仅包含历史记录。"),
+    ]
+    section = 2
+
+    inputs = data.get('inputs')
+    if options.get('params') and inputs is not None:
+        p1, p2, p3, p4 = inputs
+        blocks += [
+            ('h', f"{section}. 输入参数", 2),
+            ('table', [
+                ["参数", "数值", "单位"],
+                ["循环水温度", f"{p1:.1f}", "°C"],
+                ["循环水流量", f"{p2:.1f}", "m³/s"],
+                ["蒸汽压力", f"{p3:.2f}", "kPa"],
+                ["热负荷", f"{p4:.0f}", "MW"],
+                ["预测引擎", data.get('engine', "—"), ""],
+            ]),
+        ]
+        section += 1
+
+    if result is not None and options.get('results'):
+        t, s = result.stats['temp'], result.stats['speed']
+        blocks += [
+            ('h', f"{section}. 计算结果", 2),
+            ('table', [
+                ["输出", "温度场", "流场速度"],
+                ["最大值", _fmt(t['max']), _fmt(s['max'])],
+                ["最小值", _fmt(t['min']), _fmt(s['min'])],
+                ["平均值", _fmt(t['mean']), _fmt(s['mean'])],
+                ["标准差", _fmt(t['std']), _fmt(s['std'])],
+                ["网格尺寸", f"{result.shape[0]}×{result.shape[1]}", ""],
+            ]),
+        ]
+        section += 1
+
+    if result is not None and options.get('charts'):
+        blocks += [('h', f"{section}. 图表", 2),
+                   ('img', 'temp', FIGURES['temp'][0]),
+                   ('img', 'speed', FIGURES['speed'][0])]
+        section += 1
+
+    if result is not None and options.get('stats'):
+        t = result.stats['temp']
+        blocks += [
+            ('h', f"{section}. 统计分析", 2),
+            ('table', [["分位数", "温度值"]] + [[f"P{p}", _fmt(v)] for p, v in t['percentiles'].items()]),
+        ]
+        if options.get('charts'):
+            blocks.append(('img', 'hist', FIGURES['hist'][0]))
+        section += 1
+
+    if result is not None and options.get('conclusions'):
+        blocks += [('h', f"{section}. 结论建议", 2)] + [('p', line) for line in conclusions(result)]
+        section += 1
+
+    history = data.get('history') or []
+    if options.get('raw_data') and history:
+        rows = [["时间", "引擎", "参数", "最大值", "平均值", "最大速度"]]
+        rows += [[r['time'], r['engine'], r['params'], _fmt(r['max']), _fmt(r['mean']), _fmt(r['speed_max'])]
+                 for r in history[::-1]]
+        blocks += [('h', f"{section}. 预测记录", 2), ('table', rows)]
+
+    blocks += [('hr',), ('p', "本报告由 CFD 分析系统自动生成")]
+    return blocks
+
+
+def conclusions(result) -> list:
+    """由结果自动给出的要点"""
+    temp, speed = result.temp, result.speed
+    t, s = result.stats['temp'], result.stats['speed']
+    ti, tj = np.unravel_index(int(np.argmax(temp)), temp.shape)
+    si, sj = np.unravel_index(int(np.argmax(speed)), speed.shape)
+    band = t['percentiles'].get(95, t['max']) - t['percentiles'].get(5, t['min'])
+    return [
+        f"• 最高温度 {t['max']:.4f} 出现在网格位置 (X={tj}, Y={ti})，温度极差 {t['max'] - t['min']:.4f}。",
+        f"• 90% 单元的温度位于 {band:.4f} 的区间内（P5–P95），标准差 {t['std']:.4f}。",
+        f"• 最大速度 {s['max']:.4f} 出现在 (X={sj}, Y={si})，约为平均速度的 {s['max'] / max(s['mean'], 1e-12):.1f} 倍。",
+    ]
+
+
+# ==================== 各格式写出 ====================
+
+def to_markdown(blocks: list, images: dict) -> str:
+    out = []
+    for b in blocks:
+        if b[0] == 'h':
+            out.append("#" * b[2] + " " + b[1])
+        elif b[0] == 'p':
+            out.append(b[1])
+        elif b[0] == 'hr':
+            out.append("---")
+        elif b[0] == 'table':
+            rows = b[1]
+            out.append("\n".join(
+                ["| " + " | ".join(rows[0]) + " |", "|" + "---|" * len(rows[0])]
+                + ["| " + " | ".join(str(c) for c in r) + " |" for r in rows[1:]]
+            ))
+        elif b[0] == 'img' and b[1] in images:
+            out.append(f"![{b[2]}]({png_data_uri(images[b[1]]['png'])})")
+    return "\n\n".join(out) + "\n"
+
+
+def to_html(blocks: list, images: dict, title: str) -> str:
+    body = []
+    for b in blocks:
+        if b[0] == 'h':
+            body.append(f"<h{b[2]}>{html.escape(b[1])}</h{b[2]}>")
+        elif b[0] == 'p':
+            body.append(f"<p>{html.escape(b[1])}</p>")
+        elif b[0] == 'hr':
+            body.append("<hr>")
+        elif b[0] == 'table':
+            rows = b[1]
+            head = "".join(f"<th>{html.escape(str(c))}</th>" for c in rows[0])
+            rest = "".join("<tr>" + "".join(f"<td>{html.escape(str(c))}</td>" for c in r) + "</tr>"
+                           for r in rows[1:])
+            body.append(f"<table><thead><tr>{head}</tr></thead><tbody>{rest}</tbody></table>")
+        elif b[0] == 'img' and b[1] in images:
+            body.append(f'<figure><img src="{png_data_uri(images[b[1]]["png"])}" alt="{html.escape(b[2])}">'
+                        f"<figcaption>{html.escape(b[2])}</figcaption></figure>")
+    style = (
+        "body{font-family:'Microsoft YaHei','PingFang SC',sans-serif;max-width:900px;margin:40px auto;color:#333}"
+        "h1{color:#1565C0;border-bottom:3px solid #1565C0;padding-bottom:8px}h2{color:#1565C0}"
+        "table{border-collapse:collapse;margin:12px 0}th,td{border:1px solid #ccc;padding:6px 12px}"
+        "th{background:#E3F2FD}figure{text-align:center}img{max-width:100%}figcaption{color:#666}"
+    )
+    return (f"<!DOCTYPE html><html lang=\"zh\"><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>"
+            f"<style>{style}</style></head><body>{''.join(body)}</body></html>")
+
+
+def to_pdf(blocks: list, images: dict) -> bytes:
+    from utils.pdf import PdfDocument
+    doc = PdfDocument()
+    for b in blocks:
+        if b[0] == 'h':
+            doc.heading(b[1], 18 if b[2] == 1 else 13)
+        elif b[0] == 'p':
+            doc.paragraph(b[1])
+        elif b[0] == 'hr':
+            doc.rule()
+        elif b[0] == 'table':
+            doc.table(b[1])
+        elif b[0] == 'img' and b[1] in images:
+            doc.image(images[b[1]]['rgb'])
+            doc.paragraph(b[2], size=9)
+    return doc.to_bytes()
+
+
+def build_report(data: dict, fmt: str, options: dict, result_key: str = None) -> dict:
+    """
+    生成报告 → {'content': bytes, 'mime', 'ext', 'renderer', 'figures', 'rendered', 'elapsed_s'}
+    figures/rendered：报告使用的图表数 / 其中新渲染（未命中缓存）的张数
+    """
+    t0 = time.perf_counter()
+    blocks = build_blocks(data, options)
+    names = tuple(dict.fromkeys(b[1] for b in blocks if b[0] == 'img'))
+
+    images, rendered, renderer = {}, 0, None
+    if names and data.get('result') is not None:
+        images, rendered = render_figures(data['result'], result_key, names, available_renderer())
+        # 渲染中失败的渲染器已停用，此时报告的是实际使用的渲染器
+        renderer = available_renderer()
+
+    if fmt == "PDF":
+        content = to_pdf(blocks, images)
+    elif fmt == "HTML":
+        content = to_html(blocks, images, data['title']).encode("utf-8")
+    else:
+        content = to_markdown(blocks, images).encode("utf-8")
+
+    mime, ext = FORMATS[fmt]
+    return {
+        'content': content,
+        'mime': mime,
+        'ext': ext,
+        'renderer': renderer,
+        'figures': len(names),
+        'rendered': rendered,
+        'elapsed_s': time.perf_counter() - t0,
+    }
@@ -0,0 +1,272 @@
+"""
+进程级共享资源缓存
+- 面向不可变产物（计算得到的场、构建好的图表等），所有 Streamlit 会话共享同一份
+- 键由内容决定（content_key：数组字节 + 标量参数的哈希），相同工况只计算一次
+- 引用计数：会话通过 SessionRefs 持有键；引用归零的条目进入 LRU，按字节预算淘汰
+- 线程安全；同一键的并发创建只执行一次工厂函数
+"""
+
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+# 无引用条目的默认字节预算
+DEFAULT_BUDGET_BYTES = 256 * 1024 * 1024
+
+
+def content_key(*parts) -> str:
+    """由内容计算键：数组按 dtype/shape/字节，其余按 repr"""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            h.update(f"{part.dtype}{part.shape}".encode())
+            h.update(np.ascontiguousarray(part).data)
+        else:
+            h.update(repr(part).encode())
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def sizeof(obj) -> int:
+    """估算对象占用的字节数（统计 NumPy 数组与字节串）"""
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    if isinstance(obj, dict):
+        return sum(sizeof(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(sizeof(v) for v in obj)
+    if hasattr(obj, "nbytes"):
+        return int(obj.nbytes)
+    if hasattr(obj, "levels"):
+        return sizeof(obj.levels)
+    return 0
+
+
+def freeze(obj):
+    """将对象中的 NumPy 数组设为只读，防止会话间相互修改"""
+    if isinstance(obj, np.ndarray):
+        obj.setflags(write=False)
+    elif isinstance(obj, dict):
+        for v in obj.values():
+            freeze(v)
+    elif isinstance(obj, (list, tuple)):
+        for v in obj:
+            freeze(v)
+    elif hasattr(obj, "levels"):
+        freeze(obj.levels)
+    return obj
+
+
+class _Entry:
+    __slots__ = ("value", "nbytes", "refs")
+
+    def __init__(self, value, nbytes: int):
+        self.value = value
+        self.nbytes = nbytes
+        self.refs = 0
+
+
+class SharedStore:
+    """引用计数 + 内容寻址的共享缓存"""
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._idle = OrderedDict()     # 无引用条目，按最近使用排序
+        self._idle_bytes = 0
+        self._pending = {}             # key -> 创建中的锁
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- 读写 ----------
+    def get(self, key: str, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if key in self._idle:
+                self._idle.move_to_end(key)
+            return entry.value
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key: str, value, nbytes: int = None, acquire: bool = False):
+        """存入条目（已存在则保留原值）并返回缓存中的值；acquire=True 时同时加一个引用"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _Entry(freeze(value), sizeof(value) if nbytes is None else nbytes)
+                self._entries[key] = entry
+                if not acquire:
+                    self._mark_idle(key, entry)
+            elif acquire:
+                self.acquire(key)
+                return entry.value
+            if acquire:
+                entry.refs += 1
+            return entry.value
+
+    def get_or_create(self, key: str, factory, nbytes: int = None, acquire: bool = False):
+        """
+        命中直接返回；未命中时调用 factory() 创建（同一键并发只创建一次）
+        acquire=True 时在返回前原子地加一个引用，避免刚创建的条目被淘汰
+        factory() 返回 None 时不存入缓存，直接返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                if acquire:
+                    self.acquire(key)
+                elif key in self._idle:
+                    self._idle.move_to_end(key)
+                return entry.value
+            self.misses += 1
+            pending = self._pending.setdefault(key, threading.Lock())
+
+        with pending:
+            with self._lock:
+                if key in self._entries:
+                    return self.put(key, None, acquire=acquire)
+            try:
+                value = factory()
+            except BaseException:
+                # 工厂失败时也要清除，否则该键的创建锁永久残留
+                with self._lock:
+                    self._pending.pop(key, None)
+                raise
+            # 存入与清除创建锁在同一临界区内完成：其他调用方要么看到创建锁、要么看到条目
+            # 工厂返回 None 表示没有结果，不存入缓存（下次调用重新创建）
+            with self._lock:
+                self._pending.pop(key, None)
+                if value is None:
+                    return None
+                return self.put(key, value, nbytes, acquire=acquire)
+
+    # ---------- 引用计数 ----------
+    def acquire(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                raise KeyError(key)
+            if entry.refs == 0:
+                self._idle.pop(key, None)
+                self._idle_bytes -= entry.nbytes
+            entry.refs += 1
+
+    def release(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.refs == 0:
+                return
+            entry.refs -= 1
+            if entry.refs == 0:
+                self._mark_idle(key, entry)
+
+    def _mark_idle(self, key: str, entry: _Entry):
+        # 条目使用期间可能长出按需缓存（金字塔、积分图等），进入 LRU 时按当前占用重新计量
+        entry.nbytes = max(entry.nbytes, sizeof(entry.value))
+        self._idle[key] = None
+        self._idle_bytes += entry.nbytes
+        self._evict()
+
+    def _evict(self):
+        while self._idle_bytes > self.budget_bytes and self._idle:
+            key, _ = self._idle.popitem(last=False)
+            entry = self._entries.pop(key)
+            self._idle_bytes -= entry.nbytes
+
+    # ---------- 管理 ----------
+    def set_budget(self, budget_bytes: int):
+        with self._lock:
+            self.budget_bytes = budget_bytes
+            self._evict()
+
+    def clear_idle(self):
+        """清除所有无引用条目"""
+        with self._lock:
+            for key in list(self._idle):
+                del self._entries[key]
+            self._idle.clear()
+            self._idle_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = sum(e.nbytes for e in self._entries.values())
+            return {
+                'entries': len(self._entries),
+                'referenced': sum(1 for e in self._entries.values() if e.refs > 0),
+                'total_mb': total / 1024**2,
+                'idle_mb': self._idle_bytes / 1024**2,
+                'budget_mb': self.budget_bytes / 1024**2,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+class SessionRefs:
+    """
+    会话持有的资源键（按槽位），会话中只保存这些键
+    替换槽位时释放旧键；会话对象被回收时自动释放全部引用
+    """
+
+    def __init__(self, store: SharedStore):
+        self._store = store
+        self._keys = {}
+        weakref.finalize(self, SessionRefs._release_all, store, self._keys)
+
+    @staticmethod
+    def _release_all(store: SharedStore, keys: dict):
+        for key in keys.values():
+            store.release(key)
+        keys.clear()
+
+    def hold(self, slot: str, key: str):
+        """让槽位持有已在缓存中的键"""
+        if self._keys.get(slot) == key:
+            return
+        self._store.acquire(key)
+        self._replace(slot, key)
+
+    def get_or_create(self, slot: str, key: str, factory, nbytes: int = None):
+        """取得（必要时创建）共享条目并由槽位持有，返回条目的值"""
+        if self._keys.get(slot) == key:
+            value = self._store.get(key)
+            if value is not None:
+                return value
+        value = self._store.get_or_create(key, factory, nbytes, acquire=True)
+        if value is None:
+            # 没有结果：未存入缓存也未加引用，槽位保持原样
+            return None
+        self._replace(slot, key)
+        return value
+
+    def _replace(self, slot: str, key: str):
+        old = self._keys.get(slot)
+        self._keys[slot] = key
+        if old is not None:
+            self._store.release(old)
+
+    def drop(self, slot: str):
+        old = self._keys.pop(slot, None)
+        if old is not None:
+            self._store.release(old)
+
+    def key(self, slot: str):
+        return self._keys.get(slot)
+
+    def get(self, slot: str, default=None):
+        key = self._keys.get(slot)
+        return default if key is None else self._store.get(key, default)
+
+
+# 进程级单例
+STORE = SharedStore()
@@ -0,0 +1,131 @@
+"""
+稀疏测点重构
+- 测点位置 (x, y) 处的基底行由双线性插值得到，构成 (测点数, 8) 的观测矩阵
+- 系数由岭回归求解：c = (AᵀA + λI)⁻¹Aᵀv；对固定布点预先算好 (8, 测点数) 的重构矩阵并缓存，
+  每次新读数只需一次小矩阵-向量乘，整场再由基底合成
+- 布点优化：对基底做列主元 QR（前 8 个测点），测点数多于模态数时按杠杆值贪心追加（D-最优）
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.synthesis import N_MODES
+from utils.probe import bilinear
+from utils.resource_cache import content_key
+
+# 默认岭参数（相对 AᵀA 迹的比例）
+RIDGE = 1e-6
+# 缓存的布点数上限
+LAYOUT_CACHE_SIZE = 32
+
+# 布点缓存：content_key(基底摘要, 位置, 岭参数) -> SensorLayout
+_LAYOUT_CACHE = OrderedDict()
+
+
+def observation_matrix(basis: np.ndarray, shape: tuple, positions: np.ndarray) -> np.ndarray:
+    """测点处的基底值 (测点数, 8)（双线性插值）"""
+    p = np.asarray(positions, dtype=float).reshape(-1, 2)
+    modes = basis[:, :N_MODES]
+    return np.stack([bilinear(modes[:, k].reshape(shape), p[:, 0], p[:, 1])
+                     for k in range(modes.shape[1])], axis=1)
+
+
+class SensorLayout:
+    """固定布点的重构算子"""
+
+    def __init__(self, basis: np.ndarray, shape: tuple, positions, ridge: float = RIDGE):
+        self.positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        self.shape = tuple(shape)
+        self.modes = basis[:, :N_MODES]
+        a = observation_matrix(basis, shape, self.positions)
+        if not np.all(np.isfinite(a)):
+            raise ValueError("存在位于网格范围之外的测点")
+
+        gram = a.T @ a
+        lam = ridge * np.trace(gram) / len(gram)
+        self.operator = np.linalg.solve(gram + lam * np.eye(len(gram)), a.T)   # (8, 测点数)
+        self.observation = a
+        self.ridge = ridge
+        sv = np.linalg.svd(a, compute_uv=False)
+        self.condition = float(sv[0] / sv[-1]) if sv[-1] > 0 else float('inf')
+
+    @property
+    def n_sensors(self) -> int:
+        return len(self.positions)
+
+    def coefficients(self, values) -> np.ndarray:
+        """测点读数 (测点数,) 或 (测点数, 帧数) → 系数 (8,) / (8, 帧数)"""
+        return self.operator @ np.asarray(values, dtype=float)
+
+    def reconstruct(self, values) -> np.ndarray:
+        """测点读数 → 整场 (H, W)（多帧时为 (帧数, H, W)）"""
+        c = self.coefficients(values)
+        if c.ndim == 1:
+            return (self.modes @ c).reshape(self.shape)
+        return (c.T @ self.modes.T).reshape((-1,) + self.shape)
+
+    def residual(self, values) -> np.ndarray:
+        """读数与重构场在测点处的差"""
+        return self.observation @ self.coefficients(values) - np.asarray(values, dtype=float)
+
+
+def get_layout(basis: np.ndarray, shape: tuple, positions, digest: str = None,
+               ridge: float = RIDGE) -> SensorLayout:
+    """取得（必要时构建）布点的重构算子；同一基底 + 布点 + 岭参数只构建一次"""
+    positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+    if digest is None:
+        return SensorLayout(basis, shape, positions, ridge)
+    key = content_key(digest, tuple(shape), positions, ridge)
+    layout = _LAYOUT_CACHE.get(key)
+    if layout is None:
+        layout = SensorLayout(basis, shape, positions, ridge)
+        _LAYOUT_CACHE[key] = layout
+        while len(_LAYOUT_CACHE) > LAYOUT_CACHE_SIZE:
+            _LAYOUT_CACHE.popitem(last=False)
+    else:
+        _LAYOUT_CACHE.move_to_end(key)
+    return layout
+
+
+def qr_placement(basis: np.ndarray, shape: tuple, n_sensors: int, mask: np.ndarray = None) -> np.ndarray:
+    """
+    布点优化，返回测点位置 (n_sensors, 2) 的 [x, y]（单元中心）
+    前 min(n_sensors, 8) 个为基底转置的列主元 QR 主元；其余按当前信息矩阵下的最大杠杆值逐个追加
+    mask：可布点单元（True 为可布点），缺省为全部单元
+    """
+    modes = np.asarray(basis[:, :N_MODES], dtype=np.float64)
+    n_cells, r = modes.shape
+    candidates = np.ones(n_cells, dtype=bool) if mask is None else np.asarray(mask, dtype=bool).ravel().copy()
+    n_sensors = min(int(n_sensors), int(candidates.sum()))
+    chosen = []
+
+    # 列主元 QR（改进 Gram-Schmidt）：每步取剩余范数最大的单元，其余单元对其正交化
+    resid = modes.copy()
+    norms = np.einsum('ij,ij->i', resid, resid)
+    for _ in range(min(n_sensors, r)):
+        i = int(np.argmax(np.where(candidates, norms, -1.0)))
+        if norms[i] <= 0:
+            break
+        q = resid[i] / np.sqrt(norms[i])
+        resid -= np.outer(resid @ q, q)
+        norms = np.einsum('ij,ij->i', resid, resid)
+        candidates[i] = False
+        chosen.append(i)
+
+    # 测点数多于模态数：最大杠杆值贪心追加（Sherman-Morrison 更新信息矩阵的逆）
+    if len(chosen) < n_sensors:
+        a = modes[chosen]
+        info = a.T @ a
+        inv = np.linalg.pinv(info + 1e-12 * np.trace(info) * np.eye(r))
+        while len(chosen) < n_sensors:
+            leverage = np.einsum('ij,jk,ik->i', modes, inv, modes)
+            i = int(np.argmax(np.where(candidates, leverage, -1.0)))
+            row = modes[i]
+            v = inv @ row
+            inv -= np.outer(v, v) / (1.0 + row @ v)
+            candidates[i] = False
+            chosen.append(i)
+
+    rows, cols = np.unravel_index(np.asarray(chosen, dtype=np.intp), shape)
+    return np.stack([cols, rows], axis=1).astype(float)
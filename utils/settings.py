@@ -0,0 +1,271 @@
+"""
+系统设置
+- 分组的类型化设置（显示 / 计算 / 高级），持久化到本地 TOML 文件（data/settings.toml），可导出/导入 JSON 或 TOML
+- 进程内只读取一次并缓存；读取与保存时立即应用到计算路径：共享缓存上限、工作线程数
+  （已创建的微批调度器线程池随之调整）、BLAS 线程数（安装 threadpoolctl 时）；其余设置（引擎、迭代次数、容差、颜色映射、图表高度）由各模块按需读取
+- 读取时按字段类型转换并校验取值范围，缺失或非法的字段回退为默认值
+"""
+
+import contextlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field, fields, asdict, replace
+
+SETTINGS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "settings.toml")
+
+# 可选取值
+COLORMAPS = ("Jet", "Rainbow", "Viridis", "Plasma", "Hot")
+CHART_STYLES = ("默认", "科技风", "简约", "彩色")
+ENGINES = ("basis", "surrogate")
+TOLERANCES = (1e-3, 1e-4, 1e-5, 1e-6, 1e-7, 1e-8, 1e-9)
+TIME_SCHEMES = ("一阶隐式", "二阶隐式", "Crank-Nicolson")
+SPATIAL_SCHEMES = ("一阶迎风", "二阶迎风", "QUICK", "中心差分")
+MESH_TYPES = ("结构化网格", "非结构化网格", "混合网格")
+MESH_QUALITIES = ("粗糙 (快速)", "中等 (平衡)", "精细 (精确)", "超精细 (研究级)")
+LOG_LEVELS = ("ERROR", "WARNING", "INFO", "DEBUG")
+
+
+def _choice(default, options: tuple):
+    return field(default=default, metadata={'choices': options})
+
+
+def _range(default, lo, hi):
+    return field(default=default, metadata={'range': (lo, hi)})
+
+
+@dataclass(frozen=True)
+class DisplaySettings:
+    theme: str = ""
+    language: str = ""
+    font_size: int = _range(16, 12, 24)
+    chart_style: str = _choice("默认", CHART_STYLES)
+    animation: bool = True
+    show_grid: bool = True
+    default_colormap: str = _choice("Jet", COLORMAPS)
+    chart_height: int = _range(550, 200, 800)
+    dpi: int = _range(150, 72, 300)
+    auto_refresh: bool = False
+
+
+@dataclass(frozen=True)
+class ComputeSettings:
+    engine: str = _choice("basis", ENGINES)
+    max_iterations: int = _range(50, 10, 10000)
+    tolerance: float = _choice(1e-9, TOLERANCES)
+    time_scheme: str = _choice("一阶隐式", TIME_SCHEMES)
+    spatial_scheme: str = _choice("一阶迎风", SPATIAL_SCHEMES)
+    under_relaxation: float = _range(0.7, 0.1, 1.0)
+    mesh_type: str = _choice("结构化网格", MESH_TYPES)
+    mesh_quality: str = _choice("粗糙 (快速)", MESH_QUALITIES)
+    min_cell_size: float = _range(1.0, 0.1, 100.0)
+    growth_rate: float = _range(1.2, 1.0, 2.0)
+    parallel: bool = True
+    num_cores: int = _range(4, 1, 32)
+    gpu: bool = False
+
+
+@dataclass(frozen=True)
+class AdvancedSettings:
+    log_level: str = _choice("ERROR", LOG_LEVELS)
+    cache_size_mb: int = _range(256, 64, 4096)
+    auto_save: bool = True
+    save_interval: int = _range(5, 1, 60)
+    backup: bool = True
+    work_dir: str = "/home/user/cfd_projects"
+    output_dir: str = "/home/user/cfd_results"
+    temp_dir: str = "/tmp/cfd_temp"
+
+
+_SECTIONS = {'display': DisplaySettings, 'compute': ComputeSettings, 'advanced': AdvancedSettings}
+
+
+@dataclass(frozen=True)
+class Settings:
+    display: DisplaySettings = field(default_factory=DisplaySettings)
+    compute: ComputeSettings = field(default_factory=ComputeSettings)
+    advanced: AdvancedSettings = field(default_factory=AdvancedSettings)
+
+    @property
+    def workers(self) -> int:
+        """计算工作线程数"""
+        return self.compute.num_cores if self.compute.parallel else 1
+
+    @property
+    def cache_bytes(self) -> int:
+        return self.advanced.cache_size_mb * 1024 * 1024
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Settings":
+        data = data if isinstance(data, dict) else {}
+        return cls(**{name: _coerce(section, data.get(name)) for name, section in _SECTIONS.items()})
+
+    def update(self, section: str, **values) -> "Settings":
+        """返回修改了某一组若干字段的新设置（经过校验）"""
+        merged = dict(asdict(getattr(self, section)), **values)
+        return replace(self, **{section: _coerce(_SECTIONS[section], merged)})
+
+
+def _convert(kind, raw):
+    if kind is bool:
+        if not isinstance(raw, bool):
+            raise TypeError(raw)
+        return raw
+    if kind in (int, float) and isinstance(raw, bool):
+        raise TypeError(raw)
+    if kind is int:
+        value = float(raw)
+        if not value.is_integer():
+            raise ValueError(raw)
+        return int(value)
+    if kind is float:
+        return float(raw)
+    if not isinstance(raw, str):
+        raise TypeError(raw)
+    return raw
+
+
+def _coerce(section, data) -> object:
+    """字典 → 设置组：逐字段转换类型并校验，不合法的字段使用默认值"""
+    data = data if isinstance(data, dict) else {}
+    default = section()
+    values = {}
+    for f in fields(section):
+        if f.name not in data:
+            continue
+        try:
+            value = _convert(f.type, data[f.name])
+        except (TypeError, ValueError):
+            continue
+        choices = f.metadata.get('choices')
+        if choices is not None:
+            if f.type is float:
+                # 浮点选项按相对误差匹配
+                value = next((c for c in choices if abs(c - value) <= 1e-9 * abs(c)), None)
+            if value not in choices:
+                continue
+        bounds = f.metadata.get('range')
+        if bounds is not None:
+            value = min(max(value, bounds[0]), bounds[1])
+        values[f.name] = value
+    return replace(default, **values)
+
+
+# ==================== 序列化 ====================
+
+def _toml_reader():
+    try:
+        import tomllib
+        return tomllib
+    except ImportError:
+        try:
+            import tomli
+            return tomli
+        except ImportError:
+            return None
+
+
+def _toml_value(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return json.dumps(value, ensure_ascii=False)
+
+
+def dumps(settings: Settings, fmt: str = "toml") -> str:
+    data = settings.to_dict()
+    if fmt == "json":
+        return json.dumps(data, ensure_ascii=False, indent=2)
+    blocks = []
+    for name, section in data.items():
+        lines = [f"[{name}]"] + [f"{k} = {_toml_value(v)}" for k, v in section.items()]
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks) + "\n"
+
+
+def loads(text: str, fmt: str = "toml") -> Settings:
+    """文本 → 设置；格式错误时抛出 ValueError"""
+    if fmt == "json":
+        data = json.loads(text)
+    else:
+        reader = _toml_reader()
+        if reader is None:
+            raise ValueError("当前环境无法读取 TOML（需要 Python 3.11+ 或 tomli）")
+        data = reader.loads(text)
+    return Settings.from_dict(data)
+
+
+def settings_path(path: str = SETTINGS_PATH) -> str:
+    """无 TOML 读取器时改用同名 JSON 文件"""
+    if _toml_reader() is None:
+        return os.path.splitext(path)[0] + ".json"
+    return path
+
+
+def _format(path: str) -> str:
+    return "json" if path.endswith(".json") else "toml"
+
+
+def load_settings(path: str = SETTINGS_PATH) -> Settings:
+    """从文件读取，文件不存在或损坏时返回默认设置"""
+    path = settings_path(path)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return loads(f.read(), _format(path))
+    except (OSError, ValueError):
+        return Settings()
+
+
+# ==================== 进程内缓存与应用 ====================
+
+_lock = threading.Lock()
+_current = None
+
+
+def get_settings() -> Settings:
+    """当前设置（首次调用时从文件读取并应用）"""
+    global _current
+    if _current is None:
+        with _lock:
+            if _current is None:
+                settings = load_settings()
+                apply(settings)
+                _current = settings
+    return _current
+
+
+def save_settings(settings: Settings, path: str = SETTINGS_PATH) -> Settings:
+    """写入文件（原子替换）并立即生效；写入失败时抛出 OSError，当前设置不变"""
+    global _current
+    path = settings_path(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(dumps(settings, _format(path)))
+        os.replace(tmp, path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+        raise
+    with _lock:
+        apply(settings)
+        _current = settings
+    return settings
+
+
+def apply(settings: Settings):
+    """把需要主动设置的项应用到运行中的组件"""
+    from utils.resource_cache import STORE
+    from utils.predict import resize_dispatchers
+    STORE.set_budget(settings.cache_bytes)
+    resize_dispatchers(settings.workers)
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(settings.workers, user_api="blas")
+    except ImportError:
+        pass
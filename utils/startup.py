@@ -0,0 +1,68 @@
+"""
+启动耗时报告
+在独立子进程中以 `python -X importtime` 冷导入每个页面模块，统计导入总耗时与最重的依赖。
+
+用法：python -m utils.startup [页面模块 ...]
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_INTERPRETER_MODULES = ("site", "encodings")
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_import(module: str) -> dict:
+    """冷导入一个模块，返回总耗时与各依赖的累计耗时（毫秒）"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True
+    )
+    deps = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            deps[m.group(4)] = int(m.group(2)) / 1000.0
+
+    top_level = {name: ms for name, ms in deps.items() if "." not in name}
+    return {
+        'module': module,
+        'ok': proc.returncode == 0,
+        'total_ms': deps.get(module, sum(top_level.values())),
+        'deps': deps,
+        'error': proc.stderr.strip().splitlines()[-1] if proc.returncode != 0 else None,
+    }
+
+
+def startup_report(modules: list = None, top: int = 8) -> str:
+    """生成启动耗时报告文本"""
+    if modules is None:
+        from pages import PAGES
+        modules = ["streamlit", "pages"] + [f"pages.{m}" for m in PAGES.values()]
+
+    lines = [f"{'模块':<28}{'冷导入 (ms)':>12}  最重的依赖"]
+    for module in modules:
+        r = profile_import(module)
+        if not r['ok']:
+            lines.append(f"{module:<28}{'失败':>12}  {r['error']}")
+            continue
+        # 只列顶层依赖，排除解释器启动本身导入的模块
+        heavy = sorted(
+            ((n, ms) for n, ms in r['deps'].items()
+             if n != module and "." not in n and n not in _INTERPRETER_MODULES),
+            key=lambda item: -item[1]
+        )[:top]
+        deps = ", ".join(f"{n} {ms:.0f}" for n, ms in heavy)
+        lines.append(f"{module:<28}{r['total_ms']:>12.1f}  {deps}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(startup_report(sys.argv[1:] or None))
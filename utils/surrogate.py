@@ -0,0 +1,262 @@
+"""
+降阶代理模型（POD + RBF）
+- 以高保真场快照 (p1..p4 → 场) 为训练集
+- POD：对快照矩阵做SVD，保留能量占比达到阈值的模态
+- RBF：对模态系数做径向基插值（薄板样条 + 线性多项式）
+- 纯CPU实现，单次预测为一次小型矩阵-向量乘法（亚毫秒级）
+"""
+
+import os
+import time
+import numpy as np
+
+from utils.synthesis import calculate_coefficients_batch
+
+# 前台参数范围（与预测页面输入控件一致）
+PARAM_BOUNDS = np.array([
+    [0.0, 50.0],     # 循环水温度 (°C)
+    [0.0, 100.0],    # 循环水流量 (m³/s)
+    [0.0, 20.0],     # 蒸汽压力 (kPa)
+    [0.0, 2000.0],   # 热负荷 (MW)
+])
+
+RBF_KERNELS = ("thin_plate", "cubic", "gaussian", "multiquadric")
+
+
+def _rbf(r: np.ndarray, kernel: str, epsilon: float) -> np.ndarray:
+    """径向基函数"""
+    if kernel == "thin_plate":
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out = r**2 * np.log(r)
+        return np.where(r > 0, out, 0.0)
+    if kernel == "cubic":
+        return r**3
+    if kernel == "gaussian":
+        return np.exp(-(epsilon * r)**2)
+    if kernel == "multiquadric":
+        return np.sqrt(1.0 + (epsilon * r)**2)
+    raise ValueError(f"未知的径向基函数: {kernel}")
+
+
+def _pairwise_distance(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """欧氏距离矩阵 (len(a), len(b))"""
+    d2 = (a * a).sum(1)[:, None] + (b * b).sum(1)[None, :] - 2.0 * a @ b.T
+    return np.sqrt(np.maximum(d2, 0.0))
+
+
+class PODRBFSurrogate:
+    """POD + RBF 降阶代理模型"""
+
+    def __init__(self, energy: float = 0.999999, max_modes: int = 32,
+                 kernel: str = "thin_plate", epsilon: float = 1.0, smoothing: float = 0.0):
+        if kernel not in RBF_KERNELS:
+            raise ValueError(f"未知的径向基函数: {kernel}")
+        self.energy = energy
+        self.max_modes = max_modes
+        self.kernel = kernel
+        self.epsilon = epsilon
+        self.smoothing = smoothing
+
+        self.shape = None
+        self.mean_field = None
+        self.modes = None
+        self.singular_values = None
+        self.centers = None
+        self.weights = None
+        self.poly_coef = None
+        self._lo = None
+        self._span = None
+
+    # ---------- 训练 ----------
+    def fit(self, params: np.ndarray, fields: np.ndarray) -> "PODRBFSurrogate":
+        """训练：params (N, 4)，fields (N, H, W) 或 (N, 单元数)"""
+        params = np.atleast_2d(np.asarray(params, dtype=float))
+        fields = np.asarray(fields, dtype=float)
+        if fields.shape[0] != params.shape[0]:
+            raise ValueError(f"参数个数({params.shape[0]})与场快照个数({fields.shape[0]})不匹配")
+
+        self.shape = fields.shape[1:]
+        snapshots = fields.reshape(fields.shape[0], -1)
+
+        # POD：中心化快照的SVD
+        self.mean_field = snapshots.mean(axis=0)
+        centered = snapshots - self.mean_field
+        _, s, vt = np.linalg.svd(centered, full_matrices=False)
+        cum = np.cumsum(s**2) / max(np.sum(s**2), np.finfo(float).tiny)
+        r = int(np.searchsorted(cum, self.energy) + 1)
+        r = max(1, min(r, self.max_modes, len(s)))
+        self.singular_values = s
+        self.modes = np.ascontiguousarray(vt[:r].T)   # (单元数, r)
+        modal = centered @ self.modes                  # (N, r)
+
+        # RBF：参数归一化到 [0, 1]
+        self._lo = params.min(axis=0)
+        self._span = np.where(np.ptp(params, axis=0) > 0, np.ptp(params, axis=0), 1.0)
+        x = self._scale(params)
+        n = x.shape[0]
+
+        K = _rbf(_pairwise_distance(x, x), self.kernel, self.epsilon)
+        K[np.diag_indices(n)] += self.smoothing
+        P = np.hstack([np.ones((n, 1)), x])
+        m = P.shape[1]
+        A = np.zeros((n + m, n + m))
+        A[:n, :n] = K
+        A[:n, n:] = P
+        A[n:, :n] = P.T
+        rhs = np.zeros((n + m, modal.shape[1]))
+        rhs[:n] = modal
+        sol = np.linalg.lstsq(A, rhs, rcond=None)[0]
+
+        self.centers = x
+        self.weights = sol[:n]
+        self.poly_coef = sol[n:]
+        return self
+
+    def _scale(self, params: np.ndarray) -> np.ndarray:
+        return (params - self._lo) / self._span
+
+    @property
+    def n_modes(self) -> int:
+        return 0 if self.modes is None else self.modes.shape[1]
+
+    # ---------- 预测 ----------
+    def predict_modal(self, params: np.ndarray) -> np.ndarray:
+        """预测模态系数 (N, r)"""
+        x = self._scale(np.atleast_2d(np.asarray(params, dtype=float)))
+        phi = _rbf(_pairwise_distance(x, self.centers), self.kernel, self.epsilon)
+        return phi @ self.weights + self.poly_coef[0] + x @ self.poly_coef[1:]
+
+    def predict_batch(self, params: np.ndarray) -> np.ndarray:
+        """批量预测场 (N, H, W)"""
+        modal = self.predict_modal(params)
+        fields = modal @ self.modes.T + self.mean_field
+        return fields.reshape((-1,) + self.shape)
+
+    def predict(self, p1: float, p2: float, p3: float, p4: float) -> np.ndarray:
+        """单点预测场 (H, W)"""
+        return self.predict_batch([[p1, p2, p3, p4]])[0]
+
+    # ---------- 评估 ----------
+    def validate(self, params: np.ndarray, fields: np.ndarray) -> dict:
+        """验证集误差（相对L2误差、最大绝对误差）"""
+        pred = self.predict_batch(params).reshape(len(params), -1)
+        true = np.asarray(fields, dtype=float).reshape(len(params), -1)
+        err = np.linalg.norm(pred - true, axis=1)
+        ref = np.maximum(np.linalg.norm(true, axis=1), np.finfo(float).tiny)
+        rel = err / ref
+        return {
+            'n_val': int(len(params)),
+            'rel_l2_mean': float(rel.mean()),
+            'rel_l2_max': float(rel.max()),
+            'abs_max': float(np.max(np.abs(pred - true))),
+        }
+
+    def benchmark(self, n_calls: int = 500, batch_size: int = 256, seed: int = 0) -> dict:
+        """推理性能：单次预测延迟与批量吞吐"""
+        rng = np.random.default_rng(seed)
+        samples = sample_params(max(n_calls, batch_size), rng=rng)
+
+        self.predict(*samples[0])  # 预热
+        t0 = time.perf_counter()
+        for p in samples[:n_calls]:
+            self.predict(*p)
+        single = (time.perf_counter() - t0) / n_calls
+
+        t0 = time.perf_counter()
+        self.predict_batch(samples[:batch_size])
+        batch = time.perf_counter() - t0
+
+        return {
+            'latency_ms': single * 1e3,
+            'single_throughput': 1.0 / single,
+            'batch_throughput': batch_size / batch,
+        }
+
+    # ---------- 持久化 ----------
+    def save(self, path: str):
+        np.savez_compressed(
+            path,
+            config=np.array([self.energy, self.max_modes, self.epsilon, self.smoothing]),
+            kernel=np.array(self.kernel),
+            shape=np.array(self.shape),
+            mean_field=self.mean_field,
+            modes=self.modes,
+            singular_values=self.singular_values,
+            centers=self.centers,
+            weights=self.weights,
+            poly_coef=self.poly_coef,
+            lo=self._lo,
+            span=self._span,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "PODRBFSurrogate":
+        with np.load(path) as z:
+            energy, max_modes, epsilon, smoothing = z['config']
+            model = cls(float(energy), int(max_modes), str(z['kernel']), float(epsilon), float(smoothing))
+            model.shape = tuple(int(s) for s in z['shape'])
+            model.mean_field = z['mean_field']
+            model.modes = z['modes']
+            model.singular_values = z['singular_values']
+            model.centers = z['centers']
+            model.weights = z['weights']
+            model.poly_coef = z['poly_coef']
+            model._lo = z['lo']
+            model._span = z['span']
+        return model
+
+
+def sample_params(n: int, bounds: np.ndarray = PARAM_BOUNDS, rng=None) -> np.ndarray:
+    """拉丁超立方采样 (n, 4)"""
+    rng = np.random.default_rng(rng)
+    d = len(bounds)
+    u = (rng.random((n, d)) + np.arange(n)[:, None]) / n
+    for j in range(d):
+        u[:, j] = u[rng.permutation(n), j]
+    return bounds[:, 0] + u * (bounds[:, 1] - bounds[:, 0])
+
+
+def load_archive(path: str) -> tuple:
+    """读取归档的高保真场：npz 文件，包含 params (N, 4) 与 fields (N, H, W)"""
+    with np.load(path) as z:
+        return np.asarray(z['params'], dtype=float), np.asarray(z['fields'], dtype=float)
+
+
+def build_training_set(basis: np.ndarray, shape: tuple, n: int, rng=None) -> tuple:
+    """无归档数据时，由基底合成生成训练快照"""
+    params = sample_params(n, rng=rng)
+    coeffs = calculate_coefficients_batch(params)
+    fields = (coeffs @ basis[:, :coeffs.shape[1]].T).reshape((n,) + tuple(shape))
+    return params, fields
+
+
+def train_surrogate(basis: np.ndarray, shape: tuple, archive_path: str = None,
+                    n_train: int = 200, n_val: int = 50, seed: int = 0, **model_kwargs) -> tuple:
+    """训练代理模型并返回 (模型, 报告)"""
+    rng = np.random.default_rng(seed)
+    if archive_path and os.path.exists(archive_path):
+        params, fields = load_archive(archive_path)
+        idx = rng.permutation(len(params))
+        n_val = min(n_val, max(1, len(params) // 5))
+        val_idx, train_idx = idx[:n_val], idx[n_val:]
+        train = (params[train_idx], fields[train_idx])
+        val = (params[val_idx], fields[val_idx])
+        source = os.path.basename(archive_path)
+    else:
+        train = build_training_set(basis, shape, n_train, rng=rng)
+        val = build_training_set(basis, shape, n_val, rng=rng)
+        source = "基底合成"
+
+    t0 = time.perf_counter()
+    model = PODRBFSurrogate(**model_kwargs).fit(*train)
+    fit_time = time.perf_counter() - t0
+
+    report = {
+        'source': source,
+        'n_train': int(len(train[0])),
+        'n_modes': model.n_modes,
+        'fit_time_s': fit_time,
+    }
+    report.update(model.validate(*val))
+    report.update(model.benchmark())
+    return model, report
@@ -0,0 +1,110 @@
+"""
+热力特性场合成引擎
+- 基底矩阵读取（按文件修改时间缓存，避免每次运行重复解析Excel）
+- 场尺寸由数据文件给出（Excel "shape" 工作表 / npz 的 shape 键），缺省时使用页面默认尺寸
+- 4个前台参数 → 8个后台系数
+- 系数加权合成 + 流场（梯度）计算
+"""
+
+import os
+import hashlib
+import numpy as np
+
+# 基底列数（8张图）
+N_MODES = 8
+
+# 基底缓存：path -> (mtime, ndarray, shape, 内容摘要)
+_BASIS_CACHE = {}
+
+
+def calculate_coefficients(p1: float, p2: float, p3: float, p4: float) -> list:
+    """根据4个前台参数计算8个后台系数（单组工况，公式见 calculate_coefficients_batch）"""
+    return calculate_coefficients_batch([(p1, p2, p3, p4)])[0].tolist()
+
+
+def calculate_coefficients_batch(params: np.ndarray) -> np.ndarray:
+    """批量计算系数：params (N, 4) → (N, 8)"""
+    params = np.atleast_2d(np.asarray(params, dtype=float))
+    p1, p2, p3, p4 = params.T
+    return np.stack([
+        p1 * 0.10 + 0.05,
+        -p2 * 0.15 - 0.10,
+        p3 * 0.20 + 0.15,
+        p1 * p2 * 0.05,
+        -p3 * 0.10 - 0.10,
+        p4 * 0.20 + 0.10,
+        -(p1 + p2) * 0.05 - 0.05,
+        (p3 + p4) * 0.10,
+    ], axis=1)
+
+
+def load_basis(path: str) -> np.ndarray:
+    """读取基底矩阵 (单元数, 列数)，文件未修改时直接返回缓存"""
+    return _load(path)[1]
+
+
+def basis_shape(path: str, default_shape: tuple = None) -> tuple:
+    """
+    基底场的网格尺寸
+    优先使用数据文件中记录的尺寸，否则使用 default_shape
+    """
+    shape = _load(path)[2]
+    return shape if shape is not None else default_shape
+
+
+def basis_digest(path: str) -> str:
+    """基底内容摘要，用作共享缓存键的一部分"""
+    return _load(path)[3]
+
+
+def _load(path: str) -> tuple:
+    mtime = os.path.getmtime(path)
+    cached = _BASIS_CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached
+
+    shape = None
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npy":
+        basis = np.load(path)
+    elif ext == ".npz":
+        with np.load(path) as z:
+            basis = z['basis']
+            if 'shape' in z:
+                shape = tuple(int(n) for n in z['shape'])
+    else:
+        import pandas as pd  # 仅读取Excel时需要，延迟导入以缩短冷启动
+        book = pd.ExcelFile(path)
+        basis = pd.read_excel(book, sheet_name=0, header=None).values
+        if "shape" in book.sheet_names:
+            meta = pd.read_excel(book, sheet_name="shape", header=None).values
+            shape = tuple(int(n) for n in meta[0] if pd.notna(n))
+
+    # (H, W, 列数) 形式的基底直接携带尺寸信息
+    if basis.ndim > 2:
+        shape = shape or basis.shape[:-1]
+        basis = basis.reshape(-1, basis.shape[-1])
+
+    basis = np.ascontiguousarray(basis, dtype=np.float64)
+    basis.setflags(write=False)
+    digest = hashlib.blake2b(basis.data, digest_size=16).hexdigest()
+    entry = (mtime, basis, shape, digest)
+    _BASIS_CACHE[path] = entry
+    return entry
+
+
+def synthesize(basis: np.ndarray, coefficients) -> np.ndarray:
+    """加权合成：basis (单元数, ≥8) · coefficients (8,) → (单元数,)"""
+    return basis[:, :N_MODES] @ np.asarray(coefficients, dtype=float)
+
+
+def compute_flow(img: np.ndarray) -> dict:
+    """由温度场梯度计算流场数据"""
+    v, u = np.gradient(img)
+    v = -v  # 反转v方向以匹配坐标系
+    speed = np.sqrt(u**2 + v**2)
+    return {
+        'u': u,
+        'v': v,
+        'speed': speed
+    }
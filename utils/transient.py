@@ -0,0 +1,122 @@
+"""
+瞬态模式：按时间序列工况逐帧生成场
+- 工况序列 (N, 4)：由基准工况 + 线性爬升 / 正弦漂移生成，或从 CSV 读入
+- 生成器流水线：工况分块 → 批量系数 → 一次矩阵乘合成整块 → 逐帧产出，任意时刻只驻留一块
+- 长序列按步长抽取动画帧，帧数据降采样到单帧单元数上限；逐步的最值/均值仍覆盖每一步
+- 工况序列为 (t, params, 时间单位)：CSV 没有 t 列时按步号计，单位为 None
+"""
+
+import numpy as np
+
+from utils.synthesis import N_MODES, calculate_coefficients_batch
+from utils.pyramid import FieldPyramid
+
+# 每块合成的时间步数
+CHUNK_STEPS = 32
+# 动画帧数上限与单帧单元数上限
+MAX_FRAMES = 120
+MAX_FRAME_CELLS = 10_000
+
+# 工况列名（CSV 读入时使用）
+PARAM_COLUMNS = ("p1", "p2", "p3", "p4")
+
+
+def build_schedule(base, n_steps: int, duration: float,
+                   ramps: dict = None, drifts: dict = None) -> tuple:
+    """
+    生成工况时间序列 → (t (N,), params (N, 4), "h")
+    ramps：{参数下标: 终值}，从基准值线性变化到终值
+    drifts：{参数下标: (幅值, 周期)}，在基准值上叠加正弦漂移
+    """
+    n_steps = max(int(n_steps), 2)
+    t = np.linspace(0.0, float(duration), n_steps)
+    params = np.tile(np.asarray(base, dtype=float), (n_steps, 1))
+    frac = np.linspace(0.0, 1.0, n_steps)
+    for i, end in (ramps or {}).items():
+        params[:, i] += (end - params[0, i]) * frac
+    for i, (amplitude, period) in (drifts or {}).items():
+        if amplitude and period > 0:
+            params[:, i] += amplitude * np.sin(2 * np.pi * t / period)
+    return t, params, "h"
+
+
+def check_schedule(t: np.ndarray, params: np.ndarray):
+    """检查工况序列，不合法时抛出 ValueError"""
+    if len(params) == 0:
+        raise ValueError("工况序列为空")
+    if params.ndim != 2 or params.shape[1] != len(PARAM_COLUMNS):
+        raise ValueError(f"工况应为 {len(PARAM_COLUMNS)} 列，当前形状为 {params.shape}")
+    if len(t) != len(params):
+        raise ValueError("时间列与工况行数不一致")
+    if not (np.isfinite(t).all() and np.isfinite(params).all()):
+        raise ValueError("工况序列含有空值或非数值")
+    if np.any(np.diff(t) <= 0):
+        raise ValueError("时间列应严格递增")
+
+
+def read_schedule(file) -> tuple:
+    """读取 CSV 工况序列（列 t, p1..p4；缺少 t 列时按步号计）→ (t, params, 时间单位)"""
+    import pandas as pd  # 仅上传工况文件时需要
+    df = pd.read_csv(file)
+    missing = [c for c in PARAM_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"工况文件缺少列: {', '.join(missing)}")
+    params = df[list(PARAM_COLUMNS)].to_numpy(dtype=float)
+    has_time = 't' in df.columns
+    t = df['t'].to_numpy(dtype=float) if has_time else np.arange(len(df), dtype=float)
+    check_schedule(t, params)
+    return t, params, ("h" if has_time else None)
+
+
+def iter_fields(basis: np.ndarray, shape: tuple, params: np.ndarray, chunk: int = CHUNK_STEPS):
+    """逐步产出 (步号, 场 (H, W))；每块一次批量合成，块用完即释放"""
+    modes = basis[:, :N_MODES]
+    for start in range(0, len(params), chunk):
+        coeffs = calculate_coefficients_batch(params[start:start + chunk])
+        block = coeffs @ modes.T        # (块内步数, 单元数)，每行连续
+        for j, row in enumerate(block):
+            yield start + j, row.reshape(shape)
+
+
+def frame_stride(n_steps: int, max_frames: int = MAX_FRAMES) -> int:
+    """动画抽帧步长"""
+    return max(1, -(-n_steps // max_frames))
+
+
+def iter_frames(basis: np.ndarray, shape: tuple, params: np.ndarray,
+                max_frames: int = MAX_FRAMES, max_cells: int = MAX_FRAME_CELLS):
+    """
+    逐步产出 (步号, 摘要, 帧数据)
+    摘要 {'max', 'min', 'mean'} 每步都有；帧数据仅在抽帧步给出（降采样后的 float32），其余为 None
+    """
+    stride = frame_stride(len(params), max_frames)
+    level = None
+    for i, field in iter_fields(basis, shape, params):
+        summary = {'max': float(field.max()), 'min': float(field.min()), 'mean': float(field.mean())}
+        z = None
+        if i % stride == 0:
+            pyramid = FieldPyramid(field.astype(np.float32))
+            if level is None:
+                level = pyramid.choose_level(max_cells=max_cells)
+            z = pyramid.level(level)
+        yield i, summary, z
+
+
+def animation_nbytes(n_steps: int, shape: tuple, max_frames: int = MAX_FRAMES,
+                     max_cells: int = MAX_FRAME_CELLS) -> int:
+    """动画占用内存的估计：帧数 × 单帧数据（图表中按 float64 保存）"""
+    n_frames = -(-n_steps // frame_stride(n_steps, max_frames))
+    pyramid = FieldPyramid(np.zeros(shape, dtype=np.float32))
+    h, w = pyramid.level_shape(pyramid.choose_level(max_cells=max_cells))
+    return n_frames * h * w * 8
+
+
+def time_label(unit) -> str:
+    """时间轴标题：有时间列时为 时间 (单位)，否则为步号"""
+    return f"时间 ({unit})" if unit else "步号"
+
+
+def frame_coords(shape: tuple, max_cells: int = MAX_FRAME_CELLS) -> tuple:
+    """帧数据在原始网格中的坐标 (x, y)，与 iter_frames 的降采样层级一致"""
+    pyramid = FieldPyramid(np.zeros(shape, dtype=np.float32))
+    return pyramid.coords(pyramid.choose_level(max_cells=max_cells))
@@ -0,0 +1,174 @@
+"""
+不确定性传播（蒙特卡洛）
+- 按用户给定的分布对 p1..p4 抽样 M 组，系数批量计算后分块做矩阵乘合成，任何时刻只驻留一块场
+- 逐像素均值/标准差：分块求矩后按 Chan 公式合并
+- 逐像素分位数：固定分箱的直方图草图（两遍扫描，第一遍求逐像素最值作为分箱范围），内存与 M 无关
+- 分块大小由内存预算决定，M=10,000 时内存占用仍固定；预算容不下草图时减少分箱数，
+  减到 MIN_SKETCH_BINS 仍不够时报错
+"""
+
+import time
+
+import numpy as np
+
+from utils.synthesis import N_MODES, calculate_coefficients_batch
+from utils.surrogate import PARAM_BOUNDS
+
+# 支持的输入分布
+DISTRIBUTIONS = ("fixed", "normal", "uniform")
+# 默认分位数、草图分箱数与内存预算
+PERCENTILES = (5, 50, 95)
+SKETCH_BINS = 128
+BUDGET_BYTES = 64 * 1024 * 1024
+# 预算不足时分箱数的下限（再少分位数误差过大）
+MIN_SKETCH_BINS = 16
+# 减少分箱时优先保证的每块样本数（每块样本过少时矩阵乘次数过多）
+MIN_CHUNK = 8
+# 每个像素的常驻中间量（均值、M2、最值、分箱宽度与下标偏移），以及每样本每像素的块内中间量
+CELL_BYTES = 8 * 6
+SAMPLE_CELL_BYTES = 32
+
+
+def sample_inputs(specs, n: int, rng=None, bounds: np.ndarray = PARAM_BOUNDS) -> np.ndarray:
+    """
+    按分布抽样 (n, 4)，结果截断到参数范围内
+    specs：4 个 {'dist': 'fixed'|'normal'|'uniform', 'mean': 中心值, 'scale': 标准差或半宽}
+    """
+    rng = np.random.default_rng(rng)
+    out = np.empty((n, len(specs)))
+    for j, spec in enumerate(specs):
+        dist, mean, scale = spec.get('dist', 'fixed'), float(spec['mean']), float(spec.get('scale', 0.0))
+        if dist == "normal":
+            out[:, j] = rng.normal(mean, scale, n)
+        elif dist == "uniform":
+            out[:, j] = rng.uniform(mean - scale, mean + scale, n)
+        elif dist == "fixed":
+            out[:, j] = mean
+        else:
+            raise ValueError(f"不支持的分布: {dist}")
+    return np.clip(out, bounds[:, 0], bounds[:, 1])
+
+
+class HistogramSketch:
+    """逐像素固定分箱直方图：流式累计，按累计分布线性插值求分位数"""
+
+    def __init__(self, lo: np.ndarray, hi: np.ndarray, bins: int = SKETCH_BINS):
+        self.lo = np.asarray(lo, dtype=np.float64)
+        self.width = np.maximum(np.asarray(hi, dtype=np.float64) - self.lo, 0.0) / bins
+        self.bins = bins
+        self.counts = np.zeros((len(self.lo), bins), dtype=np.int32)
+        self.n = 0
+        self._offsets = np.arange(len(self.lo), dtype=np.intp) * bins
+
+    @staticmethod
+    def nbytes(n_cells: int, bins: int = SKETCH_BINS) -> int:
+        """草图常驻内存 + 单次更新的临时计数数组"""
+        return n_cells * bins * (4 + 8 + 4)
+
+    def update(self, block: np.ndarray):
+        """block：(样本数, 像素数)"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scaled = np.where(self.width > 0, (block - self.lo) / self.width, 0.0)
+        idx = np.clip(scaled, 0, self.bins - 1).astype(np.intp)
+        idx += self._offsets
+        self.counts += np.bincount(idx.ravel(), minlength=self.counts.size).reshape(self.counts.shape).astype(np.int32)
+        self.n += len(block)
+
+    def quantiles(self, qs) -> np.ndarray:
+        """qs：0~1 的分位点；返回 (len(qs), 像素数)"""
+        cdf = np.cumsum(self.counts, axis=1)
+        rows = np.arange(len(self.lo))
+        out = np.empty((len(qs), len(self.lo)))
+        for i, q in enumerate(qs):
+            target = q * self.n
+            k = np.minimum((cdf < target).sum(axis=1), self.bins - 1)
+            before = np.where(k > 0, cdf[rows, k - 1], 0)
+            in_bin = self.counts[rows, k]
+            frac = np.where(in_bin > 0, (target - before) / np.maximum(in_bin, 1), 0.5)
+            out[i] = self.lo + (k + np.clip(frac, 0.0, 1.0)) * self.width
+        return out
+
+
+def min_budget(n_cells: int, bins: int = MIN_SKETCH_BINS) -> int:
+    """给定分箱数时至少需要的内存预算（草图 + 常驻中间量 + 一个样本的块）"""
+    return HistogramSketch.nbytes(n_cells, bins) + n_cells * (CELL_BYTES + SAMPLE_CELL_BYTES)
+
+
+def fit_bins(n_cells: int, budget_bytes: int = BUDGET_BYTES, bins: int = SKETCH_BINS) -> int:
+    """
+    预算内可用的分箱数：容不下 bins 个分箱时减少（先为每块留出 MIN_CHUNK 个样本），
+    连 MIN_SKETCH_BINS 个分箱和一个样本的块都放不下时报错
+    """
+    floor = min(bins, MIN_SKETCH_BINS)
+    spare = budget_bytes - min_budget(n_cells, 0)
+    per_bin = HistogramSketch.nbytes(n_cells, 1)
+    reserved = (MIN_CHUNK - 1) * n_cells * SAMPLE_CELL_BYTES
+    fit = min(bins, max((spare - reserved) // per_bin, floor))
+    if fit * per_bin > spare:
+        need = min_budget(n_cells, floor)
+        raise ValueError(f"内存预算 {budget_bytes / 1024**2:.1f} MB 不足：{n_cells} 个像素的分位数草图"
+                         f"至少需要 {need / 1024**2:.1f} MB")
+    return int(fit)
+
+
+def chunk_size(n_cells: int, budget_bytes: int = BUDGET_BYTES, bins: int = SKETCH_BINS) -> int:
+    """在内存预算内每块可合成的样本数（场块 + 缩放值 + 分箱下标等中间量，约每值 32 字节）"""
+    if budget_bytes < min_budget(n_cells, bins):
+        raise ValueError(f"内存预算 {budget_bytes / 1024**2:.1f} MB 容不下 {bins} 个分箱的草图"
+                         f"（至少需要 {min_budget(n_cells, bins) / 1024**2:.1f} MB）")
+    fixed = HistogramSketch.nbytes(n_cells, bins) + n_cells * CELL_BYTES
+    return (budget_bytes - fixed) // (n_cells * SAMPLE_CELL_BYTES)
+
+
+def _blocks(modes: np.ndarray, coeffs: np.ndarray, chunk: int):
+    for start in range(0, len(coeffs), chunk):
+        yield coeffs[start:start + chunk] @ modes.T
+
+
+def propagate(basis: np.ndarray, shape: tuple, params: np.ndarray, percentiles: tuple = PERCENTILES,
+              bins: int = SKETCH_BINS, budget_bytes: int = BUDGET_BYTES) -> dict:
+    """
+    蒙特卡洛传播：params (M, 4) → 逐像素 mean / std / 分位数 (H, W)
+    第一遍：均值/方差（分块 Chan 合并）+ 最值；第二遍：直方图草图
+    预算容不下 bins 个分箱时按 fit_bins 减少，实际分箱数见返回的 'bins'
+    """
+    t0 = time.perf_counter()
+    modes = basis[:, :N_MODES]
+    n_cells = modes.shape[0]
+    bins = fit_bins(n_cells, budget_bytes, bins)
+    chunk = chunk_size(n_cells, budget_bytes, bins)
+    coeffs = calculate_coefficients_batch(params)
+
+    count = 0
+    mean = np.zeros(n_cells)
+    m2 = np.zeros(n_cells)
+    lo = np.full(n_cells, np.inf)
+    hi = np.full(n_cells, -np.inf)
+    for block in _blocks(modes, coeffs, chunk):
+        m = len(block)
+        block_mean = block.mean(axis=0)
+        block_m2 = ((block - block_mean) ** 2).sum(axis=0)
+        delta = block_mean - mean
+        total = count + m
+        mean += delta * (m / total)
+        m2 += block_m2 + delta ** 2 * (count * m / total)
+        count = total
+        np.minimum(lo, block.min(axis=0), out=lo)
+        np.maximum(hi, block.max(axis=0), out=hi)
+
+    sketch = HistogramSketch(lo, hi, bins)
+    for block in _blocks(modes, coeffs, chunk):
+        sketch.update(block)
+    bands = sketch.quantiles([p / 100.0 for p in percentiles])
+
+    std = np.sqrt(m2 / max(count - 1, 1))
+    return {
+        'mean': mean.reshape(shape),
+        'std': std.reshape(shape),
+        'percentiles': {int(p): band.reshape(shape) for p, band in zip(percentiles, bands)},
+        'n_samples': count,
+        'chunk': chunk,
+        'bins': bins,
+        'elapsed_s': time.perf_counter() - t0,
+        'memory_bytes': HistogramSketch.nbytes(n_cells, bins) + n_cells * CELL_BYTES + chunk * n_cells * SAMPLE_CELL_BYTES,
+    }